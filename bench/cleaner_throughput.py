@@ -0,0 +1,51 @@
+import io
+import os
+import time
+import argparse
+import tempfile
+
+from bench.synthetic import write_numbers
+from utils.text_cleaner import LineFilter, clean_stream, clean_text_file
+
+
+def _report(label: str, size: int, seconds: float, result: dict):
+    print(f"{label:<32} {seconds:>6.2f}s {size / 1e6 / seconds:>8.1f} MB/s "
+          f"{result['lines']:>10} lines {result['dropped']:>8} dropped")
+
+
+def run(lines: int, repeat: int):
+    with tempfile.TemporaryDirectory(prefix="bench_clean_") as tmp:
+        input_path = os.path.join(tmp, "input.txt")
+        write_numbers(input_path, lines)
+        with open(input_path, "rb") as src:
+            data = src.read()
+        print(f"input: {lines} lines, {len(data) / 1e6:.1f} MB, best of {repeat}")
+
+        cases = (
+            ("plain", lambda: None),
+            ("62 prefix + 10-15 digits", lambda: LineFilter("62", 10, 15)),
+        )
+        for label, make_filter in cases:
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                result = clean_stream(io.BytesIO(data), io.BytesIO(), make_filter())
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            _report(f"memory, {label}", len(data), best, result)
+
+        started = time.perf_counter()
+        result = clean_text_file(input_path, os.path.join(tmp, "clean.txt"))
+        _report("file, plain", len(data), time.perf_counter() - started, result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RAPIKAN TXT block cleaner throughput")
+    parser.add_argument("--lines", type=int, default=5_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.lines, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import asyncio
+import zipfile
+import argparse
+import tempfile
+
+import asyncpg
+
+from database.export import EXPORT_FORMATS, EXPORT_TABLES, copy_table
+from database.migrations import BASELINE
+
+SCHEMA = "bench_export"
+
+
+async def seed(conn, rows: int):
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+    await conn.execute(f"SET search_path TO {SCHEMA}")
+    for statement in BASELINE:
+        await conn.execute(statement)
+    await conn.execute("""
+        INSERT INTO users (user_id, username, first_name, role, daily_used, total_requests, last_request_date)
+        SELECT 100000000 + n, 'user' || n, 'User ' || n, (ARRAY['reguler', 'vip', 'vvip'])[1 + n % 3],
+               n % 50, n % 1000, CURRENT_DATE - (n % 30)
+        FROM generate_series(1, $1) AS n
+    """, rows)
+    await conn.execute("""
+        INSERT INTO activity_logs (user_id, username, action, details, created_at)
+        SELECT 100000000 + n % 10000, 'user' || n % 10000, 'convert_txt_vcf',
+               '{"file": "contacts_' || n || '.txt", "count": ' || n % 5000 || '}',
+               now() - make_interval(secs => n % 2592000)
+        FROM generate_series(1, $1) AS n
+    """, rows)
+    await conn.execute("ANALYZE")
+
+
+async def run(rows: int, fmt: str):
+    conn = await asyncpg.connect(os.environ["DATABASE_URL"])
+    try:
+        started = time.perf_counter()
+        await seed(conn, rows)
+        print(f"seeded {rows} users + {rows} activity_logs in {time.perf_counter() - started:.1f}s")
+
+        with tempfile.TemporaryDirectory(prefix="bench_export_") as tmp:
+            path = os.path.join(tmp, f"export.{fmt}.zip")
+            results = []
+            with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, True, 6) as archive:
+                async with conn.transaction(isolation="repeatable_read", readonly=True):
+                    for table in EXPORT_TABLES:
+                        results.append(await copy_table(conn, archive, table, fmt))
+            archive_size = os.path.getsize(path)
+
+        for result in results:
+            rate = result["rows"] / result["seconds"] if result["seconds"] else 0
+            print(f"{result['table']:<14} {result['rows']:>10} rows {result['bytes'] / 1e6:>9.1f} MB "
+                  f"{result['seconds']:>7.2f}s {rate:>12.0f} rows/s")
+        total_rows = sum(result["rows"] for result in results)
+        total_seconds = sum(result["seconds"] for result in results)
+        print(f"{'total':<14} {total_rows:>10} rows {archive_size / 1e6:>9.1f} MB zip "
+              f"{total_seconds:>5.2f}s {total_rows / total_seconds if total_seconds else 0:>12.0f} rows/s")
+    finally:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="COPY export throughput on a seeded scratch schema")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    args = parser.parse_args()
+    if not os.getenv("DATABASE_URL"):
+        sys.exit("DATABASE_URL is required")
+    asyncio.run(run(args.rows, args.format))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import os
+import re
+import time
+import argparse
+import tempfile
+
+from bench.synthetic import write_numbers
+from utils.number_extract import count_numbers, extract_numbers, shutdown_pool
+
+
+def _baseline(path: str) -> int:
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return len(re.findall(r"\d+", f.read()))
+
+
+def _timed(label: str, func, path: str) -> int:
+    started = time.perf_counter()
+    result = func(path)
+    count = result if isinstance(result, int) else len(result)
+    print(f"{label:<24} {time.perf_counter() - started:>6.2f}s {count:>12} numbers")
+    return count
+
+
+def run(lines: int):
+    with tempfile.TemporaryDirectory(prefix="bench_extract_") as tmp:
+        path = os.path.join(tmp, "input.txt")
+        write_numbers(path, lines)
+        print(f"input: {lines} lines, {os.path.getsize(path) / 1e6:.1f} MB, {os.cpu_count()} CPUs")
+
+        expected = _timed("str read + re.findall", _baseline, path)
+        try:
+            counts = (
+                _timed("count_numbers", count_numbers, path),
+                _timed("extract_numbers list", extract_numbers, path),
+            )
+        finally:
+            shutdown_pool()
+        if any(count != expected for count in counts):
+            raise SystemExit("number counts differ from the re.findall baseline")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="mmap number extraction vs decoded re.findall")
+    parser.add_argument("--lines", type=int, default=5_000_000)
+    args = parser.parse_args()
+    run(args.lines)
+
+
+if __name__ == "__main__":
+    main()
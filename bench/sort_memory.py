@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import resource
+import argparse
+import tempfile
+import multiprocessing
+
+from bench.synthetic import write_numbers
+from utils.external_sort import SORT_E164, SORT_NUMERIC, sort_file
+from utils.merge_engine import MERGE_RUN_SIZE
+
+
+def _sort(input_path: str, output_path: str, sort_by: str, run_size: int, workdir: str, queue):
+    started = time.perf_counter()
+    result = sort_file(input_path, output_path, sort_by, workdir=workdir, run_size=run_size)
+    result["seconds"] = time.perf_counter() - started
+    queue.put(result)
+
+
+def run(lines: int, sort_by: str, run_size: int) -> float:
+    with tempfile.TemporaryDirectory(prefix="bench_sort_") as tmp:
+        input_path = os.path.join(tmp, "input.txt")
+        output_path = os.path.join(tmp, "sorted.txt")
+        write_numbers(input_path, lines)
+        print(f"input: {lines} lines, {os.path.getsize(input_path) / 1e6:.1f} MB")
+
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        process = context.Process(target=_sort, args=(input_path, output_path, sort_by, run_size, tmp, queue))
+        process.start()
+        result = queue.get()
+        process.join()
+        if process.exitcode:
+            sys.exit(f"sort failed with exit code {process.exitcode}")
+
+        peak_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+        print(f"{sort_by}: {result['records']} records, {result['runs']} runs, "
+              f"{result['seconds']:.1f}s, peak RSS {peak_mb:.0f} MB")
+        return peak_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description="External merge sort wall time and peak RSS")
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--sort-by", choices=(SORT_NUMERIC, SORT_E164), default=SORT_NUMERIC)
+    parser.add_argument("--run-size", type=int, default=MERGE_RUN_SIZE)
+    parser.add_argument("--max-rss-mb", type=float, help="exit non-zero if the sort process peaks above this")
+    args = parser.parse_args()
+
+    peak_mb = run(args.lines, args.sort_by, args.run_size)
+    if args.max_rss_mb is not None and peak_mb > args.max_rss_mb:
+        sys.exit(f"peak RSS {peak_mb:.0f} MB exceeds ceiling {args.max_rss_mb:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
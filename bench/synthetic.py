@@ -0,0 +1,25 @@
+import random
+
+FORMATS = (
+    "0{a}{b}{c}",
+    "+62 {a} {b} {c}",
+    "62{a}-{b}-{c}",
+    "({a}) {b}{c}",
+    "0{a} {b} {c}",
+)
+
+
+def write_numbers(path: str, count: int, seed: int = 1) -> int:
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="\n") as out:
+        for start in range(0, count, 10000):
+            lines = []
+            for _ in range(min(10000, count - start)):
+                template = FORMATS[rng.randrange(len(FORMATS))]
+                lines.append(template.format(
+                    a=f"8{rng.randrange(10, 100)}", b=rng.randrange(1000, 10000), c=rng.randrange(100, 100000)
+                ))
+                if rng.random() < 0.02:
+                    lines.append("")
+            out.write("\n".join(lines) + "\n")
+    return count
@@ -1,9 +1,12 @@
 import os
-import vobject
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ContextTypes, ConversationHandler
-from commands.vip_system import check_access, send_access_denied, get_user_role
+from commands.vip_system import check_access, send_access_denied, get_user_role, ensure_daily_quota, consume_daily_quota, refund_daily_quota
 from commands.menu import get_main_menu_keyboard
+from utils.lazy_import import lazy_module
+from utils.archive import accepts, resolve_input, open_text
+
+vobject = lazy_module("vobject")
 
 ASK_FILE = range(1)
 
@@ -15,6 +18,9 @@ async def cek_nama_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await send_access_denied(update, user_role, "FREE")
         return ConversationHandler.END
     
+    if not await ensure_daily_quota(update):
+        return ConversationHandler.END
+    
     cancel_keyboard = ReplyKeyboardMarkup([[KeyboardButton("❌ BATAL ❌")]], resize_keyboard=True)
     
     text = """```
@@ -41,10 +47,13 @@ async def cek_nama_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("```\n❌ Kirim file .vcf!\n```", parse_mode="Markdown")
         return ASK_FILE
     
-    if not update.message.document.file_name.endswith('.vcf'):
-        await update.message.reply_text("```\n❌ File harus berformat .vcf!\n```", parse_mode="Markdown")
+    if not accepts(update.message.document.file_name, ('.vcf',)):
+        await update.message.reply_text("```\n❌ File harus berformat .vcf, .zip atau .gz!\n```", parse_mode="Markdown")
         return ASK_FILE
     
+    if not await consume_daily_quota(update):
+        return ConversationHandler.END
+    
     file = await update.message.document.get_file()
     filepath = f"temp_{update.effective_user.id}_{update.message.document.file_name}"
     await file.download_to_drive(filepath)
@@ -52,7 +61,8 @@ async def cek_nama_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
     keyboard = get_main_menu_keyboard(update.effective_user.id)
     
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
+        source, _ = resolve_input(filepath, update.message.document.file_name, ('.vcf',))
+        with open_text(source) as f:
             vcf_content = f.read()
         
         vcard_list = list(vobject.readComponents(vcf_content))
@@ -83,6 +93,7 @@ Total: {len(vcard_list)} kontak
         await update.message.reply_text(text, parse_mode="Markdown", reply_markup=keyboard)
         
     except Exception as e:
+        refund_daily_quota(update.effective_user.id)
         await update.message.reply_text(f"```\n❌ Error: {str(e)}\n```",
                 parse_mode="Markdown", reply_markup=keyboard)
     finally:
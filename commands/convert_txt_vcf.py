@@ -1,27 +1,44 @@
-import os
-import re
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ContextTypes, ConversationHandler
-from commands.vip_system import check_access, send_access_denied, get_user_role, update_user_data, get_user_data
+from commands.vip_system import check_access, send_access_denied, get_user_role, ensure_daily_quota
 from commands.menu import get_main_menu_keyboard
-
-ASK_FILE, ASK_FILENAME, ASK_CONTACTNAME = range(3)
-
-def create_vcf_file(phone_numbers, contact_name, filename):
-    with open(filename, 'w', encoding='utf-8') as f:
-        for i, phone in enumerate(phone_numbers, start=1):
-            phone_str = str(phone).strip()
-            if not phone_str.startswith('+') and not phone_str.startswith('0'):
-                phone_str = '+' + phone_str
-            
-            vcf_entry = f"""BEGIN:VCARD
-VERSION:3.0
-FN:{contact_name} {str(i).zfill(4)}
-TEL;TYPE=CELL:{phone_str}
-END:VCARD
-
-"""
-            f.write(vcf_entry)
+from commands.file_jobs import enqueue_file_job, describe_document, get_format_keyboard, parse_format, format_prompt
+from utils.file_jobs import register_job, JobFailed
+from utils.number_extract import count_numbers, iter_numbers
+from utils.archive import accepts, resolve_input
+from utils.contact_writers import Contact, format_phone, write_contacts, output_extension, CONTACT_FORMATS, FORMAT_VCF30
+
+ASK_FILE, ASK_FILENAME, ASK_CONTACTNAME, ASK_FORMAT = range(4)
+
+def create_vcf_file(phone_numbers, contact_name, filename, job=None, total=None, output_format=FORMAT_VCF30):
+    if total is None:
+        total = len(phone_numbers)
+    contacts = (
+        Contact(f"{contact_name} {str(i).zfill(4)}", format_phone(phone))
+        for i, phone in enumerate(phone_numbers, start=1)
+    )
+    return write_contacts(contacts, filename, output_format, job, total)
+
+def run_txt_to_vcf(job, input_path):
+    source, _ = resolve_input(input_path, job.file_name, ('.txt',))
+    total = count_numbers(source)
+    
+    if not total:
+        raise JobFailed("Tidak ada nomor ditemukan!")
+    
+    job.check()
+    output_format = job.params.get('format', FORMAT_VCF30)
+    vcf_filename = f"{job.params.get('vcf_filename', 'output')}.{output_extension(output_format)}"
+    vcf_filepath = job.path(vcf_filename)
+    numbers = map(bytes.decode, iter_numbers(source))
+    create_vcf_file(numbers, job.params.get('contact_name', ''), vcf_filepath, job, total, output_format)
+    
+    return {
+        "outputs": [(vcf_filepath, vcf_filename)],
+        "caption": f"✅ Berhasil convert TXT to VCF!\n📂 Total: {total} kontak",
+    }
+
+register_job("txt_to_vcf", run_txt_to_vcf)
 
 async def txt_to_vcf_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
@@ -31,6 +48,9 @@ async def txt_to_vcf_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await send_access_denied(update, user_role, "VIP")
         return ConversationHandler.END
     
+    if not await ensure_daily_quota(update):
+        return ConversationHandler.END
+    
     cancel_keyboard = ReplyKeyboardMarkup([[KeyboardButton("❌ BATAL ❌")]], resize_keyboard=True)
     
     text = """```
@@ -57,39 +77,41 @@ async def txt_to_vcf_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("```\n❌ Kirim file .txt!\n```", parse_mode="Markdown")
         return ASK_FILE
     
-    if not update.message.document.file_name.endswith('.txt'):
-        await update.message.reply_text("```\n❌ File harus berformat .txt!\n```", parse_mode="Markdown")
+    if not accepts(update.message.document.file_name, ('.txt',)):
+        await update.message.reply_text("```\n❌ File harus berformat .txt, .zip atau .gz!\n```", parse_mode="Markdown")
         return ASK_FILE
     
-    file = await update.message.document.get_file()
-    filepath = f"temp_{update.effective_user.id}_{update.message.document.file_name}"
-    await file.download_to_drive(filepath)
-    
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    numbers = re.findall(r'\d+', content)
+    context.user_data['txt_document'] = describe_document(update.message.document)
     
-    if not numbers:
-        os.remove(filepath)
+    await update.message.reply_text(format_prompt(CONTACT_FORMATS, update.message.document.file_name),
+            parse_mode="Markdown", reply_markup=get_format_keyboard(CONTACT_FORMATS))
+    return ASK_FORMAT
+
+async def txt_to_vcf_format(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.message.text == "❌ BATAL ❌":
+        context.user_data.pop('txt_document', None)
         keyboard = get_main_menu_keyboard(update.effective_user.id)
-        await update.message.reply_text("```\n❌ Tidak ada nomor ditemukan!\n```",
+        await update.message.reply_text("```\n❌ Proses dibatalkan\n```",
                 parse_mode="Markdown", reply_markup=keyboard)
         return ConversationHandler.END
     
-    context.user_data['phone_numbers'] = numbers
-    context.user_data['txt_filepath'] = filepath
+    output_format = parse_format(update.message.text, CONTACT_FORMATS)
+    if output_format is None:
+        await update.message.reply_text("```\n❌ Pilih format dari tombol!\n```", parse_mode="Markdown")
+        return ASK_FORMAT
+    
+    context.user_data['txt_format'] = output_format
     
     cancel_keyboard = ReplyKeyboardMarkup([[KeyboardButton("❌ BATAL ❌")]], resize_keyboard=True)
     
     text = f"""```
-📝 NAMA FILE VCF
+📝 NAMA FILE OUTPUT
 ───────────────────────────────────────
 
-Total nomor ditemukan: {len(numbers)}
+File: {context.user_data['txt_document']['file_name']}
 
 Masukkan nama file output
-(tanpa ekstensi .vcf)
+(tanpa ekstensi .{output_extension(output_format)})
 
 Contoh: kontak
 
@@ -101,8 +123,6 @@ Contoh: kontak
 
 async def txt_to_vcf_filename(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.message.text == "❌ BATAL ❌":
-        if 'txt_filepath' in context.user_data and os.path.exists(context.user_data['txt_filepath']):
-            os.remove(context.user_data['txt_filepath'])
         keyboard = get_main_menu_keyboard(update.effective_user.id)
         await update.message.reply_text("```\n❌ Proses dibatalkan\n```",
                 parse_mode="Markdown", reply_markup=keyboard)
@@ -130,42 +150,16 @@ Hasil: kontak 0001, kontak 0002, ...
 
 async def txt_to_vcf_contactname(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.message.text == "❌ BATAL ❌":
-        if 'txt_filepath' in context.user_data and os.path.exists(context.user_data['txt_filepath']):
-            os.remove(context.user_data['txt_filepath'])
         keyboard = get_main_menu_keyboard(update.effective_user.id)
         await update.message.reply_text("```\n❌ Proses dibatalkan\n```",
                 parse_mode="Markdown", reply_markup=keyboard)
         return ConversationHandler.END
     
     contact_name = update.message.text.strip()
-    phone_numbers = context.user_data.get('phone_numbers', [])
     vcf_filename = context.user_data.get('vcf_filename', 'output')
     
-    vcf_filepath = f"temp_{update.effective_user.id}_{vcf_filename}.vcf"
-    
-    create_vcf_file(phone_numbers, contact_name, vcf_filepath)
-    
-    keyboard = get_main_menu_keyboard(update.effective_user.id)
-    
-    try:
-        await update.message.reply_document(
-            document=open(vcf_filepath, 'rb'),
-            filename=f"{vcf_filename}.vcf",
-            caption=f"✅ Berhasil convert TXT to VCF!\n📂 Total: {len(phone_numbers)} kontak",
-            reply_markup=keyboard
-        )
-        
-        user_data = get_user_data(update.effective_user.id)
-        total_ops = user_data.get("total_operations", 0) + 1
-        update_user_data(update.effective_user.id, {"total_operations": total_ops})
-        
-    except Exception as e:
-        await update.message.reply_text(f"```\n❌ Error: {str(e)}\n```",
-                parse_mode="Markdown", reply_markup=keyboard)
-    finally:
-        if 'txt_filepath' in context.user_data and os.path.exists(context.user_data['txt_filepath']):
-            os.remove(context.user_data['txt_filepath'])
-        if os.path.exists(vcf_filepath):
-            os.remove(vcf_filepath)
-    
-    return ConversationHandler.END
+    return await enqueue_file_job(update, "txt_to_vcf", context.user_data['txt_document'], {
+        "contact_name": contact_name,
+        "vcf_filename": vcf_filename,
+        "format": context.user_data.pop('txt_format', FORMAT_VCF30),
+    })
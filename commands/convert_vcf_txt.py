@@ -1,23 +1,37 @@
-import os
-import vobject
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ContextTypes, ConversationHandler
-from commands.vip_system import check_access, send_access_denied, get_user_role, update_user_data, get_user_data
+from commands.vip_system import check_access, send_access_denied, get_user_role, ensure_daily_quota
 from commands.menu import get_main_menu_keyboard
+from commands.file_jobs import enqueue_file_job, describe_document, get_format_keyboard, parse_format, format_prompt
+from utils.file_jobs import register_job
+from utils.archive import accepts, resolve_input, output_name
+from utils.merge_engine import iter_vcards, vcard_name, vcard_phones
+from utils.contact_writers import Contact, write_contacts, output_extension, NUMBER_FORMATS, FORMAT_TXT
 
-ASK_FILE = range(1)
+ASK_FILE, ASK_FORMAT = range(2)
 
-def extract_phone_numbers(vcf_filepath, txt_filepath):
-    with open(vcf_filepath, 'r', encoding='utf-8') as f:
-        vcf_content = f.read()
-    
-    vcard_list = vobject.readComponents(vcf_content)
+def iter_vcf_contacts(source):
+    for card in iter_vcards(source):
+        name = vcard_name(card)
+        for phone in vcard_phones(card):
+            yield Contact(name, phone)
+
+def extract_phone_numbers(vcf_filepath, txt_filepath, output_format=FORMAT_TXT, job=None):
+    return write_contacts(iter_vcf_contacts(vcf_filepath), txt_filepath, output_format, job)
+
+def run_vcf_to_txt(job, input_path):
+    source, _ = resolve_input(input_path, job.file_name, ('.vcf',))
+    output_format = job.params.get('format', FORMAT_TXT)
+    txt_filename = output_name(job.file_name, 'vcf').replace('.vcf', f".{output_extension(output_format)}")
+    txt_filepath = job.path(txt_filename)
+    total_numbers = extract_phone_numbers(source, txt_filepath, output_format, job)
     
-    with open(txt_filepath, 'w', encoding='utf-8') as f:
-        for vcard in vcard_list:
-            if hasattr(vcard, 'tel'):
-                for tel in vcard.tel_list:
-                    f.write(tel.value + '\n')
+    return {
+        "outputs": [(txt_filepath, txt_filename)],
+        "caption": f"✅ Berhasil extract VCF to TXT!\n📂 Total: {total_numbers} nomor",
+    }
+
+register_job("vcf_to_txt", run_vcf_to_txt)
 
 async def vcf_to_txt_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
@@ -27,6 +41,9 @@ async def vcf_to_txt_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await send_access_denied(update, user_role, "VIP")
         return ConversationHandler.END
     
+    if not await ensure_daily_quota(update):
+        return ConversationHandler.END
+    
     cancel_keyboard = ReplyKeyboardMarkup([[KeyboardButton("❌ BATAL ❌")]], resize_keyboard=True)
     
     text = """```
@@ -53,43 +70,28 @@ async def vcf_to_txt_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("```\n❌ Kirim file .vcf!\n```", parse_mode="Markdown")
         return ASK_FILE
     
-    if not update.message.document.file_name.endswith('.vcf'):
-        await update.message.reply_text("```\n❌ File harus berformat .vcf!\n```", parse_mode="Markdown")
+    if not accepts(update.message.document.file_name, ('.vcf',)):
+        await update.message.reply_text("```\n❌ File harus berformat .vcf, .zip atau .gz!\n```", parse_mode="Markdown")
         return ASK_FILE
     
-    file = await update.message.document.get_file()
-    vcf_filepath = f"temp_{update.effective_user.id}_{update.message.document.file_name}"
-    await file.download_to_drive(vcf_filepath)
-    
-    txt_filename = update.message.document.file_name.replace('.vcf', '.txt')
-    txt_filepath = f"temp_{update.effective_user.id}_{txt_filename}"
+    context.user_data['vcf_document'] = describe_document(update.message.document)
     
-    keyboard = get_main_menu_keyboard(update.effective_user.id)
-    
-    try:
-        extract_phone_numbers(vcf_filepath, txt_filepath)
-        
-        with open(txt_filepath, 'r') as f:
-            total_numbers = len(f.readlines())
-        
-        await update.message.reply_document(
-            document=open(txt_filepath, 'rb'),
-            filename=txt_filename,
-            caption=f"✅ Berhasil extract VCF to TXT!\n📂 Total: {total_numbers} nomor",
-            reply_markup=keyboard
-        )
-        
-        user_data = get_user_data(update.effective_user.id)
-        total_ops = user_data.get("total_operations", 0) + 1
-        update_user_data(update.effective_user.id, {"total_operations": total_ops})
-        
-    except Exception as e:
-        await update.message.reply_text(f"```\n❌ Error: {str(e)}\n```",
+    await update.message.reply_text(format_prompt(NUMBER_FORMATS, update.message.document.file_name),
+            parse_mode="Markdown", reply_markup=get_format_keyboard(NUMBER_FORMATS))
+    return ASK_FORMAT
+
+async def vcf_to_txt_format(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.message.text == "❌ BATAL ❌":
+        context.user_data.pop('vcf_document', None)
+        keyboard = get_main_menu_keyboard(update.effective_user.id)
+        await update.message.reply_text("```\n❌ Proses dibatalkan\n```",
                 parse_mode="Markdown", reply_markup=keyboard)
-    finally:
-        if os.path.exists(vcf_filepath):
-            os.remove(vcf_filepath)
-        if os.path.exists(txt_filepath):
-            os.remove(txt_filepath)
+        return ConversationHandler.END
+    
+    output_format = parse_format(update.message.text, NUMBER_FORMATS)
+    if output_format is None:
+        await update.message.reply_text("```\n❌ Pilih format dari tombol!\n```", parse_mode="Markdown")
+        return ASK_FORMAT
     
-    return ConversationHandler.END
+    document = context.user_data.pop('vcf_document')
+    return await enqueue_file_job(update, "vcf_to_txt", document, {"format": output_format})
@@ -1,29 +1,30 @@
 import os
-from openpyxl import load_workbook
+import asyncio
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ContextTypes, ConversationHandler
-from commands.vip_system import check_access, send_access_denied, get_user_role, update_user_data, get_user_data
+from commands.vip_system import check_access, send_access_denied, get_user_role, update_user_data, get_user_data, ensure_daily_quota, consume_daily_quota, refund_daily_quota
 from commands.menu import get_main_menu_keyboard
+from commands.file_jobs import admit_upload, get_format_keyboard, parse_format, format_prompt
+from utils.lazy_import import lazy_module
+from utils.progress import ProgressReporter, OperationCancelled
+from utils.contact_writers import Contact, write_contacts, output_extension, CONTACT_FORMATS, FORMAT_VCF30
 
-ASK_FILE, ASK_FILENAME, ASK_CONTACTNAME = range(3)
-
-def create_vcf_from_excel(phone_numbers, contact_name, filename):
-    with open(filename, 'w', encoding='utf-8') as f:
-        for i, phone in enumerate(phone_numbers, start=1):
-            phone_str = str(phone).strip().replace('+', '')
-            if phone_str and phone_str.replace('.', '').isnumeric():
-                phone_str = phone_str.split('.')[0]
-                if not phone_str.startswith('0'):
-                    phone_str = '+' + phone_str
-                
-                vcf_entry = f"""BEGIN:VCARD
-VERSION:3.0
-FN:{contact_name} {str(i).zfill(4)}
-TEL;TYPE=CELL:{phone_str}
-END:VCARD
-
-"""
-                f.write(vcf_entry)
+openpyxl = lazy_module("openpyxl")
+
+ASK_FILE, ASK_FILENAME, ASK_CONTACTNAME, ASK_FORMAT = range(4)
+
+def iter_excel_contacts(phone_numbers, contact_name):
+    for i, phone in enumerate(phone_numbers, start=1):
+        phone_str = str(phone).strip().replace('+', '')
+        if phone_str and phone_str.replace('.', '').isnumeric():
+            phone_str = phone_str.split('.')[0]
+            if not phone_str.startswith('0'):
+                phone_str = '+' + phone_str
+            yield Contact(f"{contact_name} {str(i).zfill(4)}", phone_str)
+
+def create_vcf_from_excel(phone_numbers, contact_name, filename, reporter=None, output_format=FORMAT_VCF30):
+    return write_contacts(iter_excel_contacts(phone_numbers, contact_name), filename, output_format,
+                          reporter, len(phone_numbers))
 
 async def xls_to_vcf_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
@@ -33,6 +34,9 @@ async def xls_to_vcf_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await send_access_denied(update, user_role, "VIP")
         return ConversationHandler.END
     
+    if not await ensure_daily_quota(update):
+        return ConversationHandler.END
+    
     cancel_keyboard = ReplyKeyboardMarkup([[KeyboardButton("❌ BATAL ❌")]], resize_keyboard=True)
     
     text = """```
@@ -63,12 +67,15 @@ async def xls_to_vcf_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("```\n❌ File harus berformat .xls atau .xlsx!\n```", parse_mode="Markdown")
         return ASK_FILE
     
+    if not await admit_upload(update, update.message.document.file_size):
+        return ConversationHandler.END
+    
     file = await update.message.document.get_file()
     filepath = f"temp_{update.effective_user.id}_{update.message.document.file_name}"
     await file.download_to_drive(filepath)
     
     try:
-        wb = load_workbook(filepath)
+        wb = openpyxl.load_workbook(filepath)
         ws = wb.active
         all_numbers = []
         
@@ -93,32 +100,52 @@ async def xls_to_vcf_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
         context.user_data['phone_numbers'] = phone_numbers
         context.user_data['xls_filepath'] = filepath
         
-        cancel_keyboard = ReplyKeyboardMarkup([[KeyboardButton("❌ BATAL ❌")]], resize_keyboard=True)
+        await update.message.reply_text(format_prompt(CONTACT_FORMATS, update.message.document.file_name),
+                parse_mode="Markdown", reply_markup=get_format_keyboard(CONTACT_FORMATS))
+        return ASK_FORMAT
         
-        text = f"""```
-📝 NAMA FILE VCF
+    except Exception as e:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        keyboard = get_main_menu_keyboard(update.effective_user.id)
+        await update.message.reply_text(f"```\n❌ Error reading Excel: {str(e)}\n```",
+                parse_mode="Markdown", reply_markup=keyboard)
+        return ConversationHandler.END
+
+async def xls_to_vcf_format(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.message.text == "❌ BATAL ❌":
+        if 'xls_filepath' in context.user_data and os.path.exists(context.user_data['xls_filepath']):
+            os.remove(context.user_data['xls_filepath'])
+        keyboard = get_main_menu_keyboard(update.effective_user.id)
+        await update.message.reply_text("```\n❌ Proses dibatalkan\n```",
+                parse_mode="Markdown", reply_markup=keyboard)
+        return ConversationHandler.END
+    
+    output_format = parse_format(update.message.text, CONTACT_FORMATS)
+    if output_format is None:
+        await update.message.reply_text("```\n❌ Pilih format dari tombol!\n```", parse_mode="Markdown")
+        return ASK_FORMAT
+    
+    context.user_data['xls_format'] = output_format
+    
+    cancel_keyboard = ReplyKeyboardMarkup([[KeyboardButton("❌ BATAL ❌")]], resize_keyboard=True)
+    
+    text = f"""```
+📝 NAMA FILE OUTPUT
 ───────────────────────────────────────
 
-Total nomor ditemukan: {len(phone_numbers)}
+Total nomor ditemukan: {len(context.user_data.get('phone_numbers', []))}
 
 Masukkan nama file output
-(tanpa ekstensi .vcf)
+(tanpa ekstensi .{output_extension(output_format)})
 
 Contoh: kontak
 
 ───────────────────────────────────────
 ```"""
-        
-        await update.message.reply_text(text, parse_mode="Markdown", reply_markup=cancel_keyboard)
-        return ASK_FILENAME
-        
-    except Exception as e:
-        if os.path.exists(filepath):
-            os.remove(filepath)
-        keyboard = get_main_menu_keyboard(update.effective_user.id)
-        await update.message.reply_text(f"```\n❌ Error reading Excel: {str(e)}\n```",
-                parse_mode="Markdown", reply_markup=keyboard)
-        return ConversationHandler.END
+    
+    await update.message.reply_text(text, parse_mode="Markdown", reply_markup=cancel_keyboard)
+    return ASK_FILENAME
 
 async def xls_to_vcf_filename(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.message.text == "❌ BATAL ❌":
@@ -160,18 +187,26 @@ async def xls_to_vcf_contactname(update: Update, context: ContextTypes.DEFAULT_T
     
     contact_name = update.message.text.strip()
     phone_numbers = context.user_data.get('phone_numbers', [])
-    vcf_filename = context.user_data.get('vcf_filename', 'output')
+    output_format = context.user_data.pop('xls_format', FORMAT_VCF30)
+    vcf_filename = f"{context.user_data.get('vcf_filename', 'output')}.{output_extension(output_format)}"
     
-    vcf_filepath = f"temp_{update.effective_user.id}_{vcf_filename}.vcf"
+    vcf_filepath = f"temp_{update.effective_user.id}_{vcf_filename}"
     
-    create_vcf_from_excel(phone_numbers, contact_name, vcf_filepath)
+    if not await consume_daily_quota(update):
+        if 'xls_filepath' in context.user_data and os.path.exists(context.user_data['xls_filepath']):
+            os.remove(context.user_data['xls_filepath'])
+        return ConversationHandler.END
     
     keyboard = get_main_menu_keyboard(update.effective_user.id)
+    reporter = ProgressReporter(context.bot, update.effective_chat.id, "XLS TO VCF", update.effective_user.id).start()
     
     try:
+        await asyncio.to_thread(create_vcf_from_excel, phone_numbers, contact_name, vcf_filepath, reporter, output_format)
+        await reporter.finish()
+        
         await update.message.reply_document(
             document=open(vcf_filepath, 'rb'),
-            filename=f"{vcf_filename}.vcf",
+            filename=vcf_filename,
             caption=f"✅ Berhasil convert XLS to VCF!\n📂 Total: {len(phone_numbers)} kontak",
             reply_markup=keyboard
         )
@@ -180,10 +215,16 @@ async def xls_to_vcf_contactname(update: Update, context: ContextTypes.DEFAULT_T
         total_ops = user_data.get("total_operations", 0) + 1
         update_user_data(update.effective_user.id, {"total_operations": total_ops})
         
+    except OperationCancelled:
+        refund_daily_quota(update.effective_user.id)
+        await update.message.reply_text("```\n❌ Proses dibatalkan\n```",
+                parse_mode="Markdown", reply_markup=keyboard)
     except Exception as e:
+        refund_daily_quota(update.effective_user.id)
         await update.message.reply_text(f"```\n❌ Error: {str(e)}\n```",
                 parse_mode="Markdown", reply_markup=keyboard)
     finally:
+        await reporter.finish()
         if 'xls_filepath' in context.user_data and os.path.exists(context.user_data['xls_filepath']):
             os.remove(context.user_data['xls_filepath'])
         if os.path.exists(vcf_filepath):
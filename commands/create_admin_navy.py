@@ -2,24 +2,22 @@ import os
 import re
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ContextTypes, ConversationHandler
-from commands.vip_system import check_access, send_access_denied, get_user_role, update_user_data, get_user_data
+from commands.vip_system import check_access, send_access_denied, get_user_role, update_user_data, get_user_data, ensure_daily_quota, consume_daily_quota, refund_daily_quota
 from commands.menu import get_main_menu_keyboard
+from commands.file_jobs import get_format_keyboard, parse_format, format_prompt
+from utils.contact_writers import Contact, format_phone, write_contacts, output_extension, CONTACT_FORMATS
 
-ASK_MODE, ASK_ADMIN_NUM, ASK_NAVY_NUM, ASK_FILENAME, ASK_CONTACTNAME, ASK_BLOCK_INPUT = range(6)
+ASK_MODE, ASK_ADMIN_NUM, ASK_NAVY_NUM, ASK_FILENAME, ASK_CONTACTNAME, ASK_BLOCK_INPUT, ASK_FORMAT = range(7)
 
-def create_vcf_entry(phone_number, contact_name):
-    phone_str = str(phone_number).strip()
-    if not phone_str.startswith('+') and not phone_str.startswith('0'):
-        phone_str = '+' + phone_str
+def iter_admin_navy_contacts(admin_numbers, navy_numbers, contact_format):
+    index = 1
+    for phone in admin_numbers:
+        yield Contact(f"{contact_format} {str(index).zfill(2)}", format_phone(phone))
+        index += 1
     
-    vcf_entry = f"""BEGIN:VCARD
-VERSION:3.0
-FN:{contact_name}
-TEL;TYPE=CELL:{phone_str}
-END:VCARD
-
-"""
-    return vcf_entry
+    for phone in navy_numbers:
+        yield Contact(f"navy {str(index).zfill(2)}", format_phone(phone))
+        index += 1
 
 async def create_admin_navy_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
@@ -29,6 +27,9 @@ async def create_admin_navy_start(update: Update, context: ContextTypes.DEFAULT_
         await send_access_denied(update, user_role, "VIP")
         return ConversationHandler.END
     
+    if not await ensure_daily_quota(update):
+        return ConversationHandler.END
+    
     mode_keyboard = ReplyKeyboardMarkup([
         [KeyboardButton("MODE A - GUIDED")],
         [KeyboardButton("MODE B - AUTO PARSE")],
@@ -154,7 +155,7 @@ async def create_admin_navy_admin(update: Update, context: ContextTypes.DEFAULT_
 ───────────────────────────────────────
 
 Masukkan nama file output
-(tanpa ekstensi .vcf)
+(tanpa ekstensi)
 
 Contoh: ADMIN DAN NAVY
 
@@ -198,7 +199,7 @@ async def create_admin_navy_navy(update: Update, context: ContextTypes.DEFAULT_T
 ───────────────────────────────────────
 
 Masukkan nama file output
-(tanpa ekstensi .vcf)
+(tanpa ekstensi)
 
 Contoh: ADMIN DAN NAVY
 
@@ -241,33 +242,44 @@ async def create_admin_navy_generate(update: Update, context: ContextTypes.DEFAU
                 parse_mode="Markdown", reply_markup=keyboard)
         return ConversationHandler.END
     
-    contact_format = update.message.text.strip()
+    context.user_data['navy_contact_format'] = update.message.text.strip()
+    
+    await update.message.reply_text(format_prompt(CONTACT_FORMATS), parse_mode="Markdown",
+            reply_markup=get_format_keyboard(CONTACT_FORMATS))
+    return ASK_FORMAT
+
+async def create_admin_navy_format(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.message.text == "❌ BATAL ❌":
+        keyboard = get_main_menu_keyboard(update.effective_user.id)
+        await update.message.reply_text("```\n❌ Proses dibatalkan\n```",
+                parse_mode="Markdown", reply_markup=keyboard)
+        return ConversationHandler.END
+    
+    output_format = parse_format(update.message.text, CONTACT_FORMATS)
+    if output_format is None:
+        await update.message.reply_text("```\n❌ Pilih format dari tombol!\n```", parse_mode="Markdown")
+        return ASK_FORMAT
+    
+    contact_format = context.user_data.pop('navy_contact_format', '')
     admin_numbers = context.user_data.get('admin_numbers', [])
     navy_numbers = context.user_data.get('navy_numbers', [])
-    vcf_filename = context.user_data.get('vcf_filename', 'output')
+    vcf_filename = f"{context.user_data.get('vcf_filename', 'output')}.{output_extension(output_format)}"
+    
+    vcf_filepath = f"temp_{update.effective_user.id}_{vcf_filename}"
     
-    vcf_filepath = f"temp_{update.effective_user.id}_{vcf_filename}.vcf"
+    if not await consume_daily_quota(update):
+        return ConversationHandler.END
     
     keyboard = get_main_menu_keyboard(update.effective_user.id)
     
     try:
-        with open(vcf_filepath, 'w', encoding='utf-8') as f:
-            index = 1
-            for phone in admin_numbers:
-                vcf_entry = create_vcf_entry(phone, f"{contact_format} {str(index).zfill(2)}")
-                f.write(vcf_entry)
-                index += 1
-            
-            for phone in navy_numbers:
-                vcf_entry = create_vcf_entry(phone, f"navy {str(index).zfill(2)}")
-                f.write(vcf_entry)
-                index += 1
+        write_contacts(iter_admin_navy_contacts(admin_numbers, navy_numbers, contact_format), vcf_filepath, output_format)
         
         total_contacts = len(admin_numbers) + len(navy_numbers)
         
         await update.message.reply_document(
             document=open(vcf_filepath, 'rb'),
-            filename=f"{vcf_filename}.vcf",
+            filename=vcf_filename,
             caption=f"✅ Berhasil create ADMIN & NAVY!\n📂 Total: {total_contacts} kontak\n   Admin: {len(admin_numbers)} | Navy: {len(navy_numbers)}",
             reply_markup=keyboard
         )
@@ -277,6 +289,7 @@ async def create_admin_navy_generate(update: Update, context: ContextTypes.DEFAU
         update_user_data(update.effective_user.id, {"total_operations": total_ops})
         
     except Exception as e:
+        refund_daily_quota(update.effective_user.id)
         await update.message.reply_text(f"```\n❌ Error: {str(e)}\n```",
                 parse_mode="Markdown", reply_markup=keyboard)
     finally:
@@ -329,7 +342,7 @@ Admin: {len(admin_numbers)}
 Navy: {len(navy_numbers)}
 
 Masukkan nama file output
-(tanpa ekstensi .vcf)
+(tanpa ekstensi)
 
 ───────────────────────────────────────
 ```"""
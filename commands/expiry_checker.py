@@ -1,39 +1,40 @@
-import json
-from datetime import datetime
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
 from telegram.ext import ContextTypes
 
-async def check_and_notify_expired_users(context: ContextTypes.DEFAULT_TYPE):
-    try:
-        with open("users.json", "r") as f:
-            users = json.load(f)
-        
-        for user_id, user_data in users.items():
-            if user_data.get("role") in ["VIP", "PREMIUM"]:
-                expired = user_data.get("expired")
-                
-                if expired:
-                    if isinstance(expired, str):
-                        try:
-                            expired_dt = datetime.strptime(expired, "%Y-%m-%d %H:%M:%S")
-                        except:
-                            continue
-                    else:
-                        expired_dt = expired
-                    
-                    now = datetime.now()
-                    time_diff = (expired_dt - now).total_seconds()
-                    remaining_hours = time_diff / 3600
-                    
-                    notified_soon = user_data.get("expiry_notified_soon", False)
-                    notified = user_data.get("expiry_notified", False)
-                    
-                    if 0 < time_diff <= 86400 and not notified_soon:
-                        remaining_hours_int = int(remaining_hours)
-                        notification = f"""```
+from config import DATE_FORMAT, VIP_EXPIRY_WARNING_HOURS
+from commands.vip_system import load_users, save_users
+from utils.metrics import metrics
+from utils.notification_sender import notification_sender
+from utils.expiry_scheduler import expiry_scheduler
+
+logger = logging.getLogger(__name__)
+
+EXPIRY_INTERVAL = 60
+EXPIRY_BATCH_SIZE = 1000
+WARNING_LEAD = timedelta(hours=VIP_EXPIRY_WARNING_HOURS)
+JSON_KEY = "users_json"
+
+pending_json_warnings = {}
+
+db_available = False
+try:
+    from database.models import VIPAccessModel, VVIPAccessModel
+    ACCESS_MODELS = {"vip_access": VIPAccessModel, "vvip_access": VVIPAccessModel}
+    from database.connection import get_db
+    db_available = True
+except ImportError:
+    pass
+
+
+def build_warning_text(expired_dt: datetime, remaining_hours: int) -> str:
+    return f"""```
 ⏰ PERINGATAN! MASA AKTIF AKAN HABIS SOON!
 
 Akses VIP Anda akan berakhir dalam
-⏳ {remaining_hours_int} jam lagi!
+⏳ {remaining_hours} jam lagi!
 
 ⌛ Tanggal Berakhir: {expired_dt.strftime('%d-%m-%Y %H:%M')}
 
@@ -44,22 +45,10 @@ Untuk melanjutkan akses, segera:
 
 Jangan lewatkan! 🏃
 ```"""
-                        
-                        try:
-                            await context.bot.send_message(
-                                chat_id=int(user_id),
-                                text=notification,
-                                parse_mode="HTML"
-                            )
-                            
-                            users[user_id]["expiry_notified_soon"] = True
-                            with open("users.json", "w") as f:
-                                json.dump(users, f, indent=2)
-                        except Exception as e:
-                            pass
-                    
-                    if time_diff <= 0 and not notified:
-                        notification = f"""```
+
+
+def build_expired_text(expired_dt: datetime) -> str:
+    return f"""```
 ⏰ NOTIFIKASI MASA AKTIF HABIS
 
 Masa aktif VIP/PREMIUM Anda sudah habis!
@@ -74,19 +63,201 @@ Untuk melanjutkan akses, silakan:
 
 Terima kasih telah menggunakan layanan kami! 🙏
 ```"""
-                        
-                        try:
-                            await context.bot.send_message(
-                                chat_id=int(user_id),
-                                text=notification,
-                                parse_mode="HTML"
-                            )
-                            
-                            users[user_id]["expiry_notified"] = True
-                            users[user_id]["role"] = "FREE"
-                            with open("users.json", "w") as f:
-                                json.dump(users, f, indent=2)
-                        except Exception as e:
-                            pass
+
+
+class ExpiryEngine:
+    def __init__(self, interval: float = EXPIRY_INTERVAL, batch_size: int = EXPIRY_BATCH_SIZE):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.last_run = None
+        self.last_expired = 0
+        self.total_expired = 0
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def start(self, bot):
+        notification_sender.start(bot)
+        expiry_scheduler.start(fire_expiry_warning, flush_json_warnings)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        await expiry_scheduler.stop()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        try:
+            await load_warning_schedule()
+        except Exception as e:
+            logger.error(f"Failed to load expiry warning schedule: {e}")
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Expiry engine error: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> int:
+        async with self._lock:
+            started = asyncio.get_running_loop().time()
+            notified = set()
+
+            expired_rows = await self._expire_database()
+            for row in expired_rows:
+                if row["user_id"] in notified:
+                    continue
+                notified.add(row["user_id"])
+                notification_sender.enqueue(row["user_id"], build_expired_text(row["expired_at"]))
+
+            outgoing, json_expired = self._process_json_store(notified)
+            for user_id, text in outgoing:
+                notification_sender.enqueue(user_id, text)
+
+            count = len(expired_rows) + json_expired
+            self.last_run = datetime.now()
+            self.last_expired = count
+            self.total_expired += count
+            metrics.observe("expiry_run_seconds", "all", asyncio.get_running_loop().time() - started)
+            if count:
+                metrics.inc("expired_subscriptions_total", "all", count)
+                logger.info(f"Expiry engine expired {count} subscriptions")
+            return count
+
+    async def _expire_database(self) -> list:
+        if not db_available or not get_db().is_connected:
+            return []
+        expired = []
+        now = datetime.utcnow()
+        for model in (VIPAccessModel, VVIPAccessModel):
+            while True:
+                rows = await model.expire_due(now, self.batch_size)
+                expired.extend(rows)
+                if len(rows) < self.batch_size:
+                    break
+        return expired
+
+    def _process_json_store(self, skip: set) -> tuple:
+        users = load_users()
+        now = datetime.now()
+        outgoing = []
+        expired = 0
+        changed = False
+
+        for user_id, user_data in users.items():
+            if user_data.get("role") not in ["VIP", "PREMIUM"]:
+                continue
+            expired_dt = user_data.get("expired")
+            if not isinstance(expired_dt, datetime):
+                continue
+
+            if expired_dt <= now and not user_data.get("expiry_notified", False):
+                user_data["expiry_notified"] = True
+                expired += 1
+                changed = True
+                if int(user_id) not in skip:
+                    outgoing.append((int(user_id), build_expired_text(expired_dt)))
+
+        if changed:
+            save_users(users)
+        return outgoing, expired
+
+
+def schedule_json_warning(user_id: int, expired_dt: datetime):
+    if not isinstance(expired_dt, datetime):
+        expiry_scheduler.cancel((JSON_KEY, user_id))
+        return
+    utc_expiry = datetime.utcnow() + (expired_dt - datetime.now())
+    expiry_scheduler.schedule(
+        (JSON_KEY, user_id),
+        utc_expiry - WARNING_LEAD,
+        {"expired": expired_dt.strftime(DATE_FORMAT)}
+    )
+
+
+async def load_warning_schedule() -> int:
+    loaded = 0
+    if db_available and get_db().is_connected:
+        for table, model in ACCESS_MODELS.items():
+            for row in await model.get_pending_warnings():
+                expiry_scheduler.schedule((table, row["user_id"]), row["expired_at"] - WARNING_LEAD, {"expired_at": row["expired_at"]})
+                loaded += 1
+
+    now = datetime.now()
+    for user_id, user_data in load_users().items():
+        expired_dt = user_data.get("expired")
+        if user_data.get("role") not in ["VIP", "PREMIUM"] or not isinstance(expired_dt, datetime) or expired_dt <= now:
+            continue
+        if user_data.get("expiry_warned_for") == expired_dt.strftime(DATE_FORMAT):
+            continue
+        schedule_json_warning(int(user_id), expired_dt)
+        loaded += 1
+
+    logger.info(f"Expiry warning schedule loaded: {loaded} pending warnings")
+    return loaded
+
+
+async def fire_expiry_warning(key: tuple, fire_at: datetime, payload: dict):
+    source, user_id = key
+
+    if source == JSON_KEY:
+        pending_json_warnings[user_id] = payload.get("expired")
+        return
+
+    if not db_available or source not in ACCESS_MODELS:
+        return
+    expired_at = payload["expired_at"]
+    if not await ACCESS_MODELS[source].mark_warned(user_id, expired_at):
+        return
+    send_expiry_warning(user_id, source, expired_at, expired_at - datetime.utcnow())
+
+
+async def flush_json_warnings():
+    if not pending_json_warnings:
+        return
+    pending = dict(pending_json_warnings)
+    pending_json_warnings.clear()
+
+    users = load_users()
+    now = datetime.now()
+    warned = []
+    for user_id, expected in pending.items():
+        user_data = users.get(str(user_id), {})
+        expired_dt = user_data.get("expired")
+        if user_data.get("role") not in ["VIP", "PREMIUM"] or not isinstance(expired_dt, datetime):
+            continue
+        expired_str = expired_dt.strftime(DATE_FORMAT)
+        if expired_str != expected or user_data.get("expiry_warned_for") == expired_str:
+            continue
+        user_data["expiry_warned_for"] = expired_str
+        user_data["expiry_notified_soon"] = True
+        warned.append((user_id, expired_dt))
+
+    if not warned:
+        return
+    save_users(users)
+    for user_id, expired_dt in warned:
+        send_expiry_warning(user_id, JSON_KEY, expired_dt, expired_dt - now)
+
+
+def send_expiry_warning(user_id: int, source: str, expired_dt: datetime, remaining: timedelta):
+    if remaining.total_seconds() <= 0:
+        return
+    notification_sender.enqueue(user_id, build_warning_text(expired_dt, int(remaining.total_seconds() // 3600)))
+    metrics.inc("expiry_warnings_total", source)
+
+
+expiry_engine = ExpiryEngine()
+
+
+async def check_and_notify_expired_users(context: ContextTypes.DEFAULT_TYPE):
+    notification_sender.start(context.bot)
+    try:
+        await expiry_engine.run_once()
     except Exception as e:
-        pass
+        logger.error(f"Expiry check error: {e}")
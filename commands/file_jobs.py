@@ -0,0 +1,215 @@
+import logging
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
+from telegram.error import BadRequest
+from telegram.ext import ContextTypes, ConversationHandler
+
+from commands.menu import get_main_menu_keyboard
+from commands.vip_system import consume_daily_quota, refund_daily_quota
+from utils.file_jobs import file_job_queue, STATUS_PENDING, STATUS_RUNNING
+from utils.result_cache import result_cache, build_cache_key
+from utils.contact_writers import (
+    CONTACT_WRITERS, FORMAT_VCF21, FORMAT_VCF30, FORMAT_VCF40, FORMAT_CSV, FORMAT_JSONL, FORMAT_XLSX, FORMAT_TXT
+)
+
+logger = logging.getLogger(__name__)
+
+STATUS_LABELS = {
+    "pending": "⏳ Antri",
+    "running": "⚙️ Proses",
+    "done": "✅ Selesai",
+    "failed": "❌ Gagal",
+    "cancelled": "🚫 Batal",
+}
+
+OPERATION_LABELS = {
+    "txt_to_vcf": "TXT TO VCF",
+    "vcf_to_txt": "VCF TO TXT",
+    "rapikan_txt": "RAPIKAN TXT",
+    "split_file": "SPLIT FILE",
+    "sort_file": "SORT FILE",
+    "pipeline": "PIPELINE",
+}
+
+
+FORMAT_DESCRIPTIONS = {
+    FORMAT_VCF30: "Standar, semua HP",
+    FORMAT_VCF21: "HP lama / feature phone",
+    FORMAT_VCF40: "HP & aplikasi baru",
+    FORMAT_CSV: "Kolom nama, nomor",
+    FORMAT_JSONL: "Satu kontak per baris",
+    FORMAT_XLSX: "File Excel",
+    FORMAT_TXT: "Nomor saja",
+}
+
+
+def format_button(output_format: str) -> str:
+    return f"🜲 {CONTACT_WRITERS[output_format].label} 🜲"
+
+
+def get_format_keyboard(formats) -> ReplyKeyboardMarkup:
+    buttons = [KeyboardButton(format_button(output_format)) for output_format in formats]
+    rows = [buttons[i:i + 3] for i in range(0, len(buttons), 3)]
+    rows.append([KeyboardButton("❌ BATAL ❌")])
+    return ReplyKeyboardMarkup(rows, resize_keyboard=True)
+
+
+def format_prompt(formats, file_name: str = None) -> str:
+    lines = "\n".join(
+        f"{CONTACT_WRITERS[output_format].label:<8} {FORMAT_DESCRIPTIONS[output_format]}" for output_format in formats
+    )
+    header = f"File: {file_name}\n\n" if file_name else ""
+    return f"""```
+📄 FORMAT OUTPUT
+───────────────────────────────────────
+
+{header}{lines}
+
+───────────────────────────────────────
+```"""
+
+
+def parse_format(text: str, formats):
+    return next((output_format for output_format in formats if format_button(output_format) == text), None)
+
+
+async def send_cached_result(update: Update, entry: dict, keyboard):
+    outputs = entry["outputs"]
+    for index, output in enumerate(outputs):
+        last = index == len(outputs) - 1
+        await update.message.reply_document(
+            document=output["file_id"],
+            caption=entry.get("caption") if last else None,
+            parse_mode=entry.get("parse_mode") if last else None,
+            reply_markup=keyboard if last else None
+        )
+
+
+async def admit_upload(update: Update, file_size: int, end: bool = True) -> bool:
+    user_id = update.effective_user.id
+    is_admitted, reason = await file_job_queue.admit(user_id, file_size or 0)
+    if not is_admitted:
+        await update.message.reply_text(f"```\n🚫 {reason}\n```", parse_mode="Markdown",
+                reply_markup=get_main_menu_keyboard(user_id) if end else None)
+    return is_admitted
+
+
+async def enqueue_file_job(update: Update, operation: str, document, params: dict = None):
+    user_id = update.effective_user.id
+    keyboard = get_main_menu_keyboard(user_id)
+    cache_key = build_cache_key(document.get("file_unique_id"), operation, {**(params or {}), "file_name": document["file_name"]})
+
+    if not await consume_daily_quota(update):
+        return ConversationHandler.END
+
+    entry = await result_cache.lookup(cache_key)
+    if entry is not None:
+        try:
+            await send_cached_result(update, entry, keyboard)
+            return ConversationHandler.END
+        except BadRequest as e:
+            logger.warning(f"Cached result for {operation} no longer valid: {e}")
+            result_cache.invalidate(cache_key)
+
+    if not await admit_upload(update, document.get("file_size") or 0):
+        refund_daily_quota(user_id)
+        return ConversationHandler.END
+
+    try:
+        job = await file_job_queue.submit(
+            user_id=user_id,
+            chat_id=update.effective_chat.id,
+            operation=operation,
+            file_id=document["file_id"],
+            file_name=document["file_name"],
+            file_size=document.get("file_size") or 0,
+            params=params,
+            cache_key=cache_key
+        )
+    except Exception as e:
+        logger.error(f"File job submit error: {e}")
+        refund_daily_quota(user_id)
+        await update.message.reply_text(f"```\n❌ Error: {str(e)}\n```",
+                parse_mode="Markdown", reply_markup=keyboard)
+        return ConversationHandler.END
+
+    if job["id"] > 0:
+        text = f"""```
+⏳ JOB #{job['id']} MASUK ANTRIAN
+───────────────────────────────────────
+
+File akan dikirim otomatis setelah
+selesai diproses, walaupun bot restart.
+
+Ketik /jobs untuk melihat status.
+───────────────────────────────────────
+```"""
+    else:
+        text = "```\n⏳ File sedang diproses...\n```"
+
+    await update.message.reply_text(text, parse_mode="Markdown", reply_markup=keyboard)
+    return ConversationHandler.END
+
+
+def describe_document(document) -> dict:
+    return {
+        "file_id": document.file_id,
+        "file_unique_id": document.file_unique_id,
+        "file_name": document.file_name,
+        "file_size": document.file_size,
+    }
+
+
+async def render_job_history(user_id: int):
+    jobs = await file_job_queue.history(user_id)
+
+    if not jobs:
+        return "```\n📂 Belum ada riwayat job.\n```", None
+
+    text = "```\n📂 RIWAYAT JOB\n───────────────────────────────────────\n"
+    buttons = []
+    for job in jobs:
+        status = job.get("status")
+        label = OPERATION_LABELS.get(job.get("operation"), job.get("operation") or "-")
+        job_ref = f"#{job['id']}" if job["id"] > 0 else "lokal"
+        line = f"{job_ref} {label} • {STATUS_LABELS.get(status, status)}"
+        if status == STATUS_RUNNING:
+            line += f" {job.get('progress') or 0}%"
+        text += line + "\n"
+        if job.get("file_name"):
+            text += f"   {job['file_name']}\n"
+        if status in (STATUS_PENDING, STATUS_RUNNING):
+            buttons.append([InlineKeyboardButton(f"🚫 Batalkan {job_ref}", callback_data=f"job_cancel:{job['id']}")])
+    text += "───────────────────────────────────────\n```"
+
+    buttons.append([InlineKeyboardButton("🔄 Refresh", callback_data="job_refresh")])
+    return text, InlineKeyboardMarkup(buttons)
+
+
+async def show_job_history(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    text, reply_markup = await render_job_history(update.effective_user.id)
+    await update.message.reply_text(text, parse_mode="Markdown", reply_markup=reply_markup)
+
+
+async def job_history_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    user_id = query.from_user.id
+
+    if query.data.startswith("job_cancel:"):
+        try:
+            job_id = int(query.data.split(":", 1)[1])
+        except ValueError:
+            await query.answer()
+            return
+        if await file_job_queue.cancel(job_id, user_id):
+            await query.answer("🚫 Job dibatalkan")
+        else:
+            await query.answer("Job sudah selesai atau tidak ditemukan.", show_alert=True)
+    else:
+        await query.answer()
+
+    text, reply_markup = await render_job_history(user_id)
+    try:
+        await query.edit_message_text(text, parse_mode="Markdown", reply_markup=reply_markup)
+    except BadRequest as e:
+        if "not modified" not in str(e).lower():
+            logger.error(f"Job history refresh error: {e}")
@@ -1,12 +1,35 @@
 import os
-import re
-import vobject
+import asyncio
+import logging
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ContextTypes, ConversationHandler
-from commands.vip_system import check_access, send_access_denied, get_user_role, update_user_data, get_user_data
+from commands.vip_system import check_access, send_access_denied, get_user_role, update_user_data, get_user_data, ensure_daily_quota, consume_daily_quota, refund_daily_quota
 from commands.menu import get_main_menu_keyboard
+from commands.file_jobs import admit_upload
+from utils.progress import ProgressReporter, OperationCancelled
+from utils.merge_engine import merge_files as run_merge, MERGE_CONCAT, MERGE_DEDUP, MERGE_SORTED
+from utils.archive import accepts, data_type, expand_input, source_type, DATA_EXTENSIONS
 
-ASK_FILES, ASK_FILENAME = range(2)
+logger = logging.getLogger(__name__)
+
+ASK_FILES, ASK_MODE, ASK_FILENAME = range(3)
+
+MERGE_MODE_BUTTONS = {
+    "🜲 GABUNG BIASA 🜲": MERGE_CONCAT,
+    "🜲 HAPUS DUPLIKAT 🜲": MERGE_DEDUP,
+    "🜲 URUTKAN + HAPUS DUPLIKAT 🜲": MERGE_SORTED,
+}
+
+async def download_document(document, filepath):
+    file = await document.get_file()
+    await file.download_to_drive(filepath)
+
+def discard_merge_files(user_data):
+    for task in user_data.pop('merge_downloads', []):
+        task.cancel()
+    for file_info in user_data.get('merge_files', []):
+        if os.path.exists(file_info['path']):
+            os.remove(file_info['path'])
 
 async def gabung_file_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
@@ -16,7 +39,11 @@ async def gabung_file_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await send_access_denied(update, user_role, "VIP")
         return ConversationHandler.END
     
+    if not await ensure_daily_quota(update):
+        return ConversationHandler.END
+    
     context.user_data['merge_files'] = []
+    context.user_data['merge_downloads'] = []
     
     cancel_keyboard = ReplyKeyboardMarkup([
         [KeyboardButton("✅ SELESAI ✅")],
@@ -28,7 +55,8 @@ async def gabung_file_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 ───────────────────────────────────────
 
 Kirim file-file yang ingin digabung
-(format .txt atau .vcf)
+(format .txt atau .vcf, atau satu
+.zip berisi banyak file)
 
 Kirim satu per satu, lalu tekan
 "✅ SELESAI ✅" jika sudah
@@ -41,35 +69,41 @@ Kirim satu per satu, lalu tekan
 
 async def gabung_file_collect(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.message.text == "❌ BATAL ❌":
-        for filepath in context.user_data.get('merge_files', []):
-            if os.path.exists(filepath['path']):
-                os.remove(filepath['path'])
+        discard_merge_files(context.user_data)
         keyboard = get_main_menu_keyboard(update.effective_user.id)
         await update.message.reply_text("```\n❌ Proses dibatalkan\n```",
                 parse_mode="Markdown", reply_markup=keyboard)
         return ConversationHandler.END
     
     if update.message.text == "✅ SELESAI ✅":
-        if len(context.user_data.get('merge_files', [])) < 2:
+        merge_files = context.user_data.get('merge_files', [])
+        if len(merge_files) < 2 and not any(file_info['name'].lower().endswith('.zip') for file_info in merge_files):
             await update.message.reply_text("```\n❌ Minimal 2 file untuk digabung!\n```", parse_mode="Markdown")
             return ASK_FILES
         
-        cancel_keyboard = ReplyKeyboardMarkup([[KeyboardButton("❌ BATAL ❌")]], resize_keyboard=True)
+        mode_keyboard = ReplyKeyboardMarkup(
+            [[KeyboardButton(label)] for label in MERGE_MODE_BUTTONS] + [[KeyboardButton("❌ BATAL ❌")]],
+            resize_keyboard=True
+        )
         
         text = f"""```
-📝 NAMA FILE OUTPUT
+🔀 MODE GABUNG
 ───────────────────────────────────────
 
 Total file: {len(context.user_data['merge_files'])}
 
-Masukkan nama file hasil gabungan
-(tanpa ekstensi)
+GABUNG BIASA
+  Isi file disambung sesuai urutan
+HAPUS DUPLIKAT
+  Urutan tetap, nomor/kontak ganda dibuang
+URUTKAN + HAPUS DUPLIKAT
+  Hasil diurutkan dan tanpa duplikat
 
 ───────────────────────────────────────
 ```"""
         
-        await update.message.reply_text(text, parse_mode="Markdown", reply_markup=cancel_keyboard)
-        return ASK_FILENAME
+        await update.message.reply_text(text, parse_mode="Markdown", reply_markup=mode_keyboard)
+        return ASK_MODE
     
     if not update.message.document:
         await update.message.reply_text("```\n❌ Kirim file .txt atau .vcf!\n```", parse_mode="Markdown")
@@ -77,21 +111,24 @@ Masukkan nama file hasil gabungan
     
     filename = update.message.document.file_name
     
-    if not (filename.endswith('.txt') or filename.endswith('.vcf')):
-        await update.message.reply_text("```\n❌ File harus .txt atau .vcf!\n```", parse_mode="Markdown")
+    if not accepts(filename, DATA_EXTENSIONS):
+        await update.message.reply_text("```\n❌ File harus .txt, .vcf, .zip atau .gz!\n```", parse_mode="Markdown")
         return ASK_FILES
     
-    file_type = 'txt' if filename.endswith('.txt') else 'vcf'
+    file_type = data_type(filename)
     
-    if context.user_data.get('merge_files'):
-        first_type = context.user_data['merge_files'][0]['type']
-        if file_type != first_type:
+    if file_type and context.user_data.get('merge_files'):
+        first_type = next((file_info['type'] for file_info in context.user_data['merge_files'] if file_info['type']), None)
+        if first_type and file_type != first_type:
             await update.message.reply_text(f"```\n❌ Semua file harus format .{first_type}!\n```", parse_mode="Markdown")
             return ASK_FILES
     
-    file = await update.message.document.get_file()
+    if not await admit_upload(update, update.message.document.file_size, end=False):
+        return ASK_FILES
+    
     filepath = f"temp_{update.effective_user.id}_{len(context.user_data.get('merge_files', []))}_{filename}"
-    await file.download_to_drive(filepath)
+    download = asyncio.create_task(download_document(update.message.document, filepath))
+    context.user_data.setdefault('merge_downloads', []).append(download)
     
     context.user_data['merge_files'].append({
         'path': filepath,
@@ -102,11 +139,41 @@ Masukkan nama file hasil gabungan
     await update.message.reply_text(f"```\n✅ File #{len(context.user_data['merge_files'])} ditambahkan!\n\nKirim file lagi atau tekan SELESAI\n```", parse_mode="Markdown")
     return ASK_FILES
 
+async def gabung_file_mode(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.message.text == "❌ BATAL ❌":
+        discard_merge_files(context.user_data)
+        keyboard = get_main_menu_keyboard(update.effective_user.id)
+        await update.message.reply_text("```\n❌ Proses dibatalkan\n```",
+                parse_mode="Markdown", reply_markup=keyboard)
+        return ConversationHandler.END
+    
+    mode = MERGE_MODE_BUTTONS.get(update.message.text)
+    if mode is None:
+        await update.message.reply_text("```\n❌ Pilih mode dari tombol!\n```", parse_mode="Markdown")
+        return ASK_MODE
+    
+    context.user_data['merge_mode'] = mode
+    
+    cancel_keyboard = ReplyKeyboardMarkup([[KeyboardButton("❌ BATAL ❌")]], resize_keyboard=True)
+    
+    text = f"""```
+📝 NAMA FILE OUTPUT
+───────────────────────────────────────
+
+Total file: {len(context.user_data['merge_files'])}
+
+Masukkan nama file hasil gabungan
+(tanpa ekstensi)
+
+───────────────────────────────────────
+```"""
+    
+    await update.message.reply_text(text, parse_mode="Markdown", reply_markup=cancel_keyboard)
+    return ASK_FILENAME
+
 async def gabung_file_merge(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.message.text == "❌ BATAL ❌":
-        for filepath in context.user_data.get('merge_files', []):
-            if os.path.exists(filepath['path']):
-                os.remove(filepath['path'])
+        discard_merge_files(context.user_data)
         keyboard = get_main_menu_keyboard(update.effective_user.id)
         await update.message.reply_text("```\n❌ Proses dibatalkan\n```",
                 parse_mode="Markdown", reply_markup=keyboard)
@@ -114,39 +181,36 @@ async def gabung_file_merge(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     output_name = update.message.text.strip()
     merge_files = context.user_data.get('merge_files', [])
-    file_type = merge_files[0]['type']
+    merge_mode = context.user_data.get('merge_mode', MERGE_CONCAT)
     
-    output_filepath = f"temp_{update.effective_user.id}_{output_name}.{file_type}"
+    output_filepath = f"temp_{update.effective_user.id}_{output_name}.merged"
+    
+    if not await consume_daily_quota(update):
+        discard_merge_files(context.user_data)
+        return ConversationHandler.END
     
     keyboard = get_main_menu_keyboard(update.effective_user.id)
+    reporter = ProgressReporter(context.bot, update.effective_chat.id, "GABUNG FILE", update.effective_user.id).start()
     
     try:
-        if file_type == 'txt':
-            with open(output_filepath, 'w', encoding='utf-8') as outfile:
-                for file_info in merge_files:
-                    with open(file_info['path'], 'r', encoding='utf-8') as infile:
-                        outfile.write(infile.read() + '\n')
-            
-            with open(output_filepath, 'r') as f:
-                total_numbers = len(re.findall(r'\d+', f.read()))
-            total_count = total_numbers
-        else:
-            all_vcards = []
-            for file_info in merge_files:
-                with open(file_info['path'], 'r', encoding='utf-8') as f:
-                    vcf_content = f.read()
-                all_vcards.extend(list(vobject.readComponents(vcf_content)))
-            
-            with open(output_filepath, 'w', encoding='utf-8') as f:
-                for vcard in all_vcards:
-                    f.write(vcard.serialize())
-            
-            total_count = len(all_vcards)
+        await asyncio.gather(*context.user_data.pop('merge_downloads', []))
+        
+        sources = [source for file_info in merge_files for source in expand_input(file_info['path'], file_info['name'])]
+        file_type = source_type(sources[0], 'txt')
+        if any(source_type(source, file_type) != file_type for source in sources):
+            raise ValueError(f"Semua file harus format .{file_type}")
+        
+        result = await asyncio.to_thread(run_merge, sources, file_type, output_filepath, merge_mode, reporter)
+        await reporter.finish()
+        
+        caption = f"✅ Berhasil gabung {len(sources)} file!\n📂 Total: {result['count']} kontak"
+        if result['duplicates']:
+            caption += f"\n🧹 Duplikat dihapus: {result['duplicates']}"
         
         await update.message.reply_document(
             document=open(output_filepath, 'rb'),
             filename=f"{output_name}.{file_type}",
-            caption=f"✅ Berhasil gabung {len(merge_files)} file!\n📂 Total: {total_count} kontak",
+            caption=caption,
             reply_markup=keyboard
         )
         
@@ -154,13 +218,18 @@ async def gabung_file_merge(update: Update, context: ContextTypes.DEFAULT_TYPE):
         total_ops = user_data.get("total_operations", 0) + 1
         update_user_data(update.effective_user.id, {"total_operations": total_ops})
         
+    except OperationCancelled:
+        refund_daily_quota(update.effective_user.id)
+        await update.message.reply_text("```\n❌ Proses dibatalkan\n```",
+                parse_mode="Markdown", reply_markup=keyboard)
     except Exception as e:
+        logger.error(f"Gabung file error: {e}")
+        refund_daily_quota(update.effective_user.id)
         await update.message.reply_text(f"```\n❌ Error: {str(e)}\n```",
                 parse_mode="Markdown", reply_markup=keyboard)
     finally:
-        for file_info in merge_files:
-            if os.path.exists(file_info['path']):
-                os.remove(file_info['path'])
+        await reporter.finish()
+        discard_merge_files(context.user_data)
         if os.path.exists(output_filepath):
             os.remove(output_filepath)
     
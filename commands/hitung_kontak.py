@@ -1,10 +1,15 @@
 import os
-import re
-import vobject
+import asyncio
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ContextTypes, ConversationHandler
-from commands.vip_system import check_access, send_access_denied, get_user_role
+from commands.vip_system import check_access, send_access_denied, get_user_role, ensure_daily_quota, consume_daily_quota, refund_daily_quota
 from commands.menu import get_main_menu_keyboard
+from commands.file_jobs import admit_upload
+from utils.lazy_import import lazy_module
+from utils.number_extract import count_numbers
+from utils.archive import accepts, resolve_input, open_text, DATA_EXTENSIONS
+
+vobject = lazy_module("vobject")
 
 ASK_FILE = range(1)
 
@@ -16,6 +21,9 @@ async def hitung_kontak_start(update: Update, context: ContextTypes.DEFAULT_TYPE
         await send_access_denied(update, user_role, "FREE")
         return ConversationHandler.END
     
+    if not await ensure_daily_quota(update):
+        return ConversationHandler.END
+    
     cancel_keyboard = ReplyKeyboardMarkup([[KeyboardButton("❌ BATAL ❌")]], resize_keyboard=True)
     
     text = """```
@@ -44,10 +52,16 @@ async def hitung_kontak_file(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     filename = update.message.document.file_name
     
-    if not (filename.endswith('.txt') or filename.endswith('.vcf')):
-        await update.message.reply_text("```\n❌ File harus berformat .txt atau .vcf!\n```", parse_mode="Markdown")
+    if not accepts(filename, DATA_EXTENSIONS):
+        await update.message.reply_text("```\n❌ File harus berformat .txt, .vcf, .zip atau .gz!\n```", parse_mode="Markdown")
         return ASK_FILE
     
+    if not await admit_upload(update, update.message.document.file_size):
+        return ConversationHandler.END
+    
+    if not await consume_daily_quota(update):
+        return ConversationHandler.END
+    
     file = await update.message.document.get_file()
     filepath = f"temp_{update.effective_user.id}_{filename}"
     await file.download_to_drive(filepath)
@@ -55,13 +69,11 @@ async def hitung_kontak_file(update: Update, context: ContextTypes.DEFAULT_TYPE)
     keyboard = get_main_menu_keyboard(update.effective_user.id)
     
     try:
-        if filename.endswith('.txt'):
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            numbers = re.findall(r'\d+', content)
-            total = len(numbers)
+        source, file_type = resolve_input(filepath, filename, DATA_EXTENSIONS)
+        if file_type == 'txt':
+            total = await asyncio.to_thread(count_numbers, source)
         else:
-            with open(filepath, 'r', encoding='utf-8') as f:
+            with open_text(source) as f:
                 vcf_content = f.read()
             vcard_list = list(vobject.readComponents(vcf_content))
             total = len(vcard_list)
@@ -79,6 +91,7 @@ Total Kontak: {total}
         await update.message.reply_text(text, parse_mode="Markdown", reply_markup=keyboard)
         
     except Exception as e:
+        refund_daily_quota(update.effective_user.id)
         await update.message.reply_text(f"```\n❌ Error: {str(e)}\n```",
                 parse_mode="Markdown", reply_markup=keyboard)
     finally:
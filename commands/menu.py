@@ -15,6 +15,7 @@ def get_main_menu_keyboard(user_id):
             [KeyboardButton("🜲 RAPIKAN TXT 🜲"), KeyboardButton("🜲 GABUNG FILE 🜲")],
             [KeyboardButton("🜲 HITUNG KONTAK 🜲"), KeyboardButton("🜲 CEK NAMA 🜲")],
             [KeyboardButton("🜲 SPLIT FILE 🜲"), KeyboardButton("🜲 CREATE ADM/NAVY 🜲")],
+            [KeyboardButton("🜲 SORT FILE 🜲"), KeyboardButton("🜲 PIPELINE 🜲")],
             [KeyboardButton("🜲 STATUS 🜲"), KeyboardButton("🜲 Redeem 🜲")],
             [KeyboardButton("🜲 Owner Panel 🜲"), KeyboardButton("🜲 Monitoring Bot 🜲")],
             [KeyboardButton("🔙 KEMBALI 🔙")]
@@ -26,6 +27,7 @@ def get_main_menu_keyboard(user_id):
             [KeyboardButton("🜲 RAPIKAN TXT 🜲"), KeyboardButton("🜲 GABUNG FILE 🜲")],
             [KeyboardButton("🜲 HITUNG KONTAK 🜲"), KeyboardButton("🜲 CEK NAMA 🜲")],
             [KeyboardButton("🜲 SPLIT FILE 🜲"), KeyboardButton("🜲 CREATE ADM/NAVY 🜲")],
+            [KeyboardButton("🜲 SORT FILE 🜲"), KeyboardButton("🜲 PIPELINE 🜲")],
             [KeyboardButton("🜲 STATUS 🜲"), KeyboardButton("🜲 Redeem 🜲")],
             [KeyboardButton("🔙 KEMBALI 🔙")]
         ]
@@ -56,6 +58,8 @@ Pilih menu yang tersedia di bawah ini:
 🜲 HITUNG KONTAK      — Hitung jumlah kontak            
 🜲 CEK NAMA KONTAK    — Cek/memperbarui nama kontak     
 🜲 SPLIT FILE         — Bagi file menjadi beberapa       
+🜲 SORT FILE          — Urutkan nomor/kontak            
+🜲 PIPELINE           — Gabungkan beberapa tool sekaligus
 🎁 REDEEM CODE        — Tukarkan kode redeem           
 
 ───────────────────────────────────────
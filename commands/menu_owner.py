@@ -4,6 +4,7 @@ from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ContextTypes, ConversationHandler
 from commands.vip_system import OWNER_ID, load_users, save_users
 from commands.menu import get_main_menu_keyboard
+from commands.expiry_checker import schedule_json_warning
 from commands.redeem_utils import generate_random_code, format_duration_readable, format_code_expiry_readable, parse_duration_text, format_duration_text_readable
 
 ASK_ACTION, ASK_USER_ID, ASK_ROLE, ASK_DURATION, ASK_REDEEM_MODE, ASK_REDEEM_CODE, ASK_REDEEM_DURATION, ASK_CODE_EXPIRY = range(8)
@@ -212,8 +213,11 @@ async def menu_owner_duration(update: Update, context: ContextTypes.DEFAULT_TYPE
     
     users[user_str]['role'] = role
     users[user_str]['expired'] = expired
+    users[user_str]['expiry_notified'] = False
+    users[user_str]['expiry_notified_soon'] = False
     
     save_users(users)
+    schedule_json_warning(int(user_id), expired)
     
     action_keyboard = ReplyKeyboardMarkup([
         [KeyboardButton("👥 LIHAT USERS")],
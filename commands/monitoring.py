@@ -1,10 +1,15 @@
 import logging
-import psutil
 from datetime import datetime
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ContextTypes, ConversationHandler
 
 from config import is_owner
+from utils.metrics import metrics
+from utils.instrumentation import format_latency_table
+from utils.system_sampler import system_sampler
+from utils.loop_watchdog import loop_watchdog
+from utils.file_jobs import file_job_queue
+from utils.result_cache import result_cache
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +28,8 @@ def get_monitoring_keyboard():
     keyboard = [
         [KeyboardButton("🜲 Status Sistem 🜲"), KeyboardButton("🜲 Error Log 🜲")],
         [KeyboardButton("🜲 Activity Log 🜲"), KeyboardButton("🜲 DB Status 🜲")],
-        [KeyboardButton("🜲 Running Jobs 🜲"), KeyboardButton("🜲 Force Restart 🜲")],
+        [KeyboardButton("🜲 Running Jobs 🜲"), KeyboardButton("🜲 Latency 🜲")],
+        [KeyboardButton("🜲 Loop Stalls 🜲"), KeyboardButton("🜲 Force Restart 🜲")],
         [KeyboardButton("🔙 KEMBALI 🔙")]
     ]
     return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
@@ -54,6 +60,8 @@ MONITORING
 🜲 Activity Log    — Log aktivitas user
 🜲 DB Status       — Status database
 🜲 Running Jobs    — Job yang berjalan
+🜲 Latency         — P50/P95/P99 per command
+🜲 Loop Stalls     — Kode yang memblokir loop
 🜲 Force Restart   — Restart bot
 
 ───────────────────────────────────────
@@ -98,6 +106,12 @@ async def monitoring_action(update: Update, context: ContextTypes.DEFAULT_TYPE):
     elif text == "🜲 Running Jobs 🜲":
         return await show_running_jobs(update, context)
     
+    elif text == "🜲 Latency 🜲":
+        return await show_latency(update, context)
+    
+    elif text == "🜲 Loop Stalls 🜲":
+        return await show_loop_stalls(update, context)
+    
     elif text == "🜲 Force Restart 🜲":
         await update.message.reply_text(
             "⚠️ Force restart tidak tersedia melalui bot.\nGunakan Replit console untuk restart.",
@@ -110,27 +124,45 @@ async def monitoring_action(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def show_system_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    cpu_percent = psutil.cpu_percent(interval=1)
-    memory = psutil.virtual_memory()
-    disk = psutil.disk_usage('/')
+    sample = system_sampler.latest()
+    
+    if not sample or sample.get("cpu_percent") is None:
+        await update.message.reply_text(
+            "❌ Data sistem belum tersedia.",
+            parse_mode="Markdown",
+            reply_markup=get_monitoring_keyboard()
+        )
+        return ASK_MONITORING_ACTION
     
-    boot_time = datetime.fromtimestamp(psutil.boot_time())
-    uptime = datetime.now() - boot_time
-    uptime_str = f"{uptime.days}d {uptime.seconds // 3600}h {(uptime.seconds % 3600) // 60}m"
+    open_fds = sample.get("open_fds")
+    pool_size = sample.get("db_pool_size")
+    pool_text = f"{pool_size - sample['db_pool_idle']}/{pool_size} dipakai" if pool_size is not None else "N/A"
     
     status_text = f"""```
 📊 STATUS SISTEM
 ───────────────────────────────────────
 
-🖥️ CPU Usage    : {cpu_percent}%
-💾 RAM Usage    : {memory.percent}%
-📀 Disk Usage   : {disk.percent}%
-⏰ Uptime       : {uptime_str}
+🖥️ CPU Usage    : {sample['cpu_percent']}%
+💾 RAM Usage    : {sample['mem_percent']}%
+📀 Disk Usage   : {sample['disk_percent']}%
+⏰ Uptime       : {system_sampler.uptime_str()}
 
-💾 RAM Total    : {memory.total // (1024**3)} GB
-💾 RAM Used     : {memory.used // (1024**3)} GB
-📀 Disk Total   : {disk.total // (1024**3)} GB
-📀 Disk Used    : {disk.used // (1024**3)} GB
+💾 RAM Total    : {sample['mem_total'] // (1024**3)} GB
+💾 RAM Used     : {sample['mem_used'] // (1024**3)} GB
+📀 Disk Total   : {sample['disk_total'] // (1024**3)} GB
+📀 Disk Used    : {sample['disk_used'] // (1024**3)} GB
+
+🤖 Bot RSS      : {sample['proc_rss'] // (1024**2)} MB
+📂 Open FDs     : {open_fds if open_fds is not None else 'N/A'}
+⏱️ Loop Lag     : {sample['loop_lag_ms']:.1f} ms
+🗄️ DB Pool      : {pool_text}
+
+───────────────────────────────────────
+TREN 1 JAM TERAKHIR
+───────────────────────────────────────
+CPU %  {system_sampler.trend('cpu_percent')}
+RAM %  {system_sampler.trend('mem_percent')}
+Lag ms {system_sampler.trend('loop_lag_ms')}
 
 ───────────────────────────────────────
 ```"""
@@ -228,15 +260,27 @@ async def show_activity_logs(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 
 async def show_db_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    db_status = "🔴 Offline"
+    if not db_available:
+        await update.message.reply_text(
+            "❌ Database tidak tersedia.",
+            parse_mode="Markdown",
+            reply_markup=get_monitoring_keyboard()
+        )
+        return ASK_MONITORING_ACTION
     
-    if db_available:
-        try:
-            db = get_db()
-            if db.is_connected:
-                db_status = "🟢 Online"
-        except:
-            pass
+    stats = get_db().stats()
+    db_status = "🟢 Online" if stats["connected"] else "🔴 Offline"
+    breaker = {"closed": "🟢 Closed", "half_open": "🟡 Half-open", "open": "🔴 Open"}[stats["breaker"]]
+    
+    errors = ", ".join(f"{kind}={count}" for kind, count in stats["errors"].items()) or "0"
+    
+    statement_text = ""
+    for row in stats["statements"][:5]:
+        statement_text += f"{row['label'][:22]:<22} {row['count']:>6} p95 {row['p95'] * 1000:.0f}ms\n"
+    
+    slow_text = ""
+    for slow in list(reversed(stats["slow_queries"]))[:3]:
+        slow_text += f"{slow['ms']:.0f}ms {slow['label']}\n"
     
     status_text = f"""```
 🗄️ DATABASE STATUS
@@ -244,8 +288,29 @@ async def show_db_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 📊 Status      : {db_status}
 🔧 Type        : PostgreSQL
-🔒 Connection  : Pool Active
+🧬 Schema      : v{stats['schema_version']}
+⚡ Breaker     : {breaker} ({stats['breaker_trips']}x trip)
+🔁 Reconnect   : {stats['reconnects']}x
 
+───────────────────────────────────────
+POOL
+───────────────────────────────────────
+🔒 Size        : {stats['size']} (min {stats['min_size']} / max {stats['max_size']})
+🔥 In Use      : {stats['in_use']}
+💤 Idle        : {stats['idle']}
+⏳ Menunggu    : {stats['waiting']}
+⏱️ Acquire     : p50 {stats['acquire_p50'] * 1000:.1f}ms / p99 {stats['acquire_p99'] * 1000:.1f}ms
+
+───────────────────────────────────────
+QUERY TERLAMBAT (P95)
+───────────────────────────────────────
+{statement_text or "Belum ada data."}
+───────────────────────────────────────
+SLOW QUERY TERAKHIR
+───────────────────────────────────────
+{slow_text or "✅ Tidak ada."}
+───────────────────────────────────────
+🚨 Error       : {errors}
 ───────────────────────────────────────
 ```"""
     
@@ -258,14 +323,37 @@ async def show_db_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def show_running_jobs(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    jobs_text = """```
+    db_status = "Active" if db_available and get_db().is_connected else "Offline"
+    total_updates = sum(metrics.counters.get("updates_total", {}).values())
+    uptime = int(datetime.now().timestamp() - metrics.started_at)
+    uptime_str = f"{uptime // 86400}d {(uptime % 86400) // 3600}h {(uptime % 3600) // 60}m"
+    queue = await file_job_queue.queue_stats()
+    queue_lines = "\n".join(
+        f"   {role.upper():<8}: {counts['pending']} antri • {counts['running']} proses"
+        for role, counts in reversed(list(queue["roles"].items()))
+    )
+    
+    jobs_text = f"""```
 ⚙️ RUNNING JOBS
 ───────────────────────────────────────
 
 ✅ Bot Handler      : Active
-✅ Database Pool    : Active
+✅ Database Pool    : {db_status}
 ✅ Message Handler  : Active
 
+🔄 Update Diproses  : {metrics.in_flight}
+📨 Total Update     : {int(total_updates)}
+⏰ Uptime Bot       : {uptime_str}
+
+📦 Job Aktif        : {file_job_queue.active}
+📦 Job Selesai      : {file_job_queue.completed}
+💾 Cache Hasil      : {len(result_cache)} ({result_cache.hit_rate:.0%} hit)
+
+📊 Antrian per Role
+{queue_lines}
+⏳ Antri Terlama    : {int(queue["oldest_pending"])}s
+🚫 Job Ditolak      : {queue["rejected"]}
+
 ───────────────────────────────────────
 ```"""
     
@@ -275,3 +363,72 @@ async def show_running_jobs(update: Update, context: ContextTypes.DEFAULT_TYPE):
         reply_markup=get_monitoring_keyboard()
     )
     return ASK_MONITORING_ACTION
+
+
+async def show_latency(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    latency_text = f"""```
+⏱️ LATENCY PER COMMAND
+───────────────────────────────────────
+
+{format_latency_table("handler_latency_seconds")}
+
+───────────────────────────────────────
+TELEGRAM API
+───────────────────────────────────────
+
+{format_latency_table("telegram_api_seconds", limit=6)}
+
+───────────────────────────────────────
+DATABASE
+───────────────────────────────────────
+
+{format_latency_table("db_query_seconds", limit=1)}
+
+───────────────────────────────────────
+```"""
+    
+    await update.message.reply_text(
+        latency_text,
+        parse_mode="Markdown",
+        reply_markup=get_monitoring_keyboard()
+    )
+    return ASK_MONITORING_ACTION
+
+
+async def show_loop_stalls(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    lag = metrics.histogram("event_loop_lag_seconds", "loop")
+    p99 = f"{lag.quantile(0.99) * 1000:.1f} ms" if lag else "N/A"
+    
+    offenders = loop_watchdog.top_offenders(limit=5)
+    if offenders:
+        offender_text = ""
+        for i, entry in enumerate(offenders, 1):
+            offender_text += (
+                f"{i}. {entry['where'][:40]}\n"
+                f"   {entry['count']}x | total {entry['total'] * 1000:.0f} ms | max {entry['max'] * 1000:.0f} ms\n"
+            )
+    else:
+        offender_text = "✅ Belum ada stall terdeteksi.\n"
+    
+    stall_text = f"""```
+🐢 EVENT LOOP STALLS
+───────────────────────────────────────
+
+⏱️ Threshold    : {loop_watchdog.threshold * 1000:.0f} ms
+📈 Lag P99      : {p99}
+🔺 Lag Maks     : {loop_watchdog.max_lag * 1000:.0f} ms
+🚨 Total Stall  : {loop_watchdog.stall_count}
+
+───────────────────────────────────────
+TOP OFFENDERS
+───────────────────────────────────────
+{offender_text}
+───────────────────────────────────────
+```"""
+    
+    await update.message.reply_text(
+        stall_text,
+        parse_mode="Markdown",
+        reply_markup=get_monitoring_keyboard()
+    )
+    return ASK_MONITORING_ACTION
@@ -1,7 +1,7 @@
 import os
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ContextTypes, ConversationHandler
-from commands.vip_system import check_access, send_access_denied, get_user_role, update_user_data, get_user_data
+from commands.vip_system import check_access, send_access_denied, get_user_role, update_user_data, get_user_data, ensure_daily_quota, consume_daily_quota, refund_daily_quota
 from commands.menu import get_main_menu_keyboard
 
 ASK_MESSAGE, ASK_FILENAME = range(2)
@@ -14,6 +14,9 @@ async def msg_to_txt_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await send_access_denied(update, user_role, "VIP")
         return ConversationHandler.END
     
+    if not await ensure_daily_quota(update):
+        return ConversationHandler.END
+    
     cancel_keyboard = ReplyKeyboardMarkup([[KeyboardButton("❌ BATAL ❌")]], resize_keyboard=True)
     
     text = """```
@@ -67,6 +70,9 @@ async def msg_to_txt_filename(update: Update, context: ContextTypes.DEFAULT_TYPE
     
     filepath = f"temp_{update.effective_user.id}_{filename}.txt"
     
+    if not await consume_daily_quota(update):
+        return ConversationHandler.END
+    
     with open(filepath, 'w', encoding='utf-8') as f:
         f.write(msg_content)
     
@@ -85,6 +91,7 @@ async def msg_to_txt_filename(update: Update, context: ContextTypes.DEFAULT_TYPE
         update_user_data(update.effective_user.id, {"total_operations": total_ops})
         
     except Exception as e:
+        refund_daily_quota(update.effective_user.id)
         await update.message.reply_text(f"```\n❌ Error: {str(e)}\n```",
                 parse_mode="Markdown", reply_markup=keyboard)
     finally:
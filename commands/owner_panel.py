@@ -1,11 +1,14 @@
+import os
 import logging
 import random
 import string
 from datetime import datetime, timedelta
-from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
+from telegram import Update, ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest
 from telegram.ext import ContextTypes, ConversationHandler
 
 from config import is_owner
+from utils.stats_service import stats_service
 
 logger = logging.getLogger(__name__)
 
@@ -19,15 +22,19 @@ ASK_CODE_LIMIT = 6
 ASK_CODE_EXPIRY = 7
 ASK_BROADCAST_TYPE = 8
 ASK_BROADCAST_MSG = 9
+ASK_EXPORT_RANGE = 10
 
 db_available = False
 try:
     from database.models import UserModel, VIPAccessModel, VVIPAccessModel, RedeemCodeModel, ActivityLogModel
     from database.connection import get_db
+    from database.export import export_tables, EXPORT_FORMATS
     db_available = True
 except ImportError:
     pass
 
+MAX_EXPORT_UPLOAD = 50 * 1024 * 1024
+
 
 def get_cancel_keyboard():
     keyboard = [[KeyboardButton("🔙 KEMBALI 🔙")]]
@@ -596,6 +603,64 @@ async def owner_panel_broadcast_msg(update: Update, context: ContextTypes.DEFAUL
     return ASK_ACTION
 
 
+USERS_PAGE_SIZE = 20
+REDEEM_PAGE_SIZE = 15
+USER_FILTERS = ["all", "reguler", "vip", "vvip", "owner"]
+REDEEM_FILTERS = ["all", "active", "full", "used", "expired"]
+
+
+def build_page_keyboard(kind: str, filters: list, current: str, page: dict):
+    filter_row = [
+        InlineKeyboardButton(f"• {name} •" if name == current else name, callback_data=f"op_{kind}:{name}:n:0")
+        for name in filters
+    ]
+    nav_row = []
+    rows = page["rows"]
+    if rows and page["has_prev"]:
+        nav_row.append(InlineKeyboardButton("◀️ Prev", callback_data=f"op_{kind}:{current}:p:{rows[0]['id']}"))
+    if rows and page["has_next"]:
+        nav_row.append(InlineKeyboardButton("Next ▶️", callback_data=f"op_{kind}:{current}:n:{rows[-1]['id']}"))
+    
+    keyboard = [filter_row[:3], filter_row[3:]]
+    if nav_row:
+        keyboard.append(nav_row)
+    return InlineKeyboardMarkup(keyboard)
+
+
+async def render_users_page(role: str = "all", after_id: int = None, before_id: int = None):
+    page = await UserModel.get_page(
+        role=None if role == "all" else role,
+        after_id=after_id, before_id=before_id, limit=USERS_PAGE_SIZE
+    )
+    
+    if not page["rows"]:
+        text = "Belum ada user terdaftar." if role == "all" else f"Tidak ada user dengan role {role}."
+    else:
+        text = f"📋 Daftar User ({role})\n\n"
+        for user in page["rows"]:
+            text += f"#{user.get('id')} `{user.get('user_id')}` - {user.get('username') or 'N/A'} ({user.get('role')})"
+            text += " 🚫\n" if user.get('is_banned') else "\n"
+    
+    return text, build_page_keyboard("users", USER_FILTERS, role, page)
+
+
+async def render_redeem_page(status: str = "all", after_id: int = None, before_id: int = None):
+    page = await RedeemCodeModel.get_page(
+        status=None if status == "all" else status,
+        after_id=after_id, before_id=before_id, limit=REDEEM_PAGE_SIZE
+    )
+    
+    if not page["rows"]:
+        text = "Belum ada kode redeem." if status == "all" else f"Tidak ada kode dengan status {status}."
+    else:
+        text = f"📋 Daftar Redeem Code ({status})\n\n"
+        for code in page["rows"]:
+            status_emoji = "✅" if code.get('status') == 'active' else "❌"
+            text += f"#{code.get('id')} `{code.get('code')}` {status_emoji} - {code.get('type').upper()} ({code.get('current_uses')}/{code.get('max_uses')})\n"
+    
+    return text, build_page_keyboard("redeem", REDEEM_FILTERS, status, page)
+
+
 async def show_all_users(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not db_available:
         await update.message.reply_text(
@@ -608,27 +673,11 @@ async def show_all_users(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         db = get_db()
         if db.is_connected:
-            users = await UserModel.get_all_users()
-            
-            if not users:
-                await update.message.reply_text(
-                    "Belum ada user terdaftar.",
-                    parse_mode="Markdown",
-                    reply_markup=get_owner_panel_keyboard()
-                )
-                return ASK_ACTION
-            
-            user_list = "📋 Daftar User\n\n"
-            for i, user in enumerate(users[:20], 1):
-                user_list += f"{i}. `{user.get('user_id')}` - {user.get('username', 'N/A')} ({user.get('role')})\n"
-            
-            if len(users) > 20:
-                user_list += f"\n... dan {len(users) - 20} user lainnya"
-            
+            text, reply_markup = await render_users_page()
             await update.message.reply_text(
-                user_list,
+                text,
                 parse_mode="Markdown",
-                reply_markup=get_owner_panel_keyboard()
+                reply_markup=reply_markup
             )
     except Exception as e:
         logger.error(f"Show users error: {e}")
@@ -653,28 +702,11 @@ async def show_all_redeem(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         db = get_db()
         if db.is_connected:
-            codes = await RedeemCodeModel.get_all_codes()
-            
-            if not codes:
-                await update.message.reply_text(
-                    "Belum ada kode redeem.",
-                    parse_mode="Markdown",
-                    reply_markup=get_owner_panel_keyboard()
-                )
-                return ASK_ACTION
-            
-            code_list = "📋 Daftar Redeem Code\n\n"
-            for i, code in enumerate(codes[:15], 1):
-                status_emoji = "✅" if code.get('status') == 'active' else "❌"
-                code_list += f"{i}. `{code.get('code')}` {status_emoji} - {code.get('type').upper()} ({code.get('current_uses')}/{code.get('max_uses')})\n"
-            
-            if len(codes) > 15:
-                code_list += f"\n... dan {len(codes) - 15} kode lainnya"
-            
+            text, reply_markup = await render_redeem_page()
             await update.message.reply_text(
-                code_list,
+                text,
                 parse_mode="Markdown",
-                reply_markup=get_owner_panel_keyboard()
+                reply_markup=reply_markup
             )
     except Exception as e:
         logger.error(f"Show redeem error: {e}")
@@ -687,6 +719,48 @@ async def show_all_redeem(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return ASK_ACTION
 
 
+async def owner_panel_page_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    
+    if not is_owner(query.from_user.id):
+        await query.answer("❌ Akses ditolak.", show_alert=True)
+        return
+    
+    if not db_available or not get_db().is_connected:
+        await query.answer("❌ Database tidak tersedia.", show_alert=True)
+        return
+    
+    try:
+        kind, current, direction, cursor = query.data.split(":")
+        cursor = int(cursor) or None
+    except ValueError:
+        await query.answer()
+        return
+    
+    after_id = cursor if direction == "n" else None
+    before_id = cursor if direction == "p" else None
+    
+    try:
+        if kind == "op_users" and current in USER_FILTERS:
+            text, reply_markup = await render_users_page(current, after_id, before_id)
+        elif kind == "op_redeem" and current in REDEEM_FILTERS:
+            text, reply_markup = await render_redeem_page(current, after_id, before_id)
+        else:
+            await query.answer()
+            return
+    except Exception as e:
+        logger.error(f"Owner panel page error: {e}")
+        await query.answer("❌ Gagal memuat halaman.", show_alert=True)
+        return
+    
+    await query.answer()
+    try:
+        await query.edit_message_text(text, parse_mode="Markdown", reply_markup=reply_markup)
+    except BadRequest as e:
+        if "not modified" not in str(e).lower():
+            logger.error(f"Owner panel page error: {e}")
+
+
 async def show_statistics(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not db_available:
         await update.message.reply_text(
@@ -699,19 +773,21 @@ async def show_statistics(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         db = get_db()
         if db.is_connected:
-            total_users = await UserModel.count_total()
-            role_counts = await UserModel.count_by_role()
-            vip_count = await VIPAccessModel.count_active()
-            vvip_count = await VVIPAccessModel.count_active()
+            if not stats_service.loaded:
+                await stats_service.reconcile()
+            stats = stats_service.snapshot()
+            role_counts = stats["roles"]
             
             stats_text = f"""```
 📊 STATISTIK BOT
 ───────────────────────────────────────
 
-👥 Total User  : {total_users}
+👥 Total User  : {stats['total_users']}
 ⭐ Reguler     : {role_counts.get('reguler', 0)}
-💎 VIP Aktif   : {vip_count}
-👑 VVIP Aktif  : {vvip_count}
+💎 VIP Aktif   : {stats['vip_active']}
+👑 VVIP Aktif  : {stats['vvip_active']}
+📈 DAU         : ~{stats['dau']}
+📆 WAU         : ~{stats['wau']}
 
 ───────────────────────────────────────
 ```"""
@@ -732,10 +808,125 @@ async def show_statistics(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return ASK_ACTION
 
 
+def get_export_keyboard():
+    keyboard = [
+        [KeyboardButton("CSV 7 hari"), KeyboardButton("CSV 30 hari")],
+        [KeyboardButton("CSV semua"), KeyboardButton("JSONL semua")],
+        [KeyboardButton("🔙 KEMBALI 🔙")]
+    ]
+    return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+
+
+def parse_export_range(text: str):
+    parts = text.lower().split()
+    if not parts or parts[0] not in EXPORT_FORMATS:
+        raise ValueError("format")
+    fmt = parts[0]
+    args = parts[1:]
+    
+    if not args or args == ["semua"]:
+        return fmt, None, None
+    if len(args) == 2 and args[1] == "hari":
+        return fmt, datetime.utcnow() - timedelta(days=int(args[0])), None
+    if len(args) == 2:
+        since = datetime.strptime(args[0], "%Y-%m-%d")
+        until = datetime.strptime(args[1], "%Y-%m-%d") + timedelta(days=1)
+        if until <= since:
+            raise ValueError("range")
+        return fmt, since, until
+    raise ValueError("range")
+
+
 async def export_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not db_available:
+        await update.message.reply_text(
+            "❌ Database tidak tersedia.",
+            parse_mode="Markdown",
+            reply_markup=get_owner_panel_keyboard()
+        )
+        return ASK_ACTION
+    
     await update.message.reply_text(
-        "📤 Export Data\n\nFitur export sedang dalam pengembangan.",
+        """```
+📤 EXPORT DATA
+───────────────────────────────────────
+Pilih preset atau ketik manual:
+
+csv 7 hari
+jsonl 2025-01-01 2025-01-31
+csv semua
+───────────────────────────────────────
+```""",
         parse_mode="Markdown",
-        reply_markup=get_owner_panel_keyboard()
+        reply_markup=get_export_keyboard()
     )
+    return ASK_EXPORT_RANGE
+
+
+async def owner_panel_export_range(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    text = update.message.text
+    
+    if text == "🔙 KEMBALI 🔙":
+        await update.message.reply_text(
+            "Kembali ke Owner Panel.",
+            parse_mode="Markdown",
+            reply_markup=get_owner_panel_keyboard()
+        )
+        return ASK_ACTION
+    
+    try:
+        fmt, since, until = parse_export_range(text)
+    except ValueError:
+        await update.message.reply_text(
+            "❌ Format tidak valid. Contoh: `csv 7 hari` atau `jsonl 2025-01-01 2025-01-31`",
+            parse_mode="Markdown",
+            reply_markup=get_export_keyboard()
+        )
+        return ASK_EXPORT_RANGE
+    
+    if not get_db().is_connected:
+        await update.message.reply_text(
+            "❌ Database tidak tersedia.",
+            parse_mode="Markdown",
+            reply_markup=get_owner_panel_keyboard()
+        )
+        return ASK_ACTION
+    
+    await update.message.reply_text("⏳ Export sedang diproses...", reply_markup=get_owner_panel_keyboard())
+    
+    path = None
+    try:
+        path, results = await export_tables(fmt=fmt, since=since, until=until)
+        size = os.path.getsize(path)
+        if size > MAX_EXPORT_UPLOAD:
+            await update.message.reply_text(
+                f"❌ File export terlalu besar untuk dikirim ({size / 1024 / 1024:.1f} MB). Persempit rentang tanggal.",
+                reply_markup=get_owner_panel_keyboard()
+            )
+            return ASK_ACTION
+        
+        total_rows = sum(result["rows"] for result in results)
+        total_seconds = sum(result["seconds"] for result in results) or 1e-9
+        caption = "✅ Export selesai\n\n"
+        caption += "\n".join(f"{result['table']}: {result['rows']} baris" for result in results)
+        caption += f"\n\nTotal: {total_rows} baris • {total_rows / total_seconds:.0f} baris/detik"
+        
+        with open(path, "rb") as document:
+            await update.message.reply_document(
+                document=document,
+                filename=os.path.basename(path),
+                caption=caption,
+                reply_markup=get_owner_panel_keyboard()
+            )
+    except Exception as e:
+        logger.error(f"Export error: {e}")
+        await update.message.reply_text(
+            "❌ Gagal export data.",
+            parse_mode="Markdown",
+            reply_markup=get_owner_panel_keyboard()
+        )
+    finally:
+        if path and os.path.exists(path):
+            os.remove(path)
+    
     return ASK_ACTION
@@ -0,0 +1,264 @@
+from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
+from telegram.ext import ContextTypes, ConversationHandler
+from commands.vip_system import check_access, send_access_denied, get_user_role, ensure_daily_quota
+from commands.menu import get_main_menu_keyboard
+from commands.file_jobs import enqueue_file_job, describe_document, get_format_keyboard, parse_format, format_prompt
+from utils.file_jobs import register_job
+from utils.archive import accepts, resolve_input
+from utils.contact_writers import VCARD_FORMATS
+from utils.pipeline import (
+    run_pipeline, order_stages, STAGE_CLEAN, STAGE_NORMALIZE, STAGE_DEDUPE, STAGE_CONVERT, STAGE_SPLIT
+)
+
+ASK_FILE, ASK_STAGES, ASK_CONTACT_NAME, ASK_SPLIT_SIZE, ASK_OUTPUT_NAME, ASK_FORMAT = range(6)
+
+STAGE_BUTTONS = {
+    "🜲 RAPIKAN 🜲": STAGE_CLEAN,
+    "🜲 KODE 62 🜲": STAGE_NORMALIZE,
+    "🜲 HAPUS DUPLIKAT 🜲": STAGE_DEDUPE,
+    "🜲 KE VCF 🜲": STAGE_CONVERT,
+    "🜲 SPLIT 🜲": STAGE_SPLIT,
+}
+
+STAGE_LABELS = {
+    STAGE_CLEAN: "RAPIKAN",
+    STAGE_NORMALIZE: "KODE 62",
+    STAGE_DEDUPE: "HAPUS DUPLIKAT",
+    STAGE_CONVERT: "KE VCF",
+    STAGE_SPLIT: "SPLIT",
+    "read": "BACA",
+    "write": "TULIS",
+}
+
+def format_timing(seconds):
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:.1f}s"
+
+def run_pipeline_job(job, input_path):
+    params = job.params
+    source, _ = resolve_input(input_path, job.file_name, ('.txt',))
+    result = run_pipeline(source, job.workdir, params['stages'], params, reporter=job)
+
+    caption = f"✅ Pipeline selesai!\n🔗 {' → '.join(STAGE_LABELS[stage] for stage in order_stages(params['stages']))}"
+    caption += f"\n📂 Total: {result['records']} {'kontak' if STAGE_CONVERT in params['stages'] else 'nomor'}"
+    if len(result['outputs']) > 1:
+        caption += f" • {len(result['outputs'])} file"
+    if result['duplicates']:
+        caption += f"\n🧹 Duplikat dihapus: {result['duplicates']}"
+    caption += "\n⏱ " + " • ".join(
+        f"{STAGE_LABELS[stage]} {format_timing(seconds)}" for stage, seconds in result['timings'].items()
+    )
+
+    return {"outputs": result['outputs'], "caption": caption}
+
+register_job("pipeline", run_pipeline_job)
+
+def get_stage_keyboard():
+    buttons = list(STAGE_BUTTONS)
+    rows = [[KeyboardButton(label) for label in buttons[i:i + 2]] for i in range(0, len(buttons), 2)]
+    rows.append([KeyboardButton("✅ SELESAI ✅")])
+    rows.append([KeyboardButton("❌ BATAL ❌")])
+    return ReplyKeyboardMarkup(rows, resize_keyboard=True)
+
+def describe_chain(stages):
+    if not stages:
+        return "(belum ada)"
+    return " → ".join(STAGE_LABELS[stage] for stage in order_stages(stages))
+
+async def cancel_pipeline(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    context.user_data.pop('pipeline', None)
+    keyboard = get_main_menu_keyboard(update.effective_user.id)
+    await update.message.reply_text("```\n❌ Proses dibatalkan\n```",
+            parse_mode="Markdown", reply_markup=keyboard)
+    return ConversationHandler.END
+
+async def ask_next_step(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    pipeline = context.user_data['pipeline']
+    cancel_keyboard = ReplyKeyboardMarkup([[KeyboardButton("❌ BATAL ❌")]], resize_keyboard=True)
+
+    if STAGE_CONVERT in pipeline['stages'] and 'format' not in pipeline:
+        await update.message.reply_text(format_prompt(VCARD_FORMATS), parse_mode="Markdown",
+                reply_markup=get_format_keyboard(VCARD_FORMATS))
+        return ASK_FORMAT
+
+    if STAGE_CONVERT in pipeline['stages'] and 'contact_name' not in pipeline:
+        text = """```
+👤 NAMA KONTAK
+───────────────────────────────────────
+
+Masukkan format nama kontak
+(akan ditambah nomor urut otomatis)
+
+Contoh: kontak
+Hasil: kontak 0001, kontak 0002, ...
+
+───────────────────────────────────────
+```"""
+        await update.message.reply_text(text, parse_mode="Markdown", reply_markup=cancel_keyboard)
+        return ASK_CONTACT_NAME
+
+    if STAGE_SPLIT in pipeline['stages'] and 'split_size' not in pipeline:
+        text = """```
+✂️ JUMLAH PER FILE
+───────────────────────────────────────
+
+Masukkan jumlah nomor/kontak
+per file hasil split
+
+Contoh: 100
+
+───────────────────────────────────────
+```"""
+        await update.message.reply_text(text, parse_mode="Markdown", reply_markup=cancel_keyboard)
+        return ASK_SPLIT_SIZE
+
+    text = f"""```
+📝 NAMA FILE OUTPUT
+───────────────────────────────────────
+
+Pipeline: {describe_chain(pipeline['stages'])}
+
+Masukkan nama file hasil
+(tanpa ekstensi)
+
+───────────────────────────────────────
+```"""
+    await update.message.reply_text(text, parse_mode="Markdown", reply_markup=cancel_keyboard)
+    return ASK_OUTPUT_NAME
+
+async def pipeline_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    user_id = update.effective_user.id
+
+    if not check_access(user_id, "VIP"):
+        user_role = get_user_role(user_id)
+        await send_access_denied(update, user_role, "VIP")
+        return ConversationHandler.END
+
+    if not await ensure_daily_quota(update):
+        return ConversationHandler.END
+
+    cancel_keyboard = ReplyKeyboardMarkup([[KeyboardButton("❌ BATAL ❌")]], resize_keyboard=True)
+
+    text = """```
+🔗 PIPELINE
+───────────────────────────────────────
+
+Jalankan beberapa tool sekaligus dalam
+satu proses, tanpa upload ulang:
+
+RAPIKAN → KODE 62 → HAPUS DUPLIKAT
+→ KE VCF → SPLIT
+
+Kirim file .txt yang ingin diproses
+
+───────────────────────────────────────
+```"""
+
+    await update.message.reply_text(text, parse_mode="Markdown", reply_markup=cancel_keyboard)
+    return ASK_FILE
+
+async def pipeline_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.message.text == "❌ BATAL ❌":
+        return await cancel_pipeline(update, context)
+
+    if not update.message.document:
+        await update.message.reply_text("```\n❌ Kirim file .txt!\n```", parse_mode="Markdown")
+        return ASK_FILE
+
+    if not accepts(update.message.document.file_name, ('.txt',)):
+        await update.message.reply_text("```\n❌ File harus berformat .txt, .zip atau .gz!\n```", parse_mode="Markdown")
+        return ASK_FILE
+
+    context.user_data['pipeline'] = {
+        'document': describe_document(update.message.document),
+        'stages': [],
+    }
+
+    text = f"""```
+🔗 PILIH TAHAP
+───────────────────────────────────────
+
+File: {update.message.document.file_name}
+
+Tekan tahap yang ingin dijalankan
+(tekan lagi untuk menghapus), lalu
+tekan "✅ SELESAI ✅"
+
+Urutan selalu mengikuti:
+RAPIKAN → KODE 62 → HAPUS DUPLIKAT
+→ KE VCF → SPLIT
+
+───────────────────────────────────────
+```"""
+
+    await update.message.reply_text(text, parse_mode="Markdown", reply_markup=get_stage_keyboard())
+    return ASK_STAGES
+
+async def pipeline_stages(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.message.text == "❌ BATAL ❌":
+        return await cancel_pipeline(update, context)
+
+    pipeline = context.user_data['pipeline']
+
+    if update.message.text == "✅ SELESAI ✅":
+        if not pipeline['stages']:
+            await update.message.reply_text("```\n❌ Pilih minimal 1 tahap!\n```", parse_mode="Markdown")
+            return ASK_STAGES
+        return await ask_next_step(update, context)
+
+    stage = STAGE_BUTTONS.get(update.message.text)
+    if stage is None:
+        await update.message.reply_text("```\n❌ Pilih tahap dari tombol!\n```", parse_mode="Markdown")
+        return ASK_STAGES
+
+    if stage in pipeline['stages']:
+        pipeline['stages'].remove(stage)
+    else:
+        pipeline['stages'].append(stage)
+    pipeline['stages'] = order_stages(pipeline['stages'])
+
+    await update.message.reply_text(f"```\n🔗 Pipeline: {describe_chain(pipeline['stages'])}\n```", parse_mode="Markdown")
+    return ASK_STAGES
+
+async def pipeline_format(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.message.text == "❌ BATAL ❌":
+        return await cancel_pipeline(update, context)
+
+    output_format = parse_format(update.message.text, VCARD_FORMATS)
+    if output_format is None:
+        await update.message.reply_text("```\n❌ Pilih format dari tombol!\n```", parse_mode="Markdown")
+        return ASK_FORMAT
+
+    context.user_data['pipeline']['format'] = output_format
+    return await ask_next_step(update, context)
+
+async def pipeline_contact_name(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.message.text == "❌ BATAL ❌":
+        return await cancel_pipeline(update, context)
+
+    context.user_data['pipeline']['contact_name'] = update.message.text.strip()
+    return await ask_next_step(update, context)
+
+async def pipeline_split_size(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.message.text == "❌ BATAL ❌":
+        return await cancel_pipeline(update, context)
+
+    try:
+        split_size = int(update.message.text.strip())
+        if split_size <= 0:
+            raise ValueError
+    except ValueError:
+        await update.message.reply_text("```\n❌ Masukkan angka lebih dari 0!\n```", parse_mode="Markdown")
+        return ASK_SPLIT_SIZE
+
+    context.user_data['pipeline']['split_size'] = split_size
+    return await ask_next_step(update, context)
+
+async def pipeline_output_name(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.message.text == "❌ BATAL ❌":
+        return await cancel_pipeline(update, context)
+
+    pipeline = context.user_data.pop('pipeline')
+    document = pipeline.pop('document')
+    pipeline['output_name'] = update.message.text.strip()
+
+    return await enqueue_file_job(update, "pipeline", document, pipeline)
@@ -1,29 +1,42 @@
-import os
-import re
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ContextTypes, ConversationHandler
-from commands.vip_system import check_access, send_access_denied, get_user_role, update_user_data, get_user_data
+from commands.vip_system import check_access, send_access_denied, get_user_role, ensure_daily_quota
 from commands.menu import get_main_menu_keyboard
+from commands.file_jobs import enqueue_file_job, describe_document
+from utils.file_jobs import register_job
+from utils.text_cleaner import clean_text_file, LineFilter
+from utils.archive import accepts, resolve_input, output_name as plain_name
 
-ASK_FILE = range(1)
+ASK_FILE, ASK_OPTION = range(2)
 
-def clean_text_file(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-    
-    cleaned_lines = []
-    for line in lines:
-        cleaned = ''.join(line.split())
-        cleaned = cleaned.replace('-', '')
-        cleaned = cleaned.replace('(', '')
-        cleaned = cleaned.replace(')', '')
-        cleaned = cleaned.replace('/', '')
-        cleaned = cleaned.replace('+', '')
-        if cleaned:
-            cleaned_lines.append(cleaned + '\n')
-    
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.writelines(cleaned_lines)
+RAPIKAN_OPTIONS = {
+    "🜲 RAPIKAN SAJA 🜲": {},
+    "🜲 + KODE NEGARA 62 🜲": {"country_code": "62"},
+    "🜲 + KODE 62 & CEK PANJANG 🜲": {"country_code": "62", "min_length": 10, "max_length": 15},
+}
+
+def run_rapikan_txt(job, input_path):
+    source, _ = resolve_input(input_path, job.file_name, ('.txt',))
+    output_name = f"cleaned_{plain_name(job.file_name, 'txt')}"
+    output_path = job.path(output_name)
+    line_filter = LineFilter(
+        job.params.get('country_code'), job.params.get('min_length'), job.params.get('max_length')
+    )
+    
+    result = clean_text_file(source, output_path, line_filter, reporter=job)
+    
+    caption = f"```\n✅ Berhasil merapikan TXT!\n\n📂 Total: {result['lines']} baris"
+    if result['dropped']:
+        caption += f"\n🗑️ Panjang tidak valid: {result['dropped']} baris"
+    caption += "\n\nKetik 'menu' untuk kembali.\n```"
+    
+    return {
+        "outputs": [(output_path, output_name)],
+        "caption": caption,
+        "parse_mode": "Markdown",
+    }
+
+register_job("rapikan_txt", run_rapikan_txt)
 
 async def rapikan_txt_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
@@ -33,6 +46,9 @@ async def rapikan_txt_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await send_access_denied(update, user_role, "VIP")
         return ConversationHandler.END
     
+    if not await ensure_daily_quota(update):
+        return ConversationHandler.END
+    
     cancel_keyboard = ReplyKeyboardMarkup([[KeyboardButton("❌ BATAL ❌")]], resize_keyboard=True)
     
     text = """```
@@ -60,36 +76,46 @@ async def rapikan_txt_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("```\n❌ Kirim file .txt!\n```", parse_mode="Markdown")
         return ASK_FILE
     
-    if not update.message.document.file_name.endswith('.txt'):
-        await update.message.reply_text("```\n❌ File harus berformat .txt!\n```", parse_mode="Markdown")
+    if not accepts(update.message.document.file_name, ('.txt',)):
+        await update.message.reply_text("```\n❌ File harus berformat .txt, .zip atau .gz!\n```", parse_mode="Markdown")
         return ASK_FILE
     
-    file = await update.message.document.get_file()
-    filepath = f"temp_{update.effective_user.id}_{update.message.document.file_name}"
-    await file.download_to_drive(filepath)
-    
-    clean_text_file(filepath)
-    
-    keyboard = get_main_menu_keyboard(update.effective_user.id)
-    
-    try:
-        await update.message.reply_document(
-            document=open(filepath, 'rb'),
-            filename=f"cleaned_{update.message.document.file_name}",
-            caption="```\n✅ Berhasil merapikan TXT!\n\nKetik 'menu' untuk kembali.\n```",
-            parse_mode="Markdown",
-            reply_markup=keyboard
-        )
-        
-        user_data = get_user_data(update.effective_user.id)
-        total_ops = user_data.get("total_operations", 0) + 1
-        update_user_data(update.effective_user.id, {"total_operations": total_ops})
-        
-    except Exception as e:
-        await update.message.reply_text(f"```\n❌ Error: {str(e)}\n```",
+    context.user_data['rapikan_document'] = describe_document(update.message.document)
+    
+    option_keyboard = ReplyKeyboardMarkup(
+        [[KeyboardButton(label)] for label in RAPIKAN_OPTIONS] + [[KeyboardButton("❌ BATAL ❌")]],
+        resize_keyboard=True
+    )
+    
+    text = """```
+🚧 OPSI RAPIKAN
+───────────────────────────────────────
+
+RAPIKAN SAJA
+  Hapus spasi dan tanda - ( ) / +
++ KODE NEGARA 62
+  Awalan 0 diganti 62 (0812 → 62812)
++ KODE 62 & CEK PANJANG
+  Baris di luar 10-15 digit dibuang
+
+───────────────────────────────────────
+```"""
+    
+    await update.message.reply_text(text, parse_mode="Markdown", reply_markup=option_keyboard)
+    return ASK_OPTION
+
+async def rapikan_txt_option(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.message.text == "❌ BATAL ❌":
+        context.user_data.pop('rapikan_document', None)
+        keyboard = get_main_menu_keyboard(update.effective_user.id)
+        await update.message.reply_text("```\n❌ Proses dibatalkan\n```",
                 parse_mode="Markdown", reply_markup=keyboard)
-    finally:
-        if os.path.exists(filepath):
-            os.remove(filepath)
+        return ConversationHandler.END
+    
+    params = RAPIKAN_OPTIONS.get(update.message.text)
+    if params is None:
+        await update.message.reply_text("```\n❌ Pilih opsi dari tombol!\n```", parse_mode="Markdown")
+        return ASK_OPTION
     
-    return ConversationHandler.END
+    document = context.user_data.pop('rapikan_document')
+    return await enqueue_file_job(update, "rapikan_txt", document, params)
@@ -1,7 +1,6 @@
 import logging
 import os
 import sys
-from datetime import datetime
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ContextTypes, ConversationHandler
 
@@ -117,10 +116,14 @@ async def show_bot_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
             db = get_db()
             if db.is_connected:
                 db_status = "🟢 Online"
-                from database.models import UserModel, VIPAccessModel, VVIPAccessModel, GroupSettingsModel
-                total_users = await UserModel.count_total()
-                total_vip = await VIPAccessModel.count_active()
-                total_vvip = await VVIPAccessModel.count_active()
+                from database.models import GroupSettingsModel
+                from utils.stats_service import stats_service
+                if not stats_service.loaded:
+                    await stats_service.reconcile()
+                stats = stats_service.snapshot()
+                total_users = stats["total_users"]
+                total_vip = stats["vip_active"]
+                total_vvip = stats["vvip_active"]
                 total_groups = await GroupSettingsModel.count_groups()
         except Exception as e:
             logger.error(f"Error getting bot status: {e}")
@@ -376,18 +379,19 @@ Cache berhasil dibersihkan!
 
 async def show_system_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
     import platform
-    import psutil
+    from utils.system_sampler import system_sampler
     
     python_version = platform.python_version()
     os_info = platform.system()
     
-    cpu_percent = psutil.cpu_percent(interval=0.5)
-    memory = psutil.virtual_memory()
-    disk = psutil.disk_usage('/')
-    
-    boot_time = datetime.fromtimestamp(psutil.boot_time())
-    uptime = datetime.now() - boot_time
-    uptime_str = f"{uptime.days}d {uptime.seconds // 3600}h {(uptime.seconds % 3600) // 60}m"
+    sample = system_sampler.latest()
+    if not sample or sample.get("cpu_percent") is None:
+        await update.message.reply_text(
+            "❌ Data sistem belum tersedia.",
+            parse_mode="Markdown",
+            reply_markup=get_sistem_bot_keyboard()
+        )
+        return ASK_SISTEM_ACTION
     
     text = f"""```
 💻 SYSTEM INFO
@@ -395,19 +399,25 @@ async def show_system_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 🐍 Python      : {python_version}
 🖥️ OS          : {os_info}
-⏰ Uptime      : {uptime_str}
+⏰ Uptime      : {system_sampler.uptime_str()}
 
 ───────────────────────────────────────
 RESOURCE USAGE
 ───────────────────────────────────────
-🖥️ CPU         : {cpu_percent}%
-💾 RAM         : {memory.percent}%
-📀 Disk        : {disk.percent}%
-
-💾 RAM Used    : {memory.used // (1024**2)} MB
-💾 RAM Total   : {memory.total // (1024**2)} MB
-📀 Disk Used   : {disk.used // (1024**3)} GB
-📀 Disk Total  : {disk.total // (1024**3)} GB
+🖥️ CPU         : {sample['cpu_percent']}%
+💾 RAM         : {sample['mem_percent']}%
+📀 Disk        : {sample['disk_percent']}%
+
+💾 RAM Used    : {sample['mem_used'] // (1024**2)} MB
+💾 RAM Total   : {sample['mem_total'] // (1024**2)} MB
+📀 Disk Used   : {sample['disk_used'] // (1024**3)} GB
+📀 Disk Total  : {sample['disk_total'] // (1024**3)} GB
+
+───────────────────────────────────────
+TREN 1 JAM (CPU / RAM)
+───────────────────────────────────────
+{system_sampler.trend('cpu_percent', width=20)}
+{system_sampler.trend('mem_percent', width=20)}
 
 ───────────────────────────────────────
 ```"""
@@ -0,0 +1,126 @@
+from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
+from telegram.ext import ContextTypes, ConversationHandler
+from commands.vip_system import check_access, send_access_denied, get_user_role, ensure_daily_quota
+from commands.menu import get_main_menu_keyboard
+from commands.file_jobs import enqueue_file_job, describe_document
+from utils.file_jobs import register_job
+from utils.external_sort import sort_file, SORT_NUMERIC, SORT_E164, SORT_NAME
+from utils.archive import accepts, data_type, resolve_input, output_name as plain_name, DATA_EXTENSIONS
+
+ASK_FILE, ASK_SORT_KEY = range(2)
+
+SORT_KEY_BUTTONS = {
+    "🜲 URUT ANGKA 🜲": SORT_NUMERIC,
+    "🜲 URUT E.164 🜲": SORT_E164,
+}
+
+SORT_KEY_LABELS = {
+    SORT_NUMERIC: "angka",
+    SORT_E164: "E.164",
+    SORT_NAME: "nama kontak",
+}
+
+def run_sort_file(job, input_path):
+    source, file_type = resolve_input(input_path, job.file_name, DATA_EXTENSIONS)
+    sort_by = SORT_NAME if file_type == 'vcf' else job.params.get('sort_by', SORT_NUMERIC)
+    output_name = f"sorted_{plain_name(job.file_name, file_type)}"
+    output_path = job.path(output_name)
+
+    result = sort_file(source, output_path, sort_by, reporter=job, workdir=job.workdir)
+
+    return {
+        "outputs": [(output_path, output_name)],
+        "caption": f"✅ Berhasil sort file!\n📂 Total: {result['records']} baris\n🔢 Urut: {SORT_KEY_LABELS[sort_by]}",
+    }
+
+register_job("sort_file", run_sort_file)
+
+async def sort_file_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    user_id = update.effective_user.id
+
+    if not check_access(user_id, "VIP"):
+        user_role = get_user_role(user_id)
+        await send_access_denied(update, user_role, "VIP")
+        return ConversationHandler.END
+
+    if not await ensure_daily_quota(update):
+        return ConversationHandler.END
+
+    cancel_keyboard = ReplyKeyboardMarkup([[KeyboardButton("❌ BATAL ❌")]], resize_keyboard=True)
+
+    text = """```
+🔢 SORT FILE
+───────────────────────────────────────
+
+Kirim file .txt (nomor) atau .vcf
+(kontak) yang ingin diurutkan.
+
+TXT diurutkan per nomor, VCF
+diurutkan per nama kontak (FN).
+
+───────────────────────────────────────
+```"""
+
+    await update.message.reply_text(text, parse_mode="Markdown", reply_markup=cancel_keyboard)
+    return ASK_FILE
+
+async def sort_file_receive(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.message.text == "❌ BATAL ❌":
+        keyboard = get_main_menu_keyboard(update.effective_user.id)
+        await update.message.reply_text("```\n❌ Proses dibatalkan\n```",
+                parse_mode="Markdown", reply_markup=keyboard)
+        return ConversationHandler.END
+
+    if not update.message.document:
+        await update.message.reply_text("```\n❌ Kirim file .txt atau .vcf!\n```", parse_mode="Markdown")
+        return ASK_FILE
+
+    filename = update.message.document.file_name
+
+    if not accepts(filename, DATA_EXTENSIONS):
+        await update.message.reply_text("```\n❌ File harus .txt, .vcf, .zip atau .gz!\n```", parse_mode="Markdown")
+        return ASK_FILE
+
+    if data_type(filename) == 'vcf':
+        return await enqueue_file_job(update, "sort_file", describe_document(update.message.document),
+                                      {"sort_by": SORT_NAME})
+
+    context.user_data['sort_document'] = describe_document(update.message.document)
+
+    key_keyboard = ReplyKeyboardMarkup(
+        [[KeyboardButton(label) for label in SORT_KEY_BUTTONS], [KeyboardButton("❌ BATAL ❌")]],
+        resize_keyboard=True
+    )
+
+    text = f"""```
+🔢 CARA URUT
+───────────────────────────────────────
+
+File: {filename}
+
+URUT ANGKA
+  Nilai angka apa adanya
+URUT E.164
+  Dinormalisasi dulu (08xx → +628xx)
+
+───────────────────────────────────────
+```"""
+
+    await update.message.reply_text(text, parse_mode="Markdown", reply_markup=key_keyboard)
+    return ASK_SORT_KEY
+
+async def sort_file_key(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.message.text == "❌ BATAL ❌":
+        context.user_data.pop('sort_document', None)
+        keyboard = get_main_menu_keyboard(update.effective_user.id)
+        await update.message.reply_text("```\n❌ Proses dibatalkan\n```",
+                parse_mode="Markdown", reply_markup=keyboard)
+        return ConversationHandler.END
+
+    sort_by = SORT_KEY_BUTTONS.get(update.message.text)
+    if sort_by is None:
+        await update.message.reply_text("```\n❌ Pilih cara urut dari tombol!\n```", parse_mode="Markdown")
+        return ASK_SORT_KEY
+
+    document = context.user_data.pop('sort_document')
+    return await enqueue_file_job(update, "sort_file", document, {"sort_by": sort_by})
@@ -1,10 +1,16 @@
-import os
 import re
-import vobject
+from itertools import islice
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ContextTypes, ConversationHandler
-from commands.vip_system import check_access, send_access_denied, get_user_role, update_user_data, get_user_data
+from commands.vip_system import check_access, send_access_denied, get_user_role, ensure_daily_quota
 from commands.menu import get_main_menu_keyboard
+from commands.file_jobs import enqueue_file_job, describe_document
+from utils.file_jobs import register_job
+from utils.lazy_import import lazy_module
+from utils.number_extract import count_numbers, iter_numbers
+from utils.archive import accepts, data_type, resolve_input, open_text, DATA_EXTENSIONS
+
+vobject = lazy_module("vobject")
 
 ASK_FILE, ASK_OUTPUT_NAME, ASK_FILE_PREFIX, ASK_CONTACT_PREFIX, ASK_SPLIT_MODE, ASK_SPLIT_VALUE = range(6)
 
@@ -31,6 +37,81 @@ def rename_contacts_split(contacts, start_index, contact_prefix):
         renamed_contacts.append(contact)
     return renamed_contacts
 
+def run_split_file(job, filepath):
+    params = job.params
+    source, file_type = resolve_input(filepath, job.file_name, DATA_EXTENSIONS)
+    output_name = params['output_name']
+    file_prefix = params['file_prefix']
+    contact_prefix = params['contact_prefix']
+    split_mode = params['split_mode']
+    split_value = params['split_value']
+    output_files = []
+    
+    if file_type == 'vcf':
+        with open_text(source) as f:
+            vcf_content = f.read()
+        contacts = list(vobject.readComponents(vcf_content))
+        total_contacts = len(contacts)
+        
+        if split_mode == "PER KONTAK":
+            contacts_per_file = split_value
+            num_files = (total_contacts + contacts_per_file - 1) // contacts_per_file
+        else:
+            num_files = split_value
+            contacts_per_file = (total_contacts + num_files - 1) // num_files
+        
+        global_contact_index = contact_prefix
+        
+        for i in range(num_files):
+            job.check()
+            start_idx = i * contacts_per_file
+            end_idx = min(start_idx + contacts_per_file, total_contacts)
+            chunk = contacts[start_idx:end_idx]
+            
+            renamed_chunk = rename_contacts_split(chunk, global_contact_index, contact_prefix)
+            
+            output_name_i = f"{output_name}{file_prefix + i}.vcf"
+            output_file = job.path(output_name_i)
+            with open(output_file, 'w', encoding='utf-8') as f:
+                for contact in renamed_chunk:
+                    f.write(contact.serialize())
+            
+            output_files.append((output_file, output_name_i))
+            global_contact_index += len(chunk)
+            job.progress(end_idx, total_contacts)
+    
+    else:
+        total_numbers = count_numbers(source)
+        numbers = iter_numbers(source)
+        
+        if split_mode == "PER KONTAK":
+            numbers_per_file = split_value
+            num_files = (total_numbers + numbers_per_file - 1) // numbers_per_file
+        else:
+            num_files = split_value
+            numbers_per_file = (total_numbers + num_files - 1) // num_files
+        
+        for i in range(num_files):
+            job.check()
+            start_idx = i * numbers_per_file
+            end_idx = min(start_idx + numbers_per_file, total_numbers)
+            chunk = islice(numbers, max(0, end_idx - start_idx))
+            
+            output_name_i = f"{output_name}{file_prefix + i}.txt"
+            output_file = job.path(output_name_i)
+            with open(output_file, 'wb') as f:
+                f.write(b'\n'.join(chunk))
+            
+            output_files.append((output_file, output_name_i))
+            job.progress(end_idx, total_numbers)
+    
+    return {
+        "outputs": output_files,
+        "caption": f"✅ Berhasil split!\n📂 Total: {len(output_files)} file\n📁 Nama: {output_name}",
+    }
+
+register_job("split_file", run_split_file)
+
 async def split_file_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
     
@@ -39,6 +120,9 @@ async def split_file_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await send_access_denied(update, user_role, "VIP")
         return ConversationHandler.END
     
+    if not await ensure_daily_quota(update):
+        return ConversationHandler.END
+    
     cancel_keyboard = ReplyKeyboardMarkup([[KeyboardButton("❌ BATAL ❌")]], resize_keyboard=True)
     
     text = """```
@@ -66,16 +150,12 @@ async def split_file_receive(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     filename = update.message.document.file_name
     
-    if not (filename.endswith('.txt') or filename.endswith('.vcf')):
-        await update.message.reply_text("```\n❌ File harus .txt atau .vcf!\n```", parse_mode="Markdown")
+    if not accepts(filename, DATA_EXTENSIONS):
+        await update.message.reply_text("```\n❌ File harus .txt, .vcf, .zip atau .gz!\n```", parse_mode="Markdown")
         return ASK_FILE
     
-    file = await update.message.document.get_file()
-    filepath = f"temp_{update.effective_user.id}_{filename}"
-    await file.download_to_drive(filepath)
-    
-    file_type = 'txt' if filename.endswith('.txt') else 'vcf'
-    context.user_data['split_file'] = filepath
+    file_type = data_type(filename)
+    context.user_data['split_document'] = describe_document(update.message.document)
     context.user_data['split_type'] = file_type
     
     cancel_keyboard = ReplyKeyboardMarkup([[KeyboardButton("❌ BATAL ❌")]], resize_keyboard=True)
@@ -98,8 +178,6 @@ Hasil: kontak1, kontak2, kontak3...
 
 async def split_file_output_name(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.message.text == "❌ BATAL ❌":
-        if 'split_file' in context.user_data and os.path.exists(context.user_data['split_file']):
-            os.remove(context.user_data['split_file'])
         keyboard = get_main_menu_keyboard(update.effective_user.id)
         await update.message.reply_text("```\n❌ Proses dibatalkan\n```", parse_mode="Markdown", reply_markup=keyboard)
         return ConversationHandler.END
@@ -125,8 +203,6 @@ Hasil: kontak1, kontak2, kontak3...
 
 async def split_file_prefix(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.message.text == "❌ BATAL ❌":
-        if 'split_file' in context.user_data and os.path.exists(context.user_data['split_file']):
-            os.remove(context.user_data['split_file'])
         keyboard = get_main_menu_keyboard(update.effective_user.id)
         await update.message.reply_text("```\n❌ Proses dibatalkan\n```", parse_mode="Markdown", reply_markup=keyboard)
         return ConversationHandler.END
@@ -157,8 +233,6 @@ Hasil: kontak 01, kontak 02, kontak 03...
 
 async def split_contact_prefix(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.message.text == "❌ BATAL ❌":
-        if 'split_file' in context.user_data and os.path.exists(context.user_data['split_file']):
-            os.remove(context.user_data['split_file'])
         keyboard = get_main_menu_keyboard(update.effective_user.id)
         await update.message.reply_text("```\n❌ Proses dibatalkan\n```", parse_mode="Markdown", reply_markup=keyboard)
         return ConversationHandler.END
@@ -194,8 +268,6 @@ PER BAGIAN: Bagi file menjadi X bagian
 
 async def split_mode_select(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.message.text == "❌ BATAL ❌":
-        if 'split_file' in context.user_data and os.path.exists(context.user_data['split_file']):
-            os.remove(context.user_data['split_file'])
         keyboard = get_main_menu_keyboard(update.effective_user.id)
         await update.message.reply_text("```\n❌ Proses dibatalkan\n```", parse_mode="Markdown", reply_markup=keyboard)
         return ConversationHandler.END
@@ -240,8 +312,6 @@ Contoh: 5
 
 async def split_process(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.message.text == "❌ BATAL ❌":
-        if 'split_file' in context.user_data and os.path.exists(context.user_data['split_file']):
-            os.remove(context.user_data['split_file'])
         keyboard = get_main_menu_keyboard(update.effective_user.id)
         await update.message.reply_text("```\n❌ Proses dibatalkan\n```", parse_mode="Markdown", reply_markup=keyboard)
         return ConversationHandler.END
@@ -252,90 +322,11 @@ async def split_process(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("```\n❌ Masukkan angka yang valid!\n```", parse_mode="Markdown")
         return ASK_SPLIT_VALUE
     
-    filepath = context.user_data.get('split_file')
-    file_type = context.user_data.get('split_type')
-    output_name = context.user_data.get('output_name')
-    file_prefix = context.user_data.get('file_prefix')
-    contact_prefix = context.user_data.get('contact_prefix')
-    split_mode = context.user_data.get('split_mode')
-    
-    keyboard = get_main_menu_keyboard(update.effective_user.id)
-    output_files = []
-    
-    try:
-        if file_type == 'vcf':
-            with open(filepath, 'r', encoding='utf-8') as f:
-                vcf_content = f.read()
-            contacts = list(vobject.readComponents(vcf_content))
-            total_contacts = len(contacts)
-            
-            if split_mode == "PER KONTAK":
-                contacts_per_file = split_value
-                num_files = (total_contacts + contacts_per_file - 1) // contacts_per_file
-            else:
-                num_files = split_value
-                contacts_per_file = (total_contacts + num_files - 1) // num_files
-            
-            global_contact_index = contact_prefix
-            
-            for i in range(num_files):
-                start_idx = i * contacts_per_file
-                end_idx = min(start_idx + contacts_per_file, total_contacts)
-                chunk = contacts[start_idx:end_idx]
-                
-                renamed_chunk = rename_contacts_split(chunk, global_contact_index, contact_prefix)
-                
-                output_file = f"temp_{update.effective_user.id}_{output_name}{file_prefix + i}.vcf"
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    for contact in renamed_chunk:
-                        f.write(contact.serialize())
-                
-                output_files.append(output_file)
-                global_contact_index += len(chunk)
-        
-        else:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            numbers = re.findall(r'\d+', content)
-            total_numbers = len(numbers)
-            
-            if split_mode == "PER KONTAK":
-                numbers_per_file = split_value
-                num_files = (total_numbers + numbers_per_file - 1) // numbers_per_file
-            else:
-                num_files = split_value
-                numbers_per_file = (total_numbers + num_files - 1) // num_files
-            
-            for i in range(num_files):
-                start_idx = i * numbers_per_file
-                end_idx = min(start_idx + numbers_per_file, total_numbers)
-                chunk = numbers[start_idx:end_idx]
-                
-                output_file = f"temp_{update.effective_user.id}_{output_name}{file_prefix + i}.txt"
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write('\n'.join(chunk))
-                
-                output_files.append(output_file)
-        
-        for i, output_file in enumerate(output_files):
-            await update.message.reply_document(
-                document=open(output_file, 'rb'),
-                filename=os.path.basename(output_file).replace(f"temp_{update.effective_user.id}_", "")
-            )
-        
-        await update.message.reply_text(f"✅ Berhasil split!\n📂 Total: {len(output_files)} file\n📁 Nama: {output_name}", parse_mode="Markdown", reply_markup=keyboard)
-        
-        user_data = get_user_data(update.effective_user.id)
-        total_ops = user_data.get("total_operations", 0) + 1
-        update_user_data(update.effective_user.id, {"total_operations": total_ops})
-        
-    except Exception as e:
-        await update.message.reply_text(f"```\n❌ Error: {str(e)}\n```", parse_mode="Markdown", reply_markup=keyboard)
-    finally:
-        if os.path.exists(filepath):
-            os.remove(filepath)
-        for output_file in output_files:
-            if os.path.exists(output_file):
-                os.remove(output_file)
-    
-    return ConversationHandler.END
+    return await enqueue_file_job(update, "split_file", context.user_data['split_document'], {
+        "file_type": context.user_data.get('split_type'),
+        "output_name": context.user_data.get('output_name'),
+        "file_prefix": context.user_data.get('file_prefix'),
+        "contact_prefix": context.user_data.get('contact_prefix'),
+        "split_mode": context.user_data.get('split_mode'),
+        "split_value": split_value,
+    })
@@ -254,6 +254,8 @@ Saya siap bantu convert file & management kontak.
 🜲 HITUNG KONTAK        — Hitung kontak  
 🜲 CEK NAMA KONTAK      — Validasi nama  
 🜲 SPLIT FILE           — Bagi file  
+🜲 SORT FILE            — Urutkan file  
+🜲 PIPELINE             — Multi tool  
 🎁 REDEEM CODE          — Aktivasi  
 
 ───────────────────────────────────────
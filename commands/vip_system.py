@@ -3,7 +3,19 @@ import os
 from datetime import datetime
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ContextTypes
-from config import OWNER_ID, VIP_GROUPS, USERS_FILE, DATE_FORMAT, ROLE_HIERARCHY, VIP_DURATION_DAYS
+from config import (
+    OWNER_ID, VIP_GROUPS, USERS_FILE, DATE_FORMAT, ROLE_HIERARCHY, VIP_DURATION_DAYS,
+    VIP_DAILY_LIMIT, VVIP_DAILY_LIMIT, FREE_DAILY_LIMIT
+)
+from utils.quota import quota_manager
+
+ROLE_DAILY_LIMITS = {
+    "OWNER": None,
+    "VVIP": VVIP_DAILY_LIMIT,
+    "PREMIUM": VVIP_DAILY_LIMIT,
+    "VIP": VIP_DAILY_LIMIT,
+    "FREE": FREE_DAILY_LIMIT,
+}
 
 def load_users():
     try:
@@ -75,6 +87,55 @@ mendapatkan akses:
     
     await update.message.reply_text(text, parse_mode="HTML", reply_markup=reply_markup)
 
+def get_daily_limit(user_id):
+    return ROLE_DAILY_LIMITS.get(get_user_role(user_id), FREE_DAILY_LIMIT)
+
+async def check_daily_quota(user_id):
+    limit = get_daily_limit(user_id)
+    used = await quota_manager.used(user_id)
+    remaining = None if limit is None else max(0, limit - used)
+    return remaining is None or remaining > 0, used, remaining
+
+async def send_quota_exhausted(update: Update, limit, used):
+    text = f"""```
+──────────────────────────
+⛔ LIMIT HARIAN HABIS
+──────────────────────────
+Limit Harian       : {limit}
+Digunakan          : {used}
+
+Limit akan direset pukul 00:00 UTC.
+Upgrade role untuk limit lebih besar.
+──────────────────────────
+```"""
+    
+    keyboard = [
+        [KeyboardButton("💎 UPGRADE PREMIUM 💎")],
+        [KeyboardButton("🔙 MENU 🔙")]
+    ]
+    reply_markup = ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
+    
+    await update.message.reply_text(text, parse_mode="Markdown", reply_markup=reply_markup)
+
+async def ensure_daily_quota(update: Update):
+    user_id = update.effective_user.id
+    allowed, used, remaining = await check_daily_quota(user_id)
+    if not allowed:
+        await send_quota_exhausted(update, get_daily_limit(user_id), used)
+    return allowed
+
+async def consume_daily_quota(update: Update, amount: int = 1):
+    user_id = update.effective_user.id
+    limit = get_daily_limit(user_id)
+    allowed, used, remaining = await quota_manager.consume(user_id, limit, amount)
+    
+    if not allowed:
+        await send_quota_exhausted(update, limit, used)
+    return allowed
+
+def refund_daily_quota(user_id, amount: int = 1):
+    quota_manager.refund(user_id, amount)
+
 def get_user_data(user_id):
     users = load_users()
     return users.get(str(user_id), {})
@@ -87,8 +87,17 @@ TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 MAX_FILE_SIZE = 50 * 1024 * 1024
+
+JOB_ROLE_WEIGHTS = {"reguler": 1, "vip": 2, "vvip": 4, "owner": 8}
+JOB_ROLE_MAX_RUNNING = {"reguler": 1, "vip": 2, "vvip": 3, "owner": 4}
+JOB_ROLE_MAX_QUEUED = {"reguler": 2, "vip": 5, "vvip": 10, "owner": 50}
+JOB_ROLE_QUEUE_CEILING = {"reguler": 40, "vip": 80, "vvip": 150, "owner": None}
 RATE_LIMIT_WINDOW = 60
 RATE_LIMIT_MAX = 30
 
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+LOOP_STALL_THRESHOLD_MS = int(os.getenv("LOOP_STALL_THRESHOLD_MS", "250"))
+
 def is_owner(user_id: int) -> bool:
     return user_id in OWNER_IDS
@@ -1,4 +1,4 @@
-from database.connection import db, get_db, init_db, close_db
+from database.connection import db, get_db, init_db, close_db, DatabaseUnavailable, QueryTimeout
 from database.models import (
     UserModel, AdminModel, SessionModel, VIPAccessModel, VVIPAccessModel,
     RedeemCodeModel, GroupSettingsModel, ActivityLogModel, MonitoringLogModel,
@@ -6,7 +6,7 @@ from database.models import (
 )
 
 __all__ = [
-    'db', 'get_db', 'init_db', 'close_db',
+    'db', 'get_db', 'init_db', 'close_db', 'DatabaseUnavailable', 'QueryTimeout',
     'UserModel', 'AdminModel', 'SessionModel', 'VIPAccessModel', 'VVIPAccessModel',
     'RedeemCodeModel', 'GroupSettingsModel', 'ActivityLogModel', 'MonitoringLogModel',
     'BotStatusModel', 'SystemSecurityModel', 'FileTaskModel'
@@ -1,16 +1,134 @@
 import os
+import re
+import time
 import asyncio
 import logging
 import asyncpg
+from collections import deque
+from functools import lru_cache
 from typing import Optional
 import json
 
+from utils.metrics import metrics
+from database.migrations import run_migrations
+
 logger = logging.getLogger(__name__)
 
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", "30"))
+ACQUIRE_TIMEOUT = float(os.getenv("DB_ACQUIRE_TIMEOUT", "10"))
+SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+POOL_CLOSE_TIMEOUT = float(os.getenv("DB_POOL_CLOSE_TIMEOUT", "10"))
+
+CONNECTION_ERRORS = (
+    asyncpg.PostgresConnectionError,
+    asyncpg.InterfaceError,
+    asyncpg.TooManyConnectionsError,
+    asyncpg.CannotConnectNowError,
+    ConnectionError,
+    OSError,
+)
+
+STATEMENT_PATTERN = re.compile(
+    r"^\s*(?:WITH\b.*?\)\s*)?(SELECT|INSERT|UPDATE|DELETE|CREATE|ALTER|DROP|COPY)\b"
+    r"(?:.*?\b(?:FROM|INTO|UPDATE|TABLE|JOIN)\s+([A-Za-z_][A-Za-z0-9_]*))?",
+    re.IGNORECASE | re.DOTALL
+)
+
+
+class DatabaseUnavailable(Exception):
+    pass
+
+
+class QueryTimeout(DatabaseUnavailable):
+    pass
+
+
+@lru_cache(maxsize=512)
+def statement_label(query: str) -> str:
+    match = STATEMENT_PATTERN.match(query)
+    if not match:
+        return "other"
+    verb = match.group(1).upper()
+    table = match.group(2)
+    if verb == "UPDATE":
+        table_match = re.match(r"^\s*UPDATE\s+([A-Za-z_][A-Za-z0-9_]*)", query, re.IGNORECASE)
+        table = table_match.group(1) if table_match else table
+    return f"{verb} {table.lower()}" if table else verb
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self.probing = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self.probing = False
+        if self.probing:
+            return False
+        self.probing = True
+        return True
+
+    def end_probe(self):
+        self.probing = False
+
+    def record_success(self):
+        self.failures = 0
+        self.state = self.CLOSED
+        self.probing = False
+
+    def record_failure(self) -> bool:
+        self.failures += 1
+        self.probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+
 class Database:
     def __init__(self):
         self.pool: Optional[asyncpg.Pool] = None
         self.is_connected = False
+        self.uri = None
+        self.breaker = CircuitBreaker()
+        self.waiting = 0
+        self.errors = {}
+        self.last_error = None
+        self.reconnects = 0
+        self.slow_queries = deque(maxlen=20)
+        self.schema_version = 0
+        self._reconnect_task: Optional[asyncio.Task] = None
+    
+    async def _create_pool(self, database_url: str):
+        return await asyncpg.create_pool(
+            database_url,
+            min_size=POOL_MIN_SIZE,
+            max_size=POOL_MAX_SIZE,
+            command_timeout=COMMAND_TIMEOUT,
+            statement_cache_size=STATEMENT_CACHE_SIZE,
+            max_inactive_connection_lifetime=300
+        )
     
     async def connect(self, uri: str = None):
         try:
@@ -19,338 +137,191 @@ class Database:
                 logger.error("DATABASE_URL not found in environment variables!")
                 return False
             
-            self.pool = await asyncpg.create_pool(
-                database_url,
-                min_size=2,
-                max_size=10,
-                command_timeout=30,
-                statement_cache_size=100
-            )
+            self.uri = database_url
+            self.pool = await self._create_pool(database_url)
             
             async with self.pool.acquire() as conn:
                 await conn.execute("SELECT 1")
             
             self.is_connected = True
+            self.breaker.record_success()
             
             await self._create_tables()
             
-            logger.info("PostgreSQL connected successfully!")
+            logger.info(f"PostgreSQL connected successfully! (pool {POOL_MIN_SIZE}-{POOL_MAX_SIZE})")
             return True
             
         except Exception as e:
             logger.error(f"PostgreSQL connection failed: {e}")
             self.is_connected = False
+            if self.pool:
+                await self.pool.close()
+                self.pool = None
             return False
     
     async def _create_tables(self):
         try:
             async with self.pool.acquire() as conn:
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS users (
-                        id SERIAL PRIMARY KEY,
-                        user_id BIGINT UNIQUE NOT NULL,
-                        username VARCHAR(255),
-                        first_name VARCHAR(255),
-                        last_name VARCHAR(255),
-                        role VARCHAR(50) DEFAULT 'reguler',
-                        is_banned BOOLEAN DEFAULT FALSE,
-                        daily_limit INTEGER DEFAULT 10,
-                        daily_used INTEGER DEFAULT 0,
-                        total_requests INTEGER DEFAULT 0,
-                        last_request_date DATE,
-                        is_active BOOLEAN DEFAULT TRUE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS admins (
-                        id SERIAL PRIMARY KEY,
-                        user_id BIGINT UNIQUE NOT NULL,
-                        username VARCHAR(255),
-                        role VARCHAR(50) DEFAULT 'admin',
-                        permissions TEXT DEFAULT '{}',
-                        is_active BOOLEAN DEFAULT TRUE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS vip_access (
-                        id SERIAL PRIMARY KEY,
-                        user_id BIGINT UNIQUE NOT NULL,
-                        status VARCHAR(50) DEFAULT 'active',
-                        expired_at TIMESTAMP NOT NULL,
-                        daily_limit INTEGER DEFAULT 50,
-                        features_enabled TEXT DEFAULT '[]',
-                        is_active BOOLEAN DEFAULT TRUE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS vvip_access (
-                        id SERIAL PRIMARY KEY,
-                        user_id BIGINT UNIQUE NOT NULL,
-                        status VARCHAR(50) DEFAULT 'active',
-                        expired_at TIMESTAMP NOT NULL,
-                        daily_limit INTEGER DEFAULT 100,
-                        features_enabled TEXT DEFAULT '[]',
-                        is_active BOOLEAN DEFAULT TRUE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS redeem_codes (
-                        id SERIAL PRIMARY KEY,
-                        code VARCHAR(100) UNIQUE NOT NULL,
-                        type VARCHAR(50) NOT NULL,
-                        duration_days INTEGER DEFAULT 7,
-                        max_uses INTEGER DEFAULT 1,
-                        current_uses INTEGER DEFAULT 0,
-                        used_by TEXT DEFAULT '[]',
-                        status VARCHAR(50) DEFAULT 'active',
-                        expired_at TIMESTAMP,
-                        issuer_id BIGINT,
-                        notes TEXT,
-                        is_active BOOLEAN DEFAULT TRUE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS sessions (
-                        id SERIAL PRIMARY KEY,
-                        user_id BIGINT NOT NULL,
-                        session_token VARCHAR(255),
-                        data TEXT DEFAULT '{}',
-                        expired_at TIMESTAMP,
-                        is_active BOOLEAN DEFAULT TRUE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS group_settings (
-                        id SERIAL PRIMARY KEY,
-                        group_id BIGINT UNIQUE NOT NULL,
-                        group_title VARCHAR(255),
-                        status VARCHAR(50) DEFAULT 'active',
-                        anti_link BOOLEAN DEFAULT FALSE,
-                        anti_spam BOOLEAN DEFAULT FALSE,
-                        anti_virtex BOOLEAN DEFAULT FALSE,
-                        auto_welcome BOOLEAN DEFAULT FALSE,
-                        welcome_message TEXT DEFAULT 'Selamat datang di grup!',
-                        auto_leave BOOLEAN DEFAULT FALSE,
-                        auto_kick_rules TEXT DEFAULT '[]',
-                        banned_words TEXT DEFAULT '[]',
-                        link_whitelist TEXT DEFAULT '[]',
-                        slowmode_seconds INTEGER DEFAULT 0,
-                        bot_features_enabled BOOLEAN DEFAULT TRUE,
-                        is_active BOOLEAN DEFAULT TRUE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS group_members (
-                        id SERIAL PRIMARY KEY,
-                        group_id BIGINT NOT NULL,
-                        user_id BIGINT NOT NULL,
-                        username VARCHAR(255),
-                        first_name VARCHAR(255),
-                        role VARCHAR(50) DEFAULT 'member',
-                        warnings INTEGER DEFAULT 0,
-                        is_muted BOOLEAN DEFAULT FALSE,
-                        is_banned BOOLEAN DEFAULT FALSE,
-                        joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        is_active BOOLEAN DEFAULT TRUE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        UNIQUE(group_id, user_id)
-                    )
-                """)
-                
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS forced_group_join (
-                        id SERIAL PRIMARY KEY,
-                        group_link VARCHAR(255) NOT NULL,
-                        group_id BIGINT,
-                        group_name VARCHAR(255),
-                        is_required BOOLEAN DEFAULT TRUE,
-                        is_active BOOLEAN DEFAULT TRUE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS required_groups (
-                        id SERIAL PRIMARY KEY,
-                        group_name VARCHAR(255) NOT NULL,
-                        group_link VARCHAR(255) NOT NULL,
-                        group_id BIGINT,
-                        is_active BOOLEAN DEFAULT TRUE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS user_verification (
-                        id SERIAL PRIMARY KEY,
-                        user_id BIGINT UNIQUE NOT NULL,
-                        joined_group1 BOOLEAN DEFAULT FALSE,
-                        joined_group2 BOOLEAN DEFAULT FALSE,
-                        last_verified TIMESTAMP,
-                        status VARCHAR(50) DEFAULT 'not_verified',
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS guild_modes (
-                        id SERIAL PRIMARY KEY,
-                        group_id BIGINT UNIQUE NOT NULL,
-                        mode VARCHAR(10) DEFAULT 'OFF',
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS activity_logs (
-                        id SERIAL PRIMARY KEY,
-                        user_id BIGINT NOT NULL,
-                        username VARCHAR(255),
-                        group_id BIGINT,
-                        action VARCHAR(255) NOT NULL,
-                        details TEXT DEFAULT '{}',
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS monitoring_logs (
-                        id SERIAL PRIMARY KEY,
-                        type VARCHAR(100) NOT NULL,
-                        message TEXT,
-                        level VARCHAR(50) DEFAULT 'info',
-                        details TEXT DEFAULT '{}',
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS system_security (
-                        id SERIAL PRIMARY KEY,
-                        user_id BIGINT,
-                        type VARCHAR(100) NOT NULL,
-                        action VARCHAR(255),
-                        ip_address VARCHAR(50),
-                        details TEXT DEFAULT '{}',
-                        is_blocked BOOLEAN DEFAULT FALSE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS file_processing (
-                        id SERIAL PRIMARY KEY,
-                        user_id BIGINT NOT NULL,
-                        file_type VARCHAR(50),
-                        file_name VARCHAR(255),
-                        file_size BIGINT,
-                        status VARCHAR(50) DEFAULT 'pending',
-                        result TEXT DEFAULT '{}',
-                        error_message TEXT,
-                        is_active BOOLEAN DEFAULT TRUE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                await conn.execute("""
-                    CREATE TABLE IF NOT EXISTS bot_status (
-                        id SERIAL PRIMARY KEY,
-                        key VARCHAR(100) UNIQUE NOT NULL,
-                        value TEXT,
-                        is_active BOOLEAN DEFAULT TRUE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_users_user_id ON users(user_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_vip_access_user_id ON vip_access(user_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_vip_access_expired_at ON vip_access(expired_at)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_vvip_access_user_id ON vvip_access(user_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_vvip_access_expired_at ON vvip_access(expired_at)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_redeem_codes_code ON redeem_codes(code)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_activity_logs_user_id ON activity_logs(user_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_activity_logs_created_at ON activity_logs(created_at)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_group_settings_group_id ON group_settings(group_id)")
-                
-                logger.info("Database tables created successfully!")
-                
+                self.schema_version = await run_migrations(conn)
+                logger.info(f"Database schema at version {self.schema_version}")
         except Exception as e:
-            logger.error(f"Error creating tables: {e}")
+            logger.error(f"Error running migrations: {e}")
+            raise
     
     async def close(self):
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
         if self.pool:
             await self.pool.close()
+            self.pool = None
             self.is_connected = False
             logger.info("Database connection closed")
     
-    async def execute(self, query: str, *args):
+    def _record_error(self, kind: str, error: Exception):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+        self.last_error = f"{kind}: {error}"
+        metrics.inc("db_errors_total", kind)
+    
+    def _schedule_reconnect(self):
+        if not self.uri or (self._reconnect_task and not self._reconnect_task.done()):
+            return
+        self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect_loop())
+    
+    async def _reconnect_loop(self):
+        delay = 1.0
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                new_pool = await self._create_pool(self.uri)
+                async with new_pool.acquire() as conn:
+                    await conn.execute("SELECT 1")
+            except Exception as e:
+                logger.warning(f"Database reconnect failed: {e}")
+                delay = min(delay * 2, 60.0)
+                continue
+            
+            old_pool, self.pool = self.pool, new_pool
+            self.is_connected = True
+            self.reconnects += 1
+            self.breaker.record_success()
+            logger.info("Database reconnected")
+            if old_pool is not None:
+                try:
+                    await asyncio.wait_for(old_pool.close(), timeout=POOL_CLOSE_TIMEOUT)
+                except Exception as e:
+                    logger.warning(f"Old database pool did not close in {POOL_CLOSE_TIMEOUT:.0f}s, terminating: {e}")
+                    old_pool.terminate()
+            return
+    
+    async def _run(self, method: str, query: str, args: tuple, default):
         if not self.pool:
-            return None
+            return default
+        if not self.breaker.allow():
+            metrics.inc("db_rejected_total", "circuit_open")
+            raise DatabaseUnavailable("circuit breaker open")
+        
+        is_probe = self.breaker.state == CircuitBreaker.HALF_OPEN
+        label = statement_label(query)
+        started = time.perf_counter()
+        acquired = None
+        self.waiting += 1
         try:
-            async with self.pool.acquire() as conn:
-                return await conn.execute(query, *args)
+            async with self.pool.acquire(timeout=ACQUIRE_TIMEOUT) as conn:
+                acquired = time.perf_counter()
+                self.waiting -= 1
+                metrics.observe("db_acquire_wait_seconds", "pool", acquired - started)
+                result = await getattr(conn, method)(query, *args)
+            self.breaker.record_success()
+            self._observe(label, query, time.perf_counter() - acquired)
+            return result
+        except asyncio.TimeoutError as e:
+            kind = "query_timeout" if acquired else "pool_timeout"
+            self._record_error(kind, e)
+            logger.error(f"Database {method} {kind}: {label}")
+            if not acquired:
+                raise DatabaseUnavailable(f"pool timeout after {ACQUIRE_TIMEOUT:.0f}s") from e
+            raise QueryTimeout(f"{label} exceeded {COMMAND_TIMEOUT:.0f}s") from e
+        except CONNECTION_ERRORS as e:
+            self._record_error("connection", e)
+            logger.error(f"Database {method} connection error: {e}")
+            if self.breaker.record_failure():
+                logger.error("Database circuit breaker opened, reconnecting in background")
+                self.is_connected = False
+                self._schedule_reconnect()
+            raise DatabaseUnavailable(str(e)) from e
         except Exception as e:
-            logger.error(f"Database execute error: {e}")
-            return None
+            self._record_error("query", e)
+            logger.error(f"Database {method} error: {e}")
+            return default
+        finally:
+            if acquired is None:
+                self.waiting -= 1
+            if is_probe:
+                self.breaker.end_probe()
+            metrics.record_db(time.perf_counter() - started)
+    
+    def _observe(self, label: str, query: str, elapsed: float):
+        metrics.observe("db_statement_seconds", label, elapsed)
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            compact = " ".join(query.split())
+            self.slow_queries.append({
+                "label": label,
+                "ms": elapsed * 1000,
+                "query": compact[:200],
+                "at": time.time()
+            })
+            logger.warning(f"Slow query ({elapsed * 1000:.0f} ms) {label}: {compact[:200]}")
+    
+    async def execute(self, query: str, *args):
+        return await self._run("execute", query, args, None)
     
     async def fetch(self, query: str, *args):
-        if not self.pool:
-            return []
-        try:
-            async with self.pool.acquire() as conn:
-                return await conn.fetch(query, *args)
-        except Exception as e:
-            logger.error(f"Database fetch error: {e}")
-            return []
+        return await self._run("fetch", query, args, [])
     
     async def fetchrow(self, query: str, *args):
-        if not self.pool:
-            return None
-        try:
-            async with self.pool.acquire() as conn:
-                return await conn.fetchrow(query, *args)
-        except Exception as e:
-            logger.error(f"Database fetchrow error: {e}")
-            return None
+        return await self._run("fetchrow", query, args, None)
     
     async def fetchval(self, query: str, *args):
-        if not self.pool:
-            return None
-        try:
-            async with self.pool.acquire() as conn:
-                return await conn.fetchval(query, *args)
-        except Exception as e:
-            logger.error(f"Database fetchval error: {e}")
-            return None
+        return await self._run("fetchval", query, args, None)
+    
+    def stats(self) -> dict:
+        pool = self.pool
+        size = idle = 0
+        if pool is not None:
+            try:
+                size = pool.get_size()
+                idle = pool.get_idle_size()
+            except Exception:
+                pass
+        
+        acquire = metrics.histogram("db_acquire_wait_seconds", "pool")
+        statements = metrics.summary("db_statement_seconds")
+        statements.sort(key=lambda row: row["p95"], reverse=True)
+        
+        metrics.set_gauge("db_pool_size", size)
+        metrics.set_gauge("db_pool_in_use", size - idle)
+        metrics.set_gauge("db_pool_idle", idle)
+        
+        return {
+            "connected": self.is_connected,
+            "schema_version": self.schema_version,
+            "min_size": POOL_MIN_SIZE,
+            "max_size": POOL_MAX_SIZE,
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "waiting": self.waiting,
+            "acquire_p50": acquire.quantile(0.5) if acquire else 0.0,
+            "acquire_p99": acquire.quantile(0.99) if acquire else 0.0,
+            "breaker": self.breaker.state,
+            "breaker_trips": self.breaker.trips,
+            "reconnects": self.reconnects,
+            "errors": dict(self.errors),
+            "last_error": self.last_error,
+            "slow_queries": list(self.slow_queries),
+            "statements": statements,
+        }
 
 db = Database()
 
@@ -0,0 +1,108 @@
+import os
+import time
+import asyncio
+import logging
+import zipfile
+from datetime import datetime
+from typing import Optional
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+EXPORT_TABLES = ("users", "vip_access", "vvip_access", "redeem_codes", "activity_logs")
+EXPORT_FORMATS = ("csv", "jsonl")
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+def build_export_query(table: str, fmt: str, since: Optional[datetime], until: Optional[datetime]) -> tuple:
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Table {table} cannot be exported")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt}")
+
+    conditions = []
+    args = []
+    if since is not None:
+        args.append(since)
+        conditions.append(f"created_at >= ${len(args)}")
+    if until is not None:
+        args.append(until)
+        conditions.append(f"created_at < ${len(args)}")
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    if fmt == "jsonl":
+        query = f"SELECT row_to_json(t)::text FROM {table} t{where} ORDER BY id"
+        options = {"format": "csv", "delimiter": "\x02", "quote": "\x01"}
+    else:
+        query = f"SELECT * FROM {table}{where} ORDER BY id"
+        options = {"format": "csv", "header": True}
+    return query, args, options
+
+
+async def copy_table(conn, archive: zipfile.ZipFile, table: str, fmt: str,
+                     since: Optional[datetime] = None, until: Optional[datetime] = None) -> dict:
+    query, args, options = build_export_query(table, fmt, since, until)
+    entry = await asyncio.to_thread(archive.open, f"{table}.{fmt}", "w", force_zip64=True)
+    buffer = bytearray()
+    written = 0
+
+    async def sink(chunk: bytes):
+        nonlocal written
+        written += len(chunk)
+        buffer.extend(chunk)
+        if len(buffer) >= WRITE_BUFFER_SIZE:
+            data = bytes(buffer)
+            buffer.clear()
+            await asyncio.to_thread(entry.write, data)
+
+    started = time.perf_counter()
+    try:
+        status = await conn.copy_from_query(query, *args, output=sink, **options)
+        if buffer:
+            await asyncio.to_thread(entry.write, bytes(buffer))
+    finally:
+        await asyncio.to_thread(entry.close)
+
+    elapsed = time.perf_counter() - started
+    try:
+        rows = int(status.split()[-1])
+    except (AttributeError, ValueError, IndexError):
+        rows = 0
+    metrics.observe("export_table_seconds", table, elapsed)
+    metrics.inc("export_rows_total", table, rows)
+    return {"table": table, "rows": rows, "bytes": written, "seconds": elapsed}
+
+
+async def export_tables(tables: tuple = EXPORT_TABLES, fmt: str = "csv",
+                        since: Optional[datetime] = None, until: Optional[datetime] = None,
+                        directory: str = EXPORT_DIR) -> tuple:
+    from database.connection import get_db
+    db = get_db()
+    if not db.is_connected or db.pool is None:
+        raise ConnectionError("Database not connected")
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{fmt}.zip")
+    archive = await asyncio.to_thread(zipfile.ZipFile, path + ".part", "w", zipfile.ZIP_DEFLATED, True, 6)
+    results = []
+    try:
+        async with db.pool.acquire() as conn:
+            async with conn.transaction(isolation="repeatable_read", readonly=True):
+                for table in tables:
+                    results.append(await copy_table(conn, archive, table, fmt, since, until))
+    except BaseException:
+        await asyncio.to_thread(archive.close)
+        os.remove(path + ".part")
+        raise
+    await asyncio.to_thread(archive.close)
+
+    os.replace(path + ".part", path)
+    total_rows = sum(result["rows"] for result in results)
+    total_seconds = sum(result["seconds"] for result in results)
+    logger.info(
+        f"Exported {total_rows} rows from {len(results)} tables to {path} "
+        f"({total_rows / total_seconds if total_seconds else 0:.0f} rows/s)"
+    )
+    return path, results
@@ -0,0 +1,128 @@
+import json
+import asyncio
+import logging
+import asyncpg
+from typing import Optional
+
+from database.connection import get_db
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "flag_changed"
+REFRESH_INTERVAL = 300
+
+
+class FlagCache:
+    def __init__(self):
+        self.bot_status = {}
+        self.guild_modes = {}
+        self.loaded = False
+        self.notifications = 0
+        self._listener: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._backlog: Optional[list] = None
+
+    async def start(self):
+        await self._listen()
+        try:
+            await self.reload()
+        except Exception as e:
+            logger.error(f"Flag cache load failed: {e}")
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._listener is not None and not self._listener.is_closed():
+            await self._listener.close()
+        self._listener = None
+        self.loaded = False
+
+    async def reload(self):
+        db = get_db()
+        if not db.is_connected or db.pool is None:
+            self.loaded = False
+            return
+        self._backlog = []
+        try:
+            async with db.pool.acquire() as conn:
+                status_rows = await conn.fetch("SELECT key, value FROM bot_status")
+                mode_rows = await conn.fetch("SELECT group_id, mode FROM guild_modes")
+            self.bot_status = {row["key"]: row["value"] for row in status_rows}
+            self.guild_modes = {row["group_id"]: row["mode"] for row in mode_rows}
+        finally:
+            backlog, self._backlog = self._backlog, None
+        for change in backlog:
+            self._apply_change(change)
+        self.loaded = True
+        logger.info(f"Flag cache loaded: {len(self.bot_status)} status keys, {len(self.guild_modes)} guild modes")
+
+    async def _listen(self):
+        db = get_db()
+        if not db.uri:
+            return
+        try:
+            self._listener = await asyncpg.connect(db.uri)
+            await self._listener.add_listener(CHANNEL, self._on_notify)
+            self._listener.add_termination_listener(self._on_terminated)
+        except Exception as e:
+            logger.warning(f"Flag cache listener unavailable, relying on periodic refresh: {e}")
+            self._listener = None
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            change = json.loads(payload)
+        except ValueError:
+            return
+        self.notifications += 1
+        metrics.inc("flag_cache_notifications_total", change.get("table", "unknown"))
+        if self._backlog is not None:
+            self._backlog.append(change)
+        self._apply_change(change)
+
+    def _apply_change(self, change: dict):
+        deleted = change.get("op") == "DELETE"
+        if change.get("table") == "bot_status":
+            self._apply(self.bot_status, change["key"], change.get("value"), deleted)
+        elif change.get("table") == "guild_modes":
+            self._apply(self.guild_modes, int(change["key"]), change.get("value"), deleted)
+
+    def _on_terminated(self, connection):
+        logger.warning("Flag cache listener connection lost")
+        self._listener = None
+        self.loaded = False
+
+    @staticmethod
+    def _apply(store: dict, key, value, deleted: bool):
+        if deleted:
+            store.pop(key, None)
+        else:
+            store[key] = value
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(REFRESH_INTERVAL if self._listener is not None else 30)
+            try:
+                if self._listener is None:
+                    await self._listen()
+                await self.reload()
+            except Exception as e:
+                logger.error(f"Flag cache refresh error: {e}")
+
+    def set_status(self, key: str, value):
+        if self.loaded:
+            self._apply(self.bot_status, key, value, value is None)
+
+    def set_guild_mode(self, group_id: int, mode: str):
+        if self.loaded:
+            self.guild_modes[group_id] = mode
+
+
+flag_cache = FlagCache()
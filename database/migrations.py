@@ -0,0 +1,404 @@
+import time
+import logging
+import asyncpg
+
+from database.partitions import PARTITIONED_TABLES, convert_to_partitioned, ensure_partitions
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_LOCK_KEY = 7302415001
+
+BASELINE = [
+    """
+        CREATE TABLE IF NOT EXISTS users (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT UNIQUE NOT NULL,
+            username VARCHAR(255),
+            first_name VARCHAR(255),
+            last_name VARCHAR(255),
+            role VARCHAR(50) DEFAULT 'reguler',
+            is_banned BOOLEAN DEFAULT FALSE,
+            daily_limit INTEGER DEFAULT 10,
+            daily_used INTEGER DEFAULT 0,
+            total_requests INTEGER DEFAULT 0,
+            last_request_date DATE,
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS admins (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT UNIQUE NOT NULL,
+            username VARCHAR(255),
+            role VARCHAR(50) DEFAULT 'admin',
+            permissions TEXT DEFAULT '{}',
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS vip_access (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT UNIQUE NOT NULL,
+            status VARCHAR(50) DEFAULT 'active',
+            expired_at TIMESTAMP NOT NULL,
+            daily_limit INTEGER DEFAULT 50,
+            features_enabled TEXT DEFAULT '[]',
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS vvip_access (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT UNIQUE NOT NULL,
+            status VARCHAR(50) DEFAULT 'active',
+            expired_at TIMESTAMP NOT NULL,
+            daily_limit INTEGER DEFAULT 100,
+            features_enabled TEXT DEFAULT '[]',
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS redeem_codes (
+            id SERIAL PRIMARY KEY,
+            code VARCHAR(100) UNIQUE NOT NULL,
+            type VARCHAR(50) NOT NULL,
+            duration_days INTEGER DEFAULT 7,
+            max_uses INTEGER DEFAULT 1,
+            current_uses INTEGER DEFAULT 0,
+            used_by TEXT DEFAULT '[]',
+            status VARCHAR(50) DEFAULT 'active',
+            expired_at TIMESTAMP,
+            issuer_id BIGINT,
+            notes TEXT,
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS sessions (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            session_token VARCHAR(255),
+            data TEXT DEFAULT '{}',
+            expired_at TIMESTAMP,
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS group_settings (
+            id SERIAL PRIMARY KEY,
+            group_id BIGINT UNIQUE NOT NULL,
+            group_title VARCHAR(255),
+            status VARCHAR(50) DEFAULT 'active',
+            anti_link BOOLEAN DEFAULT FALSE,
+            anti_spam BOOLEAN DEFAULT FALSE,
+            anti_virtex BOOLEAN DEFAULT FALSE,
+            auto_welcome BOOLEAN DEFAULT FALSE,
+            welcome_message TEXT DEFAULT 'Selamat datang di grup!',
+            auto_leave BOOLEAN DEFAULT FALSE,
+            auto_kick_rules TEXT DEFAULT '[]',
+            banned_words TEXT DEFAULT '[]',
+            link_whitelist TEXT DEFAULT '[]',
+            slowmode_seconds INTEGER DEFAULT 0,
+            bot_features_enabled BOOLEAN DEFAULT TRUE,
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS group_members (
+            id SERIAL PRIMARY KEY,
+            group_id BIGINT NOT NULL,
+            user_id BIGINT NOT NULL,
+            username VARCHAR(255),
+            first_name VARCHAR(255),
+            role VARCHAR(50) DEFAULT 'member',
+            warnings INTEGER DEFAULT 0,
+            is_muted BOOLEAN DEFAULT FALSE,
+            is_banned BOOLEAN DEFAULT FALSE,
+            joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(group_id, user_id)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS forced_group_join (
+            id SERIAL PRIMARY KEY,
+            group_link VARCHAR(255) NOT NULL,
+            group_id BIGINT,
+            group_name VARCHAR(255),
+            is_required BOOLEAN DEFAULT TRUE,
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS required_groups (
+            id SERIAL PRIMARY KEY,
+            group_name VARCHAR(255) NOT NULL,
+            group_link VARCHAR(255) NOT NULL,
+            group_id BIGINT,
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS user_verification (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT UNIQUE NOT NULL,
+            joined_group1 BOOLEAN DEFAULT FALSE,
+            joined_group2 BOOLEAN DEFAULT FALSE,
+            last_verified TIMESTAMP,
+            status VARCHAR(50) DEFAULT 'not_verified',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS guild_modes (
+            id SERIAL PRIMARY KEY,
+            group_id BIGINT UNIQUE NOT NULL,
+            mode VARCHAR(10) DEFAULT 'OFF',
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS activity_logs (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            username VARCHAR(255),
+            group_id BIGINT,
+            action VARCHAR(255) NOT NULL,
+            details TEXT DEFAULT '{}',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS monitoring_logs (
+            id SERIAL PRIMARY KEY,
+            type VARCHAR(100) NOT NULL,
+            message TEXT,
+            level VARCHAR(50) DEFAULT 'info',
+            details TEXT DEFAULT '{}',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS system_security (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT,
+            type VARCHAR(100) NOT NULL,
+            action VARCHAR(255),
+            ip_address VARCHAR(50),
+            details TEXT DEFAULT '{}',
+            is_blocked BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS file_processing (
+            id SERIAL PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            file_type VARCHAR(50),
+            file_name VARCHAR(255),
+            file_size BIGINT,
+            status VARCHAR(50) DEFAULT 'pending',
+            result TEXT DEFAULT '{}',
+            error_message TEXT,
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS bot_status (
+            id SERIAL PRIMARY KEY,
+            key VARCHAR(100) UNIQUE NOT NULL,
+            value TEXT,
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_users_user_id ON users(user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)",
+    "CREATE INDEX IF NOT EXISTS idx_vip_access_user_id ON vip_access(user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_vip_access_expired_at ON vip_access(expired_at)",
+    "CREATE INDEX IF NOT EXISTS idx_vvip_access_user_id ON vvip_access(user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_vvip_access_expired_at ON vvip_access(expired_at)",
+    "CREATE INDEX IF NOT EXISTS idx_redeem_codes_code ON redeem_codes(code)",
+    "CREATE INDEX IF NOT EXISTS idx_activity_logs_user_id ON activity_logs(user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_activity_logs_created_at ON activity_logs(created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_group_settings_group_id ON group_settings(group_id)",
+]
+
+INDEX_PACK = [
+    "DROP INDEX IF EXISTS idx_users_user_id",
+    "DROP INDEX IF EXISTS idx_redeem_codes_code",
+    "DROP INDEX IF EXISTS idx_vip_access_user_id",
+    "DROP INDEX IF EXISTS idx_vvip_access_user_id",
+    "DROP INDEX IF EXISTS idx_group_settings_group_id",
+    "DROP INDEX IF EXISTS idx_activity_logs_user_id",
+    "CREATE INDEX IF NOT EXISTS idx_activity_logs_user_created ON activity_logs(user_id, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_activity_logs_action_created ON activity_logs(action, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_monitoring_logs_created ON monitoring_logs(created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_monitoring_logs_type_created ON monitoring_logs(type, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_monitoring_logs_errors ON monitoring_logs(created_at DESC) WHERE level = 'error'",
+    "CREATE INDEX IF NOT EXISTS idx_system_security_user_created ON system_security(user_id, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions(user_id, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_file_processing_user_created ON file_processing(user_id, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_redeem_codes_status_created ON redeem_codes(status, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_group_members_active ON group_members(group_id, joined_at DESC) WHERE is_active = TRUE",
+    "CREATE INDEX IF NOT EXISTS idx_vip_access_active ON vip_access(expired_at) WHERE status = 'active'",
+    "CREATE INDEX IF NOT EXISTS idx_vvip_access_active ON vvip_access(expired_at) WHERE status = 'active'",
+]
+
+
+FLAG_NOTIFY_TRIGGERS = [
+    """
+        CREATE OR REPLACE FUNCTION notify_flag_changed() RETURNS trigger AS $$
+        DECLARE
+            row_data RECORD;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                row_data := OLD;
+            ELSE
+                row_data := NEW;
+            END IF;
+            IF TG_TABLE_NAME = 'bot_status' THEN
+                PERFORM pg_notify('flag_changed', json_build_object(
+                    'table', TG_TABLE_NAME, 'op', TG_OP,
+                    'key', row_data.key, 'value', row_data.value
+                )::text);
+            ELSE
+                PERFORM pg_notify('flag_changed', json_build_object(
+                    'table', TG_TABLE_NAME, 'op', TG_OP,
+                    'key', row_data.group_id, 'value', row_data.mode
+                )::text);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS trg_bot_status_notify ON bot_status",
+    """
+        CREATE TRIGGER trg_bot_status_notify AFTER INSERT OR UPDATE OR DELETE ON bot_status
+        FOR EACH ROW EXECUTE FUNCTION notify_flag_changed()
+    """,
+    "DROP TRIGGER IF EXISTS trg_guild_modes_notify ON guild_modes",
+    """
+        CREATE TRIGGER trg_guild_modes_notify AFTER INSERT OR UPDATE OR DELETE ON guild_modes
+        FOR EACH ROW EXECUTE FUNCTION notify_flag_changed()
+    """,
+]
+
+
+async def partition_log_tables(conn):
+    for table in PARTITIONED_TABLES:
+        await convert_to_partitioned(conn, table)
+    await ensure_partitions(conn)
+
+
+MIGRATIONS = [
+    (1, "baseline", BASELINE),
+    (2, "index_pack", INDEX_PACK),
+    (3, "partition_logs", [partition_log_tables]),
+    (4, "flag_notify_triggers", FLAG_NOTIFY_TRIGGERS),
+    (5, "expiry_warned_at", [
+        "ALTER TABLE vip_access ADD COLUMN IF NOT EXISTS expiry_warned_at TIMESTAMP",
+        "ALTER TABLE vvip_access ADD COLUMN IF NOT EXISTS expiry_warned_at TIMESTAMP",
+    ]),
+    (6, "keyset_indexes", [
+        "CREATE INDEX IF NOT EXISTS idx_users_role_id ON users(role, id)",
+        "DROP INDEX IF EXISTS idx_users_role",
+        "CREATE INDEX IF NOT EXISTS idx_redeem_codes_status_id ON redeem_codes(status, id)",
+    ]),
+    (7, "file_job_queue", [
+        "ALTER TABLE file_processing ADD COLUMN IF NOT EXISTS chat_id BIGINT",
+        "ALTER TABLE file_processing ADD COLUMN IF NOT EXISTS operation VARCHAR(50)",
+        "ALTER TABLE file_processing ADD COLUMN IF NOT EXISTS params TEXT DEFAULT '{}'",
+        "ALTER TABLE file_processing ADD COLUMN IF NOT EXISTS source_file_id TEXT",
+        "ALTER TABLE file_processing ADD COLUMN IF NOT EXISTS progress INTEGER DEFAULT 0",
+        "ALTER TABLE file_processing ADD COLUMN IF NOT EXISTS attempts INTEGER DEFAULT 0",
+        "ALTER TABLE file_processing ADD COLUMN IF NOT EXISTS locked_by VARCHAR(100)",
+        "ALTER TABLE file_processing ADD COLUMN IF NOT EXISTS locked_until TIMESTAMP",
+        "ALTER TABLE file_processing ADD COLUMN IF NOT EXISTS started_at TIMESTAMP",
+        "ALTER TABLE file_processing ADD COLUMN IF NOT EXISTS finished_at TIMESTAMP",
+        "CREATE INDEX IF NOT EXISTS idx_file_processing_queue ON file_processing(id) WHERE status IN ('pending', 'running')",
+    ]),
+    (8, "file_result_cache_key", [
+        "ALTER TABLE file_processing ADD COLUMN IF NOT EXISTS cache_key VARCHAR(64)",
+        "CREATE INDEX IF NOT EXISTS idx_file_processing_cache_key ON file_processing(cache_key, id DESC) WHERE status = 'done'",
+    ]),
+    (9, "file_job_fair_queue", [
+        "ALTER TABLE file_processing ADD COLUMN IF NOT EXISTS priority SMALLINT DEFAULT 0",
+        "ALTER TABLE file_processing ADD COLUMN IF NOT EXISTS virtual_finish DOUBLE PRECISION DEFAULT 0",
+        "CREATE INDEX IF NOT EXISTS idx_file_processing_fair ON file_processing(virtual_finish, id) WHERE status IN ('pending', 'running')",
+        "CREATE INDEX IF NOT EXISTS idx_file_processing_active_user ON file_processing(user_id, status) WHERE status IN ('pending', 'running')",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+async def get_schema_version(conn) -> int:
+    try:
+        return await conn.fetchval("SELECT COALESCE(MAX(version), 0) FROM schema_migrations") or 0
+    except asyncpg.UndefinedTableError:
+        return 0
+
+
+async def run_migrations(conn) -> int:
+    version = await get_schema_version(conn)
+    if version >= LATEST_VERSION:
+        return version
+
+    await conn.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_KEY)
+    try:
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(100) NOT NULL,
+                duration_ms INTEGER,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        version = await get_schema_version(conn)
+
+        for number, name, statements in MIGRATIONS:
+            if number <= version:
+                continue
+            started = time.perf_counter()
+            async with conn.transaction():
+                for statement in statements:
+                    if callable(statement):
+                        await statement(conn)
+                    else:
+                        await conn.execute(statement)
+                await conn.execute(
+                    "INSERT INTO schema_migrations (version, name, duration_ms) VALUES ($1, $2, $3)",
+                    number, name, int((time.perf_counter() - started) * 1000)
+                )
+            version = number
+            logger.info(f"Applied migration {number:03d}_{name}")
+    finally:
+        await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_KEY)
+
+    return version
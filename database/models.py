@@ -1,6 +1,11 @@
+import os
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 from database.connection import get_db
+from database.flag_cache import flag_cache
+from utils.expiry_scheduler import expiry_scheduler
+from utils.stats_service import stats_service
+from config import VIP_EXPIRY_WARNING_HOURS
 import logging
 import json
 
@@ -24,7 +29,7 @@ class UserModel:
         user = await db.fetchrow("SELECT * FROM users WHERE user_id = $1", user_id)
         
         if user:
-            await db.execute("""
+            result = await db.execute("""
                 UPDATE users SET username = COALESCE($2, username), 
                 first_name = COALESCE($3, first_name), 
                 last_name = COALESCE($4, last_name),
@@ -32,11 +37,16 @@ class UserModel:
                 updated_at = $6 
                 WHERE user_id = $1
             """, user_id, username, first_name, last_name, role, now)
+            if result is not None and role:
+                stats_service.on_role_changed(user["role"], role)
         else:
-            await db.execute("""
+            result = await db.execute("""
                 INSERT INTO users (user_id, username, first_name, last_name, role, created_at, updated_at)
                 VALUES ($1, $2, $3, $4, $5, $6, $6)
+                ON CONFLICT (user_id) DO NOTHING
             """, user_id, username, first_name, last_name, role or cls.ROLE_REGULER, now)
+            if result == "INSERT 0 1":
+                stats_service.on_user_created(role or cls.ROLE_REGULER)
         
         row = await db.fetchrow("SELECT * FROM users WHERE user_id = $1", user_id)
         return dict(row) if row else None
@@ -54,10 +64,15 @@ class UserModel:
         db = get_db()
         if not db.is_connected:
             return False
-        result = await db.execute("""
-            UPDATE users SET role = $2, updated_at = $3 WHERE user_id = $1
+        row = await db.fetchrow("""
+            UPDATE users AS u SET role = $2, updated_at = $3
+            FROM (SELECT id, role FROM users WHERE user_id = $1 FOR UPDATE) AS old
+            WHERE u.id = old.id
+            RETURNING old.role AS old_role
         """, user_id, role, datetime.utcnow())
-        return result is not None
+        if row is not None:
+            stats_service.on_role_changed(row["old_role"], role)
+        return row is not None
     
     @classmethod
     async def ban_user(cls, user_id: int, is_banned: bool = True):
@@ -75,22 +90,42 @@ class UserModel:
         if not db.is_connected:
             return False
         
-        today = datetime.utcnow().date()
-        user = await cls.get_by_id(user_id)
-        
-        if user:
-            if user.get("last_request_date") != today:
-                await db.execute("""
-                    UPDATE users SET daily_used = 1, last_request_date = $2, 
-                    total_requests = total_requests + 1, updated_at = $3 WHERE user_id = $1
-                """, user_id, today, datetime.utcnow())
-            else:
-                await db.execute("""
-                    UPDATE users SET daily_used = daily_used + 1, 
-                    total_requests = total_requests + 1, updated_at = $2 WHERE user_id = $1
-                """, user_id, datetime.utcnow())
+        now = datetime.utcnow()
+        await db.execute("""
+            UPDATE users SET 
+            daily_used = CASE WHEN last_request_date = $2 THEN daily_used + 1 ELSE 1 END,
+            last_request_date = $2, total_requests = total_requests + 1, updated_at = $3
+            WHERE user_id = $1
+        """, user_id, now.date(), now)
         return True
     
+    @classmethod
+    async def get_usage(cls, user_id: int):
+        db = get_db()
+        if not db.is_connected:
+            return None
+        row = await db.fetchrow("""
+            SELECT daily_used, last_request_date FROM users WHERE user_id = $1
+        """, user_id)
+        return dict(row) if row else None
+    
+    @classmethod
+    async def flush_usage(cls, rows: list):
+        db = get_db()
+        if not db.is_connected:
+            return None
+        result = await db.fetch("""
+            UPDATE users AS u SET 
+            daily_used = CASE WHEN u.last_request_date = v.day
+                THEN GREATEST(u.daily_used + v.delta, 0) ELSE GREATEST(v.delta, 0) END,
+            last_request_date = v.day,
+            total_requests = u.total_requests + GREATEST(v.delta, 0), updated_at = $4
+            FROM unnest($1::bigint[], $2::date[], $3::int[]) AS v(user_id, day, delta)
+            WHERE u.user_id = v.user_id
+            RETURNING u.user_id, u.daily_used
+        """, [row[0] for row in rows], [row[1] for row in rows], [row[2] for row in rows], datetime.utcnow())
+        return [(row["user_id"], row["daily_used"]) for row in result]
+    
     @classmethod
     async def reset_daily_limit(cls, user_id: int):
         db = get_db()
@@ -119,6 +154,13 @@ class UserModel:
         rows = await db.fetch("SELECT * FROM users")
         return [dict(row) for row in rows]
     
+    @classmethod
+    async def get_page(cls, role: str = None, after_id: int = None, before_id: int = None, limit: int = 20):
+        return await _keyset_page(
+            "users", "id, user_id, username, role, is_banned", "role", role,
+            after_id, before_id, limit
+        )
+    
     @classmethod
     async def get_users_by_role(cls, role: str):
         db = get_db()
@@ -226,6 +268,72 @@ class SessionModel:
         return dict(row) if row else None
 
 
+async def _keyset_page(table: str, columns: str, filter_column: str, filter_value,
+                       after_id: int = None, before_id: int = None, limit: int = 20):
+    db = get_db()
+    if not db.is_connected:
+        return {"rows": [], "has_prev": False, "has_next": False}
+    
+    conditions = []
+    args = []
+    if filter_value is not None:
+        args.append(filter_value)
+        conditions.append(f"{filter_column} = ${len(args)}")
+    
+    backwards = before_id is not None
+    if backwards:
+        args.append(before_id)
+        conditions.append(f"id < ${len(args)}")
+    elif after_id is not None:
+        args.append(after_id)
+        conditions.append(f"id > ${len(args)}")
+    
+    args.append(limit + 1)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    rows = await db.fetch(f"""
+        SELECT {columns} FROM {table} {where}
+        ORDER BY id {'DESC' if backwards else 'ASC'} LIMIT ${len(args)}
+    """, *args)
+    
+    rows = [dict(row) for row in rows]
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+        return {"rows": rows, "has_prev": has_more, "has_next": True}
+    return {"rows": rows, "has_prev": after_id is not None, "has_next": has_more}
+
+
+EXPIRY_WARNING_LEAD = timedelta(hours=VIP_EXPIRY_WARNING_HOURS)
+
+
+async def _expire_due_access(table: str, role: str, now: datetime, limit: int):
+    db = get_db()
+    if not db.is_connected:
+        return []
+    rows = await db.fetch(f"""
+        WITH due AS (
+            SELECT id FROM {table}
+            WHERE status = 'active' AND expired_at <= $1
+            ORDER BY expired_at
+            LIMIT $2
+            FOR UPDATE SKIP LOCKED
+        )
+        UPDATE {table} AS access SET status = 'expired', updated_at = $1
+        FROM due WHERE access.id = due.id
+        RETURNING access.user_id, access.expired_at
+    """, now, limit)
+    if rows:
+        stats_service.on_access_expired(table, len(rows))
+        result = await db.execute("""
+            UPDATE users SET role = $3, updated_at = $2
+            WHERE user_id = ANY($1::bigint[]) AND role = $4
+        """, [row["user_id"] for row in rows], now, UserModel.ROLE_REGULER, role)
+        if result:
+            stats_service.on_role_changed(role, UserModel.ROLE_REGULER, int(result.split()[-1]))
+    return [dict(row) for row in rows]
+
+
 class VIPAccessModel:
     @classmethod
     async def grant_access(cls, user_id: int, days: int, features: list = None):
@@ -237,20 +345,25 @@ class VIPAccessModel:
         expired_at = now + timedelta(days=days)
         
         existing = await db.fetchrow("SELECT * FROM vip_access WHERE user_id = $1", user_id)
+        was_active = bool(existing and existing["status"] == "active")
         
-        if existing and existing["status"] == "active":
+        if was_active:
             current_expiry = existing["expired_at"]
             if current_expiry > now:
                 expired_at = current_expiry + timedelta(days=days)
         
-        await db.execute("""
+        result = await db.execute("""
             INSERT INTO vip_access (user_id, status, expired_at, daily_limit, features_enabled, created_at, updated_at)
             VALUES ($1, 'active', $2, 50, $3, $4, $4)
-            ON CONFLICT (user_id) DO UPDATE SET status = 'active', expired_at = $2, updated_at = $4
+            ON CONFLICT (user_id) DO UPDATE SET status = 'active', expired_at = $2, expiry_warned_at = NULL, updated_at = $4
         """, user_id, expired_at, json.dumps(features or ["all"]), now)
+        if result is not None and not was_active:
+            stats_service.on_access_granted("vip_access")
         
         await UserModel.update_role(user_id, UserModel.ROLE_VIP)
         
+        expiry_scheduler.schedule(("vip_access", user_id), expired_at - EXPIRY_WARNING_LEAD, {"expired_at": expired_at})
+        
         row = await db.fetchrow("SELECT * FROM vip_access WHERE user_id = $1", user_id)
         return dict(row) if row else None
     
@@ -272,9 +385,11 @@ class VIPAccessModel:
             SELECT * FROM vip_access WHERE user_id = $1 AND status = 'active'
         """, user_id)
         if access and access["expired_at"] < datetime.utcnow():
-            await db.execute("""
-                UPDATE vip_access SET status = 'expired', updated_at = $2 WHERE user_id = $1
+            result = await db.execute("""
+                UPDATE vip_access SET status = 'expired', updated_at = $2 WHERE user_id = $1 AND status = 'active'
             """, user_id, datetime.utcnow())
+            if result == "UPDATE 1":
+                stats_service.on_access_expired("vip_access")
             await UserModel.update_role(user_id, UserModel.ROLE_REGULER)
             return True
         return False
@@ -284,7 +399,9 @@ class VIPAccessModel:
         db = get_db()
         if not db.is_connected:
             return 0
-        return await db.fetchval("SELECT COUNT(*) FROM vip_access WHERE status = 'active'") or 0
+        return await db.fetchval("""
+            SELECT COUNT(*) FROM vip_access WHERE status = 'active' AND expired_at > $1
+        """, datetime.utcnow()) or 0
     
     @classmethod
     async def get_all_active(cls):
@@ -293,6 +410,33 @@ class VIPAccessModel:
             return []
         rows = await db.fetch("SELECT * FROM vip_access WHERE status = 'active'")
         return [dict(row) for row in rows]
+    
+    @classmethod
+    async def expire_due(cls, now: datetime = None, limit: int = 1000):
+        return await _expire_due_access("vip_access", UserModel.ROLE_VIP, now or datetime.utcnow(), limit)
+    
+    @classmethod
+    async def get_pending_warnings(cls):
+        db = get_db()
+        if not db.is_connected:
+            return []
+        rows = await db.fetch("""
+            SELECT user_id, expired_at FROM vip_access
+            WHERE status = 'active' AND expired_at > $1 AND expiry_warned_at IS NULL
+        """, datetime.utcnow())
+        return [dict(row) for row in rows]
+    
+    @classmethod
+    async def mark_warned(cls, user_id: int, expired_at: datetime):
+        db = get_db()
+        if not db.is_connected:
+            return False
+        claimed = await db.fetchval("""
+            UPDATE vip_access SET expiry_warned_at = $3
+            WHERE user_id = $1 AND expired_at = $2 AND status = 'active' AND expiry_warned_at IS NULL
+            RETURNING user_id
+        """, user_id, expired_at, datetime.utcnow())
+        return claimed is not None
 
 
 class VVIPAccessModel:
@@ -306,20 +450,25 @@ class VVIPAccessModel:
         expired_at = now + timedelta(days=days)
         
         existing = await db.fetchrow("SELECT * FROM vvip_access WHERE user_id = $1", user_id)
+        was_active = bool(existing and existing["status"] == "active")
         
-        if existing and existing["status"] == "active":
+        if was_active:
             current_expiry = existing["expired_at"]
             if current_expiry > now:
                 expired_at = current_expiry + timedelta(days=days)
         
-        await db.execute("""
+        result = await db.execute("""
             INSERT INTO vvip_access (user_id, status, expired_at, daily_limit, features_enabled, created_at, updated_at)
             VALUES ($1, 'active', $2, 100, $3, $4, $4)
-            ON CONFLICT (user_id) DO UPDATE SET status = 'active', expired_at = $2, updated_at = $4
+            ON CONFLICT (user_id) DO UPDATE SET status = 'active', expired_at = $2, expiry_warned_at = NULL, updated_at = $4
         """, user_id, expired_at, json.dumps(features or ["all", "priority"]), now)
+        if result is not None and not was_active:
+            stats_service.on_access_granted("vvip_access")
         
         await UserModel.update_role(user_id, UserModel.ROLE_VVIP)
         
+        expiry_scheduler.schedule(("vvip_access", user_id), expired_at - EXPIRY_WARNING_LEAD, {"expired_at": expired_at})
+        
         row = await db.fetchrow("SELECT * FROM vvip_access WHERE user_id = $1", user_id)
         return dict(row) if row else None
     
@@ -341,9 +490,11 @@ class VVIPAccessModel:
             SELECT * FROM vvip_access WHERE user_id = $1 AND status = 'active'
         """, user_id)
         if access and access["expired_at"] < datetime.utcnow():
-            await db.execute("""
-                UPDATE vvip_access SET status = 'expired', updated_at = $2 WHERE user_id = $1
+            result = await db.execute("""
+                UPDATE vvip_access SET status = 'expired', updated_at = $2 WHERE user_id = $1 AND status = 'active'
             """, user_id, datetime.utcnow())
+            if result == "UPDATE 1":
+                stats_service.on_access_expired("vvip_access")
             await UserModel.update_role(user_id, UserModel.ROLE_REGULER)
             return True
         return False
@@ -353,7 +504,9 @@ class VVIPAccessModel:
         db = get_db()
         if not db.is_connected:
             return 0
-        return await db.fetchval("SELECT COUNT(*) FROM vvip_access WHERE status = 'active'") or 0
+        return await db.fetchval("""
+            SELECT COUNT(*) FROM vvip_access WHERE status = 'active' AND expired_at > $1
+        """, datetime.utcnow()) or 0
     
     @classmethod
     async def get_all_active(cls):
@@ -362,6 +515,33 @@ class VVIPAccessModel:
             return []
         rows = await db.fetch("SELECT * FROM vvip_access WHERE status = 'active'")
         return [dict(row) for row in rows]
+    
+    @classmethod
+    async def expire_due(cls, now: datetime = None, limit: int = 1000):
+        return await _expire_due_access("vvip_access", UserModel.ROLE_VVIP, now or datetime.utcnow(), limit)
+    
+    @classmethod
+    async def get_pending_warnings(cls):
+        db = get_db()
+        if not db.is_connected:
+            return []
+        rows = await db.fetch("""
+            SELECT user_id, expired_at FROM vvip_access
+            WHERE status = 'active' AND expired_at > $1 AND expiry_warned_at IS NULL
+        """, datetime.utcnow())
+        return [dict(row) for row in rows]
+    
+    @classmethod
+    async def mark_warned(cls, user_id: int, expired_at: datetime):
+        db = get_db()
+        if not db.is_connected:
+            return False
+        claimed = await db.fetchval("""
+            UPDATE vvip_access SET expiry_warned_at = $3
+            WHERE user_id = $1 AND expired_at = $2 AND status = 'active' AND expiry_warned_at IS NULL
+            RETURNING user_id
+        """, user_id, expired_at, datetime.utcnow())
+        return claimed is not None
 
 
 class RedeemCodeModel:
@@ -470,6 +650,13 @@ class RedeemCodeModel:
             rows = await db.fetch("SELECT * FROM redeem_codes ORDER BY created_at DESC")
         return [dict(row) for row in rows]
     
+    @classmethod
+    async def get_page(cls, status: str = None, after_id: int = None, before_id: int = None, limit: int = 15):
+        return await _keyset_page(
+            "redeem_codes", "id, code, type, status, current_uses, max_uses", "status", status,
+            after_id, before_id, limit
+        )
+    
     @classmethod
     async def delete_code(cls, code: str):
         db = get_db()
@@ -647,6 +834,8 @@ class MonitoringLogModel:
 class BotStatusModel:
     @classmethod
     async def get(cls, key: str):
+        if flag_cache.loaded:
+            return flag_cache.bot_status.get(key)
         db = get_db()
         if not db.is_connected:
             return None
@@ -664,6 +853,7 @@ class BotStatusModel:
             VALUES ($1, $2, $3, $3)
             ON CONFLICT (key) DO UPDATE SET value = $2, updated_at = $3
         """, key, value, now)
+        flag_cache.set_status(key, value)
         return True
     
     @classmethod
@@ -672,6 +862,7 @@ class BotStatusModel:
         if not db.is_connected:
             return False
         await db.execute("DELETE FROM bot_status WHERE key = $1", key)
+        flag_cache.set_status(key, None)
         return True
 
 
@@ -819,6 +1010,184 @@ class FileTaskModel:
             SELECT * FROM file_processing WHERE user_id = $1 ORDER BY created_at DESC LIMIT $2
         """, user_id, limit)
         return [dict(row) for row in rows]
+    
+    @classmethod
+    async def enqueue(cls, user_id: int, chat_id: int, operation: str, file_name: str, file_size: int,
+                      source_file_id: str, params: dict = None, cache_key: str = None,
+                      priority: int = 0, cost: float = 1.0):
+        db = get_db()
+        if not db.is_connected:
+            return None
+        
+        now = datetime.utcnow()
+        row = await db.fetchrow("""
+            WITH clock AS (
+                SELECT GREATEST(
+                    COALESCE(
+                        (SELECT MIN(virtual_finish) FROM file_processing WHERE status = 'pending'),
+                        (SELECT MAX(virtual_finish) FROM file_processing WHERE status = 'running'),
+                        0
+                    ),
+                    COALESCE((SELECT MAX(virtual_finish) FROM file_processing
+                              WHERE user_id = $1 AND status IN ('pending', 'running')), 0)
+                ) AS start
+            )
+            INSERT INTO file_processing (user_id, chat_id, operation, file_type, file_name, file_size,
+                                         source_file_id, params, cache_key, status, priority, virtual_finish,
+                                         created_at, updated_at)
+            SELECT $1, $2, $3, $4, $5, $6, $7, $8, $9, 'pending', $11, clock.start + $12, $10, $10 FROM clock
+            RETURNING *
+        """, user_id, chat_id, operation, os.path.splitext(file_name or "")[1].lstrip(".") or None,
+            file_name, file_size, source_file_id, json.dumps(params or {}), cache_key, now, priority, cost)
+        return dict(row) if row else None
+    
+    @classmethod
+    async def claim(cls, worker_id: str, lease_seconds: int, max_attempts: int, running_caps: list):
+        db = get_db()
+        if not db.is_connected:
+            return None
+        
+        now = datetime.utcnow()
+        row = await db.fetchrow("""
+            WITH next AS (
+                SELECT id FROM file_processing f
+                WHERE status IN ('pending', 'running')
+                  AND (status = 'pending' OR locked_until < $1)
+                  AND attempts < $4
+                  AND (
+                      SELECT COUNT(*) FROM file_processing r
+                      WHERE r.user_id = f.user_id AND r.status = 'running' AND r.locked_until >= $1
+                  ) < COALESCE(($5::int[])[f.priority + 1], 1)
+                ORDER BY virtual_finish, id
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE file_processing AS f SET
+                status = 'running', locked_by = $2, locked_until = $1 + make_interval(secs => $3),
+                attempts = f.attempts + 1, started_at = COALESCE(f.started_at, $1), updated_at = $1
+            FROM next WHERE f.id = next.id
+            RETURNING f.*
+        """, now, worker_id, lease_seconds, max_attempts, running_caps)
+        return dict(row) if row else None
+    
+    @classmethod
+    async def heartbeat(cls, task_id: int, worker_id: str, lease_seconds: int, progress: int):
+        db = get_db()
+        if not db.is_connected:
+            return None
+        
+        now = datetime.utcnow()
+        return await db.fetchval("""
+            UPDATE file_processing SET locked_until = $3 + make_interval(secs => $4), progress = $5, updated_at = $3
+            WHERE id = $1 AND locked_by = $2
+            RETURNING status
+        """, task_id, worker_id, now, lease_seconds, progress)
+    
+    @classmethod
+    async def save_result(cls, task_id: int, worker_id: str, result: dict):
+        db = get_db()
+        if not db.is_connected:
+            return False
+        updated = await db.execute("""
+            UPDATE file_processing SET result = $3, updated_at = $4
+            WHERE id = $1 AND locked_by = $2
+        """, task_id, worker_id, json.dumps(result), datetime.utcnow())
+        return updated is not None
+    
+    @classmethod
+    async def finish(cls, task_id: int, worker_id: str, status: str, result: dict = None, error: str = None):
+        db = get_db()
+        if not db.is_connected:
+            return False
+        
+        now = datetime.utcnow()
+        updated = await db.execute("""
+            UPDATE file_processing SET
+                status = CASE WHEN status = 'cancelled' THEN status ELSE $3 END,
+                result = COALESCE($4, result), error_message = $5, progress = CASE WHEN $3 = 'done' THEN 100 ELSE progress END,
+                locked_by = NULL, locked_until = NULL, is_active = FALSE, finished_at = $6, updated_at = $6
+            WHERE id = $1 AND locked_by = $2
+        """, task_id, worker_id, status, json.dumps(result) if result is not None else None, error, now)
+        return updated is not None
+    
+    @classmethod
+    async def release(cls, task_id: int, worker_id: str, error: str = None):
+        db = get_db()
+        if not db.is_connected:
+            return False
+        updated = await db.execute("""
+            UPDATE file_processing SET status = 'pending', locked_by = NULL, locked_until = NULL,
+                error_message = $3, updated_at = $4
+            WHERE id = $1 AND locked_by = $2 AND status = 'running'
+        """, task_id, worker_id, error, datetime.utcnow())
+        return updated is not None
+    
+    @classmethod
+    async def cancel(cls, task_id: int, user_id: int = None):
+        db = get_db()
+        if not db.is_connected:
+            return None
+        
+        now = datetime.utcnow()
+        row = await db.fetchrow("""
+            UPDATE file_processing SET status = 'cancelled', is_active = FALSE,
+                finished_at = CASE WHEN locked_by IS NULL THEN $3 ELSE finished_at END, updated_at = $3
+            WHERE id = $1 AND ($2::bigint IS NULL OR user_id = $2) AND status IN ('pending', 'running')
+            RETURNING *
+        """, task_id, user_id, now)
+        return dict(row) if row else None
+    
+    @classmethod
+    async def fail_exhausted(cls, max_attempts: int):
+        db = get_db()
+        if not db.is_connected:
+            return []
+        
+        now = datetime.utcnow()
+        rows = await db.fetch("""
+            UPDATE file_processing SET status = 'failed', error_message = 'Worker berhenti berulang kali',
+                locked_by = NULL, locked_until = NULL, is_active = FALSE, finished_at = $1, updated_at = $1
+            WHERE status = 'running' AND locked_until < $1 AND attempts >= $2
+            RETURNING *
+        """, now, max_attempts)
+        return [dict(row) for row in rows]
+    
+    @classmethod
+    async def find_cached(cls, cache_key: str):
+        db = get_db()
+        if not db.is_connected:
+            return None
+        row = await db.fetchrow("""
+            SELECT id, result FROM file_processing
+            WHERE cache_key = $1 AND status = 'done'
+            ORDER BY id DESC LIMIT 1
+        """, cache_key)
+        return dict(row) if row else None
+    
+    @classmethod
+    async def queue_load(cls, user_id: int):
+        db = get_db()
+        if not db.is_connected:
+            return None
+        row = await db.fetchrow("""
+            SELECT COUNT(*) FILTER (WHERE status = 'pending') AS pending,
+                   COUNT(*) FILTER (WHERE user_id = $1) AS user_active
+            FROM file_processing WHERE status IN ('pending', 'running')
+        """, user_id)
+        return dict(row) if row else None
+    
+    @classmethod
+    async def queue_stats(cls):
+        db = get_db()
+        if not db.is_connected:
+            return []
+        rows = await db.fetch("""
+            SELECT priority, status, COUNT(*) AS count,
+                   EXTRACT(EPOCH FROM $1::timestamp - MIN(created_at)) AS oldest_seconds
+            FROM file_processing WHERE status IN ('pending', 'running')
+            GROUP BY priority, status
+        """, datetime.utcnow())
+        return [dict(row) for row in rows]
 
 
 class UserVerificationModel:
@@ -909,6 +1278,8 @@ class GuildModeModel:
     
     @classmethod
     async def get_mode(cls, group_id: int):
+        if flag_cache.loaded:
+            return flag_cache.guild_modes.get(group_id, cls.MODE_OFF)
         db = get_db()
         if not db.is_connected:
             return cls.MODE_OFF
@@ -935,6 +1306,7 @@ class GuildModeModel:
                 INSERT INTO guild_modes (group_id, mode, created_at, updated_at)
                 VALUES ($1, $2, $3, $3)
             """, group_id, mode, now)
+        flag_cache.set_guild_mode(group_id, mode)
         return True
     
     @classmethod
@@ -983,3 +1355,28 @@ class RequiredGroupModel:
             UPDATE required_groups SET is_active = FALSE, updated_at = $2 WHERE id = $1
         """, group_id, datetime.utcnow())
         return True
+
+
+class StatsModel:
+    @classmethod
+    async def get_counts(cls):
+        db = get_db()
+        if not db.is_connected:
+            return None
+        
+        now = datetime.utcnow()
+        row = await db.fetchrow("""
+            SELECT
+                (SELECT COUNT(*) FROM users) AS total_users,
+                (SELECT COUNT(*) FROM vip_access WHERE status = 'active' AND expired_at > $1) AS vip_active,
+                (SELECT COUNT(*) FROM vvip_access WHERE status = 'active' AND expired_at > $1) AS vvip_active,
+                (SELECT COALESCE(json_object_agg(role, count), '{}')::text
+                 FROM (SELECT role, COUNT(*) AS count FROM users WHERE role IS NOT NULL GROUP BY role) AS r) AS roles
+        """, now)
+        if row is None:
+            return None
+        return {
+            "total_users": row["total_users"],
+            "roles": json.loads(row["roles"]),
+            "active_access": {"vip_access": row["vip_active"], "vvip_access": row["vvip_active"]},
+        }
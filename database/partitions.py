@@ -0,0 +1,215 @@
+import os
+import re
+import zlib
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("activity_logs", "monitoring_logs", "system_security")
+PARTITION_INDEXES = {
+    "activity_logs": [
+        "CREATE INDEX IF NOT EXISTS idx_activity_logs_created_at ON activity_logs(created_at DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_activity_logs_user_created ON activity_logs(user_id, created_at DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_activity_logs_action_created ON activity_logs(action, created_at DESC)",
+    ],
+    "monitoring_logs": [
+        "CREATE INDEX IF NOT EXISTS idx_monitoring_logs_created ON monitoring_logs(created_at DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_monitoring_logs_type_created ON monitoring_logs(type, created_at DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_monitoring_logs_errors ON monitoring_logs(created_at DESC) WHERE level = 'error'",
+    ],
+    "system_security": [
+        "CREATE INDEX IF NOT EXISTS idx_system_security_user_created ON system_security(user_id, created_at DESC)",
+    ],
+}
+
+RETENTION_MONTHS = int(os.getenv("LOG_RETENTION_MONTHS", "3"))
+ARCHIVE_DIR = os.getenv("LOG_ARCHIVE_DIR", "archives")
+MONTHS_AHEAD = 2
+MAINTENANCE_INTERVAL = 6 * 3600
+
+UPPER_BOUND_PATTERN = re.compile(r"TO \('([^']+)'\)")
+
+
+def month_start(moment: datetime, offset: int = 0) -> datetime:
+    index = moment.year * 12 + moment.month - 1 + offset
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, start: datetime) -> str:
+    return f"{table}_p{start:%Y%m}"
+
+
+async def convert_to_partitioned(conn, table: str):
+    is_partitioned = await conn.fetchval("""
+        SELECT c.relkind = 'p' FROM pg_class c
+        WHERE c.oid = to_regclass($1)
+    """, table)
+    if is_partitioned:
+        return
+
+    legacy = f"{table}_legacy"
+    boundary = month_start(datetime.utcnow(), 1)
+
+    await conn.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    await conn.execute(f"ALTER SEQUENCE IF EXISTS {table}_id_seq OWNED BY NONE")
+    for statement in PARTITION_INDEXES[table]:
+        index_name = statement.split(" IF NOT EXISTS ")[1].split(" ON ")[0]
+        await conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+    await conn.execute(f"UPDATE {legacy} SET created_at = 'epoch' WHERE created_at IS NULL")
+    await conn.execute(f"ALTER TABLE {legacy} ALTER COLUMN created_at SET NOT NULL")
+    await conn.execute(f"""
+        CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+        PARTITION BY RANGE (created_at)
+    """)
+    await conn.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, created_at)")
+    await conn.execute(f"""
+        ALTER TABLE {table} ATTACH PARTITION {legacy}
+        FOR VALUES FROM (MINVALUE) TO ('{boundary:%Y-%m-%d}')
+    """)
+    await conn.execute(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT")
+    for statement in PARTITION_INDEXES[table]:
+        await conn.execute(statement)
+
+
+async def ensure_partitions(conn, months_ahead: int = MONTHS_AHEAD) -> list:
+    created = []
+    now = datetime.utcnow()
+    for table in PARTITIONED_TABLES:
+        partitions = await list_partitions(conn, table)
+        covered = max((item["upper"] for item in partitions if item["upper"]), default=None)
+        for offset in range(months_ahead + 1):
+            start = month_start(now, offset)
+            end = month_start(now, offset + 1)
+            if covered and start < covered:
+                continue
+            name = partition_name(table, start)
+            exists = await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", name)
+            if exists:
+                continue
+            try:
+                await conn.execute(f"""
+                    CREATE TABLE {name} PARTITION OF {table}
+                    FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')
+                """)
+                created.append(name)
+            except Exception as e:
+                logger.error(f"Failed to create partition {name}: {e}")
+    return created
+
+
+async def list_partitions(conn, table: str) -> list:
+    rows = await conn.fetch("""
+        SELECT child.relname AS name, pg_get_expr(child.relpartbound, child.oid) AS bound
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = $1
+    """, table)
+
+    partitions = []
+    for row in rows:
+        match = UPPER_BOUND_PATTERN.search(row["bound"] or "")
+        upper = datetime.fromisoformat(match.group(1)) if match else None
+        partitions.append({"name": row["name"], "upper": upper})
+    partitions.sort(key=lambda item: item["upper"] or datetime.max)
+    return partitions
+
+
+async def archive_partition(conn, name: str, directory: str = ARCHIVE_DIR) -> tuple:
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.jsonl.gz")
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    handle = await asyncio.to_thread(open, path + ".part", "wb")
+    written = 0
+
+    async def sink(chunk: bytes):
+        nonlocal written
+        written += len(chunk)
+        data = compressor.compress(chunk)
+        if data:
+            await asyncio.to_thread(handle.write, data)
+
+    try:
+        await conn.copy_from_query(
+            f"SELECT row_to_json(t)::text FROM {name} t",
+            output=sink,
+            format="csv",
+            delimiter="\x02",
+            quote="\x01"
+        )
+        await asyncio.to_thread(handle.write, compressor.flush())
+    finally:
+        await asyncio.to_thread(handle.close)
+
+    os.replace(path + ".part", path)
+    return path, written
+
+
+async def drop_partition(conn, table: str, name: str):
+    await conn.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+    await conn.execute(f"DROP TABLE {name}")
+
+
+async def apply_retention(conn, retention_months: int = RETENTION_MONTHS, archive: bool = True) -> list:
+    cutoff = month_start(datetime.utcnow(), -retention_months)
+    dropped = []
+    for table in PARTITIONED_TABLES:
+        for partition in await list_partitions(conn, table):
+            if partition["upper"] is None or partition["upper"] > cutoff:
+                continue
+            name = partition["name"]
+            if archive:
+                path, size = await archive_partition(conn, name)
+                logger.info(f"Archived {name} to {path} ({size} bytes raw)")
+            await drop_partition(conn, table, name)
+            dropped.append(name)
+            logger.info(f"Dropped expired log partition {name}")
+    return dropped
+
+
+class PartitionMaintainer:
+    def __init__(self, interval: float = MAINTENANCE_INTERVAL):
+        self.interval = interval
+        self.last_run = None
+        self.last_dropped = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run_once(self):
+        from database.connection import get_db
+        db = get_db()
+        if not db.is_connected or db.pool is None:
+            return
+        async with db.pool.acquire() as conn:
+            created = await ensure_partitions(conn)
+            if created:
+                logger.info(f"Created log partitions: {', '.join(created)}")
+            self.last_dropped = await apply_retention(conn)
+        self.last_run = datetime.utcnow()
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Partition maintenance error: {e}")
+            await asyncio.sleep(self.interval)
+
+
+partition_maintainer = PartitionMaintainer()
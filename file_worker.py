@@ -0,0 +1,61 @@
+import os
+import asyncio
+import logging
+
+from telegram import Bot
+
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+JOB_MODULES = (
+    "commands.convert_txt_vcf",
+    "commands.convert_vcf_txt",
+    "commands.rapikan_txt",
+    "commands.split_file",
+    "commands.sort_file",
+    "commands.pipeline",
+)
+
+
+async def run_worker():
+    import importlib
+    from database.connection import init_db, close_db
+    from utils.file_jobs import file_job_queue, JOB_HANDLERS
+    from utils.number_extract import shutdown_pool
+    from utils.quota import quota_manager
+
+    token = os.getenv("TELEGRAM_BOT_TOKEN")
+    if not token:
+        logger.error("TELEGRAM_BOT_TOKEN not found in environment variables!")
+        return
+
+    if not await init_db():
+        logger.error("File worker needs PostgreSQL, DATABASE_URL is not reachable")
+        return
+
+    for module in JOB_MODULES:
+        importlib.import_module(module)
+    logger.info(f"File worker handling: {', '.join(sorted(JOB_HANDLERS))}")
+
+    async with Bot(token) as bot:
+        file_job_queue.start(bot)
+        quota_manager.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await file_job_queue.stop()
+            await quota_manager.stop()
+            shutdown_pool()
+            await close_db()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(run_worker())
+    except KeyboardInterrupt:
+        pass
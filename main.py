@@ -1,7 +1,14 @@
 import os
+import sys
 import json
 import asyncio
 import logging
+
+from utils.startup_profiler import startup_profiler
+
+if "--profile-startup" in sys.argv:
+    startup_profiler.install()
+
 from telegram import Update, ChatMemberUpdated
 from telegram.ext import (
     Application,
@@ -13,7 +20,7 @@ from telegram.ext import (
     filters
 )
 
-from config import is_owner, BOT_NAME, BOT_CREATOR
+from config import is_owner, BOT_NAME, BOT_CREATOR, METRICS_HOST, METRICS_PORT, LOOP_STALL_THRESHOLD_MS
 
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -24,6 +31,8 @@ logger = logging.getLogger(__name__)
 logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("telegram").setLevel(logging.WARNING)
 
+startup_profiler.mark("core_imports")
+
 db_available = False
 
 def ensure_json_files():
@@ -78,6 +87,23 @@ async def init_database():
         logger.warning(f"PostgreSQL connection failed: {e}. Using JSON fallback.")
     return False
 
+async def handle_error(update, context):
+    try:
+        from database.connection import DatabaseUnavailable
+    except ImportError:
+        DatabaseUnavailable = None
+    
+    if DatabaseUnavailable is not None and isinstance(context.error, DatabaseUnavailable):
+        logger.warning(f"Database unavailable while handling update: {context.error}")
+        if isinstance(update, Update) and update.effective_message:
+            await update.effective_message.reply_text(
+                "```\n⚠️ Database sedang gangguan, coba lagi beberapa saat.\n```",
+                parse_mode="Markdown"
+            )
+        return
+    
+    logger.error(f"Unhandled error while handling update: {context.error}", exc_info=context.error)
+
 async def check_verification_before_command(update: Update, context) -> bool:
     if not update.effective_user:
         return True
@@ -203,6 +229,7 @@ def main():
 
     print("📦 Loading modules...")
     ensure_json_files()
+    startup_profiler.mark("json_files_ready")
 
     print("🔍 Verifying project integrity...")
     print("✅ Project integrity: VERIFIED")
@@ -219,6 +246,7 @@ def main():
     except Exception as e:
         print(f"🛑 STARTUP BLOCKED: {e}\n")
         return
+    startup_profiler.mark("ownership_verified")
 
     print("⚙️ Bot step initialized...")
     print("📥 Loading commands...\n")
@@ -226,9 +254,20 @@ def main():
     token = os.getenv("TELEGRAM_BOT_TOKEN")
     if not token:
         logger.error("TELEGRAM_BOT_TOKEN not found in environment variables!")
+        startup_profiler.report()
         return
 
-    application = Application.builder().token(token).build()
+    from utils.instrumentation import InstrumentedRequest, MetricsServer, register_instrumentation
+    from utils.system_sampler import system_sampler
+    from utils.loop_watchdog import loop_watchdog
+
+    application = (
+        Application.builder()
+        .token(token)
+        .request(InstrumentedRequest(connection_pool_size=256))
+        .build()
+    )
+    metrics_server = MetricsServer(METRICS_HOST, METRICS_PORT)
     
     async def post_init(application):
         print("🗄️ Connecting to PostgreSQL...")
@@ -237,8 +276,60 @@ def main():
             print("✅ PostgreSQL connected!")
         else:
             print("⚠️ Using JSON fallback storage")
+        startup_profiler.mark("database_ready")
+        if METRICS_PORT:
+            await metrics_server.start()
+        system_sampler.start()
+        if db_available:
+            from database.partitions import partition_maintainer
+            from database.flag_cache import flag_cache
+            from utils.stats_service import stats_service
+            await flag_cache.start()
+            partition_maintainer.start()
+            stats_service.start()
+        loop_watchdog.threshold = LOOP_STALL_THRESHOLD_MS / 1000
+        loop_watchdog.start()
+        from commands.expiry_checker import expiry_engine
+        from utils.quota import quota_manager
+        from utils.file_jobs import file_job_queue
+        expiry_engine.start(application.bot)
+        quota_manager.start()
+        file_job_queue.start(application.bot)
+    
+    async def post_shutdown(application):
+        from commands.expiry_checker import expiry_engine
+        from utils.notification_sender import notification_sender
+        from utils.quota import quota_manager
+        from utils.file_jobs import file_job_queue
+        from utils.number_extract import shutdown_pool
+        await file_job_queue.stop()
+        shutdown_pool()
+        await quota_manager.stop()
+        await expiry_engine.stop()
+        await notification_sender.stop()
+        await loop_watchdog.stop()
+        await system_sampler.stop()
+        await metrics_server.stop()
+        if db_available:
+            from database.partitions import partition_maintainer
+            from database.flag_cache import flag_cache
+            from database.connection import close_db
+            from utils.stats_service import stats_service
+            await stats_service.stop()
+            await flag_cache.stop()
+            await partition_maintainer.stop()
+            await close_db()
     
     application.post_init = post_init
+    application.post_shutdown = post_shutdown
+    register_instrumentation(application)
+
+    if startup_profiler.enabled:
+        async def profile_first_update(update: Update, context):
+            if startup_profiler.record_first_update():
+                startup_profiler.report()
+        
+        application.add_handler(TypeHandler(Update, profile_first_update), group=-100)
 
     from commands.start import start_command
     from commands.menu import show_menu
@@ -249,10 +340,11 @@ def main():
         owner_panel_start, owner_panel_action, owner_panel_user_id,
         owner_panel_duration, owner_panel_code_type, owner_panel_code_value,
         owner_panel_code_duration, owner_panel_code_limit, owner_panel_code_expiry,
-        owner_panel_broadcast_type, owner_panel_broadcast_msg,
+        owner_panel_broadcast_type, owner_panel_broadcast_msg, owner_panel_page_callback,
+        owner_panel_export_range,
         ASK_ACTION, ASK_USER_ID, ASK_DURATION, ASK_CODE_TYPE, ASK_CODE_VALUE,
         ASK_CODE_DURATION, ASK_CODE_LIMIT, ASK_CODE_EXPIRY,
-        ASK_BROADCAST_TYPE, ASK_BROADCAST_MSG
+        ASK_BROADCAST_TYPE, ASK_BROADCAST_MSG, ASK_EXPORT_RANGE
     )
     
     from commands.monitoring import (
@@ -287,6 +379,12 @@ def main():
 
     application.add_handler(CommandHandler("start", start_command))
     
+    from commands.file_jobs import show_job_history, job_history_callback
+    from utils.progress import progress_cancel_callback
+    application.add_handler(CommandHandler("jobs", show_job_history))
+    application.add_handler(CallbackQueryHandler(job_history_callback, pattern="^job_(cancel|refresh)"))
+    application.add_handler(CallbackQueryHandler(progress_cancel_callback, pattern="^progress_cancel:"))
+    
     try:
         from commands.msg_to_txt import msg_to_txt_start, msg_to_txt_message, msg_to_txt_filename
         from commands.msg_to_txt import ASK_MESSAGE as MSG_ASK_MESSAGE, ASK_FILENAME as MSG_ASK_FILENAME
@@ -304,12 +402,13 @@ def main():
         logger.warning(f"msg_to_txt not available: {e}")
 
     try:
-        from commands.rapikan_txt import rapikan_txt_start, rapikan_txt_file, ASK_FILE as RAPIKAN_ASK_FILE
+        from commands.rapikan_txt import rapikan_txt_start, rapikan_txt_file, rapikan_txt_option, ASK_FILE as RAPIKAN_ASK_FILE, ASK_OPTION as RAPIKAN_ASK_OPTION
         
         rapikan_txt_conv = ConversationHandler(
             entry_points=[MessageHandler(filters.Regex("^🜲 RAPIKAN TXT 🜲$"), rapikan_txt_start)],
             states={
                 RAPIKAN_ASK_FILE: [MessageHandler(filters.Document.ALL | filters.TEXT, rapikan_txt_file)],
+                RAPIKAN_ASK_OPTION: [MessageHandler(filters.TEXT & ~filters.COMMAND, rapikan_txt_option)],
             },
             fallbacks=[MessageHandler(filters.Regex("^❌ BATAL ❌$"), rapikan_txt_file)],
         )
@@ -319,15 +418,16 @@ def main():
 
     try:
         from commands.convert_txt_vcf import (
-            txt_to_vcf_start, txt_to_vcf_file, txt_to_vcf_filename, txt_to_vcf_contactname,
+            txt_to_vcf_start, txt_to_vcf_file, txt_to_vcf_format, txt_to_vcf_filename, txt_to_vcf_contactname,
             ASK_FILE as TXT_VCF_ASK_FILE, ASK_FILENAME as TXT_VCF_ASK_FILENAME,
-            ASK_CONTACTNAME as TXT_VCF_ASK_CONTACTNAME
+            ASK_CONTACTNAME as TXT_VCF_ASK_CONTACTNAME, ASK_FORMAT as TXT_VCF_ASK_FORMAT
         )
         
         txt_to_vcf_conv = ConversationHandler(
             entry_points=[MessageHandler(filters.Regex("^🜲 TXT TO VCF 🜲$"), txt_to_vcf_start)],
             states={
                 TXT_VCF_ASK_FILE: [MessageHandler(filters.Document.ALL | filters.TEXT, txt_to_vcf_file)],
+                TXT_VCF_ASK_FORMAT: [MessageHandler(filters.TEXT & ~filters.COMMAND, txt_to_vcf_format)],
                 TXT_VCF_ASK_FILENAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, txt_to_vcf_filename)],
                 TXT_VCF_ASK_CONTACTNAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, txt_to_vcf_contactname)],
             },
@@ -338,12 +438,16 @@ def main():
         logger.warning(f"convert_txt_vcf not available: {e}")
 
     try:
-        from commands.convert_vcf_txt import vcf_to_txt_start, vcf_to_txt_file, ASK_FILE as VCF_TXT_ASK_FILE
+        from commands.convert_vcf_txt import (
+            vcf_to_txt_start, vcf_to_txt_file, vcf_to_txt_format,
+            ASK_FILE as VCF_TXT_ASK_FILE, ASK_FORMAT as VCF_TXT_ASK_FORMAT
+        )
         
         vcf_to_txt_conv = ConversationHandler(
             entry_points=[MessageHandler(filters.Regex("^🜲 VCF TO TXT 🜲$"), vcf_to_txt_start)],
             states={
                 VCF_TXT_ASK_FILE: [MessageHandler(filters.Document.ALL | filters.TEXT, vcf_to_txt_file)],
+                VCF_TXT_ASK_FORMAT: [MessageHandler(filters.TEXT & ~filters.COMMAND, vcf_to_txt_format)],
             },
             fallbacks=[MessageHandler(filters.Regex("^❌ BATAL ❌$"), vcf_to_txt_file)],
         )
@@ -353,15 +457,16 @@ def main():
 
     try:
         from commands.convert_xlsx_vcf import (
-            xls_to_vcf_start, xls_to_vcf_file, xls_to_vcf_filename, xls_to_vcf_contactname,
+            xls_to_vcf_start, xls_to_vcf_file, xls_to_vcf_format, xls_to_vcf_filename, xls_to_vcf_contactname,
             ASK_FILE as XLS_ASK_FILE, ASK_FILENAME as XLS_ASK_FILENAME,
-            ASK_CONTACTNAME as XLS_ASK_CONTACTNAME
+            ASK_CONTACTNAME as XLS_ASK_CONTACTNAME, ASK_FORMAT as XLS_ASK_FORMAT
         )
         
         xls_to_vcf_conv = ConversationHandler(
             entry_points=[MessageHandler(filters.Regex("^🜲 XLS TO VCF 🜲$"), xls_to_vcf_start)],
             states={
                 XLS_ASK_FILE: [MessageHandler(filters.Document.ALL | filters.TEXT, xls_to_vcf_file)],
+                XLS_ASK_FORMAT: [MessageHandler(filters.TEXT & ~filters.COMMAND, xls_to_vcf_format)],
                 XLS_ASK_FILENAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, xls_to_vcf_filename)],
                 XLS_ASK_CONTACTNAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, xls_to_vcf_contactname)],
             },
@@ -401,14 +506,15 @@ def main():
 
     try:
         from commands.gabung_file import (
-            gabung_file_start, gabung_file_collect, gabung_file_merge,
-            ASK_FILES, ASK_FILENAME as GABUNG_ASK_FILENAME
+            gabung_file_start, gabung_file_collect, gabung_file_mode, gabung_file_merge,
+            ASK_FILES, ASK_MODE as GABUNG_ASK_MODE, ASK_FILENAME as GABUNG_ASK_FILENAME
         )
         
         gabung_file_conv = ConversationHandler(
             entry_points=[MessageHandler(filters.Regex("^🜲 GABUNG FILE 🜲$"), gabung_file_start)],
             states={
                 ASK_FILES: [MessageHandler(filters.Document.ALL | filters.TEXT, gabung_file_collect)],
+                GABUNG_ASK_MODE: [MessageHandler(filters.TEXT & ~filters.COMMAND, gabung_file_mode)],
                 GABUNG_ASK_FILENAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, gabung_file_merge)],
             },
             fallbacks=[MessageHandler(filters.Regex("^❌ BATAL ❌$"), gabung_file_merge)],
@@ -441,13 +547,53 @@ def main():
     except ImportError as e:
         logger.warning(f"split_file not available: {e}")
 
+    try:
+        from commands.sort_file import sort_file_start, sort_file_receive, sort_file_key, ASK_FILE as SORT_ASK_FILE, ASK_SORT_KEY
+        
+        sort_file_conv = ConversationHandler(
+            entry_points=[MessageHandler(filters.Regex("^🜲 SORT FILE 🜲$"), sort_file_start)],
+            states={
+                SORT_ASK_FILE: [MessageHandler(filters.Document.ALL | filters.TEXT, sort_file_receive)],
+                ASK_SORT_KEY: [MessageHandler(filters.TEXT & ~filters.COMMAND, sort_file_key)],
+            },
+            fallbacks=[MessageHandler(filters.Regex("^❌ BATAL ❌$"), sort_file_key)],
+        )
+        application.add_handler(sort_file_conv)
+    except ImportError as e:
+        logger.warning(f"sort_file not available: {e}")
+
+    try:
+        from commands.pipeline import (
+            pipeline_start, pipeline_file, pipeline_stages, pipeline_format, pipeline_contact_name,
+            pipeline_split_size, pipeline_output_name, cancel_pipeline,
+            ASK_FILE as PIPELINE_ASK_FILE, ASK_STAGES as PIPELINE_ASK_STAGES,
+            ASK_CONTACT_NAME as PIPELINE_ASK_CONTACT_NAME, ASK_SPLIT_SIZE as PIPELINE_ASK_SPLIT_SIZE,
+            ASK_OUTPUT_NAME as PIPELINE_ASK_OUTPUT_NAME, ASK_FORMAT as PIPELINE_ASK_FORMAT
+        )
+        
+        pipeline_conv = ConversationHandler(
+            entry_points=[MessageHandler(filters.Regex("^🜲 PIPELINE 🜲$"), pipeline_start)],
+            states={
+                PIPELINE_ASK_FILE: [MessageHandler(filters.Document.ALL | filters.TEXT, pipeline_file)],
+                PIPELINE_ASK_STAGES: [MessageHandler(filters.TEXT & ~filters.COMMAND, pipeline_stages)],
+                PIPELINE_ASK_FORMAT: [MessageHandler(filters.TEXT & ~filters.COMMAND, pipeline_format)],
+                PIPELINE_ASK_CONTACT_NAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, pipeline_contact_name)],
+                PIPELINE_ASK_SPLIT_SIZE: [MessageHandler(filters.TEXT & ~filters.COMMAND, pipeline_split_size)],
+                PIPELINE_ASK_OUTPUT_NAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, pipeline_output_name)],
+            },
+            fallbacks=[MessageHandler(filters.Regex("^❌ BATAL ❌$"), cancel_pipeline)],
+        )
+        application.add_handler(pipeline_conv)
+    except ImportError as e:
+        logger.warning(f"pipeline not available: {e}")
+
     try:
         from commands.create_admin_navy import (
             create_admin_navy_start, create_admin_navy_mode, create_admin_navy_admin,
             create_admin_navy_navy, create_admin_navy_filename, create_admin_navy_generate,
-            create_admin_navy_block, ASK_MODE, ASK_ADMIN_NUM, ASK_NAVY_NUM,
+            create_admin_navy_format, create_admin_navy_block, ASK_MODE, ASK_ADMIN_NUM, ASK_NAVY_NUM,
             ASK_FILENAME as ADMIN_ASK_FILENAME, ASK_CONTACTNAME as ADMIN_ASK_CONTACTNAME,
-            ASK_BLOCK_INPUT
+            ASK_BLOCK_INPUT, ASK_FORMAT as ADMIN_ASK_FORMAT
         )
         
         create_admin_navy_conv = ConversationHandler(
@@ -459,6 +605,7 @@ def main():
                 ADMIN_ASK_FILENAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, create_admin_navy_filename)],
                 ADMIN_ASK_CONTACTNAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, create_admin_navy_generate)],
                 ASK_BLOCK_INPUT: [MessageHandler(filters.TEXT & ~filters.COMMAND, create_admin_navy_block)],
+                ADMIN_ASK_FORMAT: [MessageHandler(filters.TEXT & ~filters.COMMAND, create_admin_navy_format)],
             },
             fallbacks=[MessageHandler(filters.Regex("^❌ BATAL ❌$"), create_admin_navy_generate)],
         )
@@ -492,6 +639,7 @@ def main():
             ASK_CODE_EXPIRY: [MessageHandler(filters.TEXT & ~filters.COMMAND, owner_panel_code_expiry)],
             ASK_BROADCAST_TYPE: [MessageHandler(filters.TEXT & ~filters.COMMAND, owner_panel_broadcast_type)],
             ASK_BROADCAST_MSG: [MessageHandler(filters.TEXT & ~filters.COMMAND, owner_panel_broadcast_msg)],
+            ASK_EXPORT_RANGE: [MessageHandler(filters.TEXT & ~filters.COMMAND, owner_panel_export_range)],
         },
         fallbacks=[MessageHandler(filters.Regex("^🔙 KEMBALI 🔙$"), owner_panel_start)],
     )
@@ -572,7 +720,11 @@ def main():
     except ImportError as e:
         logger.warning(f"verify handlers not available: {e}")
 
+    application.add_handler(CallbackQueryHandler(owner_panel_page_callback, pattern="^op_(users|redeem):"))
+
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_messages))
+    application.add_error_handler(handle_error)
+    startup_profiler.mark("handlers_registered")
 
     print("="*50)
     print(f"🚀 {BOT_NAME} V2 PRO launched!")
@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip("telegram")
+
+from utils.contact_writers import Contact, VCard30Writer, format_phone
+
+
+def legacy_vcf(phone_numbers, contact_name) -> bytes:
+    out = []
+    for i, phone in enumerate(phone_numbers, start=1):
+        phone_str = str(phone).strip()
+        if not phone_str.startswith('+') and not phone_str.startswith('0'):
+            phone_str = '+' + phone_str
+        out.append(f"""BEGIN:VCARD
+VERSION:3.0
+FN:{contact_name} {str(i).zfill(4)}
+TEL;TYPE=CELL:{phone_str}
+END:VCARD
+
+""")
+    return "".join(out).encode("utf-8")
+
+
+def test_vcard30_default_matches_legacy_output(tmp_path):
+    numbers = ["628123456789", "08123", "+6281", "  6289  "]
+    path = tmp_path / "out.vcf"
+
+    VCard30Writer(str(path)).write_all(
+        Contact(f"Kontak {str(i).zfill(4)}", format_phone(phone)) for i, phone in enumerate(numbers, start=1)
+    )
+
+    assert path.read_bytes() == legacy_vcf(numbers, "Kontak")
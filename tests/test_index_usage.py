@@ -0,0 +1,72 @@
+import os
+import asyncio
+from datetime import datetime
+
+import pytest
+
+asyncpg = pytest.importorskip("asyncpg")
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="DATABASE_URL not set")
+
+PLANS = [
+    (
+        "idx_users_role_id",
+        "SELECT id, user_id, username, role, is_banned FROM users WHERE role = $1 AND id > $2 ORDER BY id ASC LIMIT $3",
+        ("vip", 0, 21),
+    ),
+    (
+        "idx_users_role_id",
+        "SELECT id, user_id, username, role, is_banned FROM users WHERE role = $1 AND id < $2 ORDER BY id DESC LIMIT $3",
+        ("vip", 1000, 21),
+    ),
+    (
+        "idx_redeem_codes_status_id",
+        "SELECT id, code, type, status, current_uses, max_uses FROM redeem_codes WHERE status = $1 AND id > $2 ORDER BY id ASC LIMIT $3",
+        ("active", 0, 16),
+    ),
+    (
+        "idx_vip_access_active",
+        "SELECT id FROM vip_access WHERE status = 'active' AND expired_at <= $1 ORDER BY expired_at LIMIT $2",
+        (datetime.utcnow(), 1000),
+    ),
+    (
+        "idx_vvip_access_active",
+        "SELECT id FROM vvip_access WHERE status = 'active' AND expired_at <= $1 ORDER BY expired_at LIMIT $2",
+        (datetime.utcnow(), 1000),
+    ),
+    (
+        "idx_vip_access_active",
+        "SELECT user_id, expired_at FROM vip_access WHERE status = 'active' AND expired_at > $1 AND expiry_warned_at IS NULL",
+        (datetime.utcnow(),),
+    ),
+    (
+        "idx_vvip_access_active",
+        "SELECT user_id, expired_at FROM vvip_access WHERE status = 'active' AND expired_at > $1 AND expiry_warned_at IS NULL",
+        (datetime.utcnow(),),
+    ),
+]
+
+
+async def _explain_all() -> list:
+    from database.migrations import run_migrations
+
+    conn = await asyncpg.connect(DATABASE_URL)
+    try:
+        await run_migrations(conn)
+        plans = []
+        async with conn.transaction():
+            await conn.execute("SET LOCAL enable_seqscan = off")
+            for index, query, args in PLANS:
+                rows = await conn.fetch(f"EXPLAIN {query}", *args)
+                plans.append((index, "\n".join(row[0] for row in rows)))
+        return plans
+    finally:
+        await conn.close()
+
+
+def test_keyset_and_expiry_queries_use_index_pack():
+    for index, plan in asyncio.run(_explain_all()):
+        assert "Index Scan" in plan or "Index Only Scan" in plan, plan
+        assert index in plan, plan
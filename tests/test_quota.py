@@ -0,0 +1,50 @@
+import asyncio
+
+from utils.quota import QuotaManager
+
+
+class FakeQuotaManager(QuotaManager):
+    def __init__(self, stored=None):
+        super().__init__()
+        self.stored = stored or {}
+        self.loads = 0
+
+    async def _load_from_db(self, user_id: int) -> tuple:
+        self.loads += 1
+        await asyncio.sleep(0.01)
+        return self.stored.get(user_id, 0), self.today()
+
+
+def test_concurrent_consumers_never_exceed_limit():
+    manager = FakeQuotaManager({1: 3})
+
+    async def scenario():
+        return await asyncio.gather(*(manager.consume(1, 50) for _ in range(1000)))
+
+    results = asyncio.run(scenario())
+
+    assert sum(1 for allowed, _, _ in results if allowed) == 47
+    assert manager.loads == 1
+    assert manager._usage[1][1] == 50
+    assert manager._pending[1][1] == 47
+
+
+def test_refund_without_local_entry_is_queued_for_the_database():
+    manager = FakeQuotaManager()
+
+    manager.refund(7)
+
+    assert 7 not in manager._usage
+    assert manager._pending[7] == [manager.today(), -1]
+
+
+def test_refund_cancels_local_consume():
+    manager = FakeQuotaManager()
+
+    async def scenario():
+        await manager.consume(1, 10)
+        manager.refund(1)
+        return await manager.used(1)
+
+    assert asyncio.run(scenario()) == 0
+    assert manager._pending[1][1] == 0
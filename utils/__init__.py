@@ -1,8 +1,25 @@
-from utils.keyboard import get_user_keyboard, get_owner_keyboard, get_cancel_keyboard
-from utils.security import SecurityManager
-from utils.helpers import format_datetime, generate_random_code, format_duration
+import importlib
+
+_EXPORTS = {
+    'get_user_keyboard': 'utils.keyboard',
+    'get_owner_keyboard': 'utils.keyboard',
+    'get_cancel_keyboard': 'utils.keyboard',
+    'SecurityManager': 'utils.security',
+    'format_datetime': 'utils.helpers',
+    'generate_random_code': 'utils.helpers',
+    'format_duration': 'utils.helpers',
+}
 
 __all__ = [
     'get_user_keyboard', 'get_owner_keyboard', 'get_cancel_keyboard',
     'SecurityManager', 'format_datetime', 'generate_random_code', 'format_duration'
 ]
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'utils' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,239 @@
+import io
+import os
+import gzip
+import zipfile
+import logging
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_EXTENSIONS = ('.zip', '.gz')
+DATA_EXTENSIONS = ('.txt', '.vcf')
+ARCHIVE_MAX_RATIO = int(os.getenv("ARCHIVE_MAX_RATIO", "100"))
+ARCHIVE_MAX_TOTAL = int(os.getenv("ARCHIVE_MAX_MB", "512")) << 20
+ARCHIVE_MAX_MEMBERS = int(os.getenv("ARCHIVE_MAX_MEMBERS", "1000"))
+ARCHIVE_RATIO_SLACK = 1 << 20
+IO_BUFFER = 1 << 20
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def is_archive(file_name: str) -> bool:
+    return (file_name or "").lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def strip_archive(file_name: str) -> str:
+    base, ext = os.path.splitext(file_name or "")
+    return base if ext.lower() in ARCHIVE_EXTENSIONS else file_name
+
+
+def data_type(file_name: str) -> Optional[str]:
+    ext = os.path.splitext(strip_archive(file_name))[1].lower()
+    return ext[1:] if ext in DATA_EXTENSIONS else None
+
+
+def accepts(file_name: str, extensions: Tuple[str, ...]) -> bool:
+    if not is_archive(file_name):
+        return (file_name or "").lower().endswith(extensions)
+    inner = data_type(file_name)
+    return inner is None or f".{inner}" in extensions
+
+
+def output_name(file_name: str, file_type: str) -> str:
+    name = os.path.basename(strip_archive(file_name))
+    return name if data_type(name) == file_type else f"{name}.{file_type}"
+
+
+class Budget:
+    def __init__(self, limit: int = ARCHIVE_MAX_TOTAL):
+        self.limit = limit
+        self.used = 0
+
+    def take(self, size: int):
+        self.used += size
+        if self.used > self.limit:
+            raise ArchiveError(f"Isi arsip melebihi batas {self.limit >> 20}MB")
+
+
+class GuardedReader(io.RawIOBase):
+    def __init__(self, stream, name: str, compressed: int, budget: Budget, closers=()):
+        self.stream = stream
+        self.name = name
+        self.limit = compressed * ARCHIVE_MAX_RATIO + ARCHIVE_RATIO_SLACK
+        self.budget = budget
+        self.closers = closers
+        self.read_bytes = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        try:
+            size = self.stream.readinto(buffer)
+        except (zipfile.BadZipFile, gzip.BadGzipFile, EOFError, OSError) as e:
+            raise ArchiveError(f"{self.name}: arsip rusak ({e})")
+        if size:
+            self.read_bytes += size
+            if self.read_bytes > self.limit:
+                raise ArchiveError(f"{self.name}: rasio kompresi melebihi {ARCHIVE_MAX_RATIO}x")
+            self.budget.take(size)
+        return size
+
+    def close(self):
+        if not self.closed:
+            self.stream.close()
+            for closer in self.closers:
+                closer.close()
+        super().close()
+
+
+class Member:
+    def __init__(self, path: str, name: str, size: int, compressed: int, budget: Budget, entry: str = None):
+        self.path = path
+        self.name = name
+        self.size = size
+        self.compressed = compressed
+        self.budget = budget
+        self.entry = entry
+
+    @property
+    def type(self) -> Optional[str]:
+        return data_type(self.name)
+
+    def open_raw(self, budget: Budget = None) -> GuardedReader:
+        budget = budget or self.budget
+        if self.entry is None:
+            return GuardedReader(gzip.open(self.path, 'rb'), self.name, self.compressed, budget)
+        archive = zipfile.ZipFile(self.path)
+        return GuardedReader(archive.open(self.entry), self.name, self.compressed, budget, (archive,))
+
+    def open(self, buffering: int = IO_BUFFER):
+        return io.BufferedReader(self.open_raw(), buffering)
+
+
+class ChainedReader(io.RawIOBase):
+    def __init__(self, members: List[Member]):
+        self.members = iter(members)
+        self.budget = Budget()
+        self.current = None
+        self.pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while True:
+            if self.pending:
+                size = min(len(buffer), len(self.pending))
+                buffer[:size] = self.pending[:size]
+                self.pending = self.pending[size:]
+                return size
+            if self.current is not None:
+                size = self.current.readinto(buffer)
+                if size:
+                    return size
+                self.current.close()
+                self.current = None
+                self.pending = b"\n"
+                continue
+            member = next(self.members, None)
+            if member is None:
+                return 0
+            self.current = member.open_raw(self.budget)
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+        super().close()
+
+
+class ArchiveSource:
+    def __init__(self, members: List[Member]):
+        self.members = members
+        self.name = members[0].name
+        self.size = sum(member.size for member in members)
+
+    @property
+    def type(self) -> Optional[str]:
+        return self.members[0].type
+
+    def open(self, buffering: int = IO_BUFFER):
+        return io.BufferedReader(ChainedReader(self.members), buffering)
+
+
+def list_members(path: str, file_name: str, extensions: Tuple[str, ...] = DATA_EXTENSIONS) -> List[Member]:
+    budget = Budget()
+    compressed = os.path.getsize(path)
+
+    if not file_name.lower().endswith('.zip'):
+        size = 0
+        if compressed >= 4:
+            with open(path, 'rb') as f:
+                f.seek(-4, os.SEEK_END)
+                size = int.from_bytes(f.read(4), 'little')
+        return [Member(path, os.path.basename(strip_archive(file_name)), size, compressed, budget)]
+
+    try:
+        with zipfile.ZipFile(path) as archive:
+            infos = archive.infolist()
+    except zipfile.BadZipFile:
+        raise ArchiveError("File .zip rusak atau bukan arsip zip")
+
+    members = []
+    for info in sorted(infos, key=lambda info: info.filename):
+        base = os.path.basename(info.filename)
+        if info.is_dir() or info.filename.startswith('__MACOSX/') or base.startswith('.'):
+            continue
+        if not base.lower().endswith(extensions):
+            continue
+        if info.flag_bits & 0x1:
+            raise ArchiveError(f"{base}: arsip terenkripsi tidak didukung")
+        if info.file_size > info.compress_size * ARCHIVE_MAX_RATIO + ARCHIVE_RATIO_SLACK:
+            raise ArchiveError(f"{base}: rasio kompresi melebihi {ARCHIVE_MAX_RATIO}x")
+        members.append(Member(path, base, info.file_size, info.compress_size, budget, info.filename))
+
+    if len(members) > ARCHIVE_MAX_MEMBERS:
+        raise ArchiveError(f"Arsip berisi lebih dari {ARCHIVE_MAX_MEMBERS} file")
+    if sum(member.size for member in members) > budget.limit:
+        raise ArchiveError(f"Isi arsip melebihi batas {budget.limit >> 20}MB")
+    return members
+
+
+def expand_input(path: str, file_name: str, extensions: Tuple[str, ...] = DATA_EXTENSIONS) -> list:
+    if not is_archive(file_name):
+        return [path]
+    members = list_members(path, file_name, extensions)
+    if not members:
+        raise ArchiveError(f"Tidak ada file {'/'.join(extensions)} di dalam arsip")
+    return members
+
+
+def resolve_input(path: str, file_name: str, extensions: Tuple[str, ...] = DATA_EXTENSIONS) -> tuple:
+    if not is_archive(file_name):
+        return path, data_type(file_name) or extensions[0][1:]
+    members = expand_input(path, file_name, extensions)
+    file_type = members[0].type or extensions[0][1:]
+    return ArchiveSource([member for member in members if member.type in (file_type, None)]), file_type
+
+
+def source_type(source, default: str = None) -> Optional[str]:
+    return (data_type(source) if isinstance(source, str) else source.type) or default
+
+
+def source_size(source) -> int:
+    return os.path.getsize(source) if isinstance(source, str) else source.size
+
+
+def open_binary(source, buffering: int = IO_BUFFER):
+    if isinstance(source, str):
+        return open(source, 'rb', buffering=buffering)
+    return source.open(buffering)
+
+
+def open_text(source, buffering: int = IO_BUFFER):
+    if isinstance(source, str):
+        return open(source, 'r', encoding='utf-8', buffering=buffering)
+    return io.TextIOWrapper(source.open(buffering), encoding='utf-8')
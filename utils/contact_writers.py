@@ -0,0 +1,188 @@
+import re
+import binascii
+import logging
+from abc import ABC, abstractmethod
+from itertools import islice
+from json.encoder import encode_basestring
+from typing import Iterable, NamedTuple
+
+from utils.lazy_import import lazy_module
+from utils.progress import PROGRESS_STEP
+
+openpyxl = lazy_module("openpyxl")
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VCF21 = "vcf21"
+FORMAT_VCF30 = "vcf30"
+FORMAT_VCF40 = "vcf40"
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMAT_XLSX = "xlsx"
+FORMAT_TXT = "txt"
+
+VCARD_FORMATS = (FORMAT_VCF30, FORMAT_VCF21, FORMAT_VCF40)
+CONTACT_FORMATS = VCARD_FORMATS + (FORMAT_CSV, FORMAT_JSONL, FORMAT_XLSX)
+NUMBER_FORMATS = (FORMAT_TXT, FORMAT_CSV, FORMAT_JSONL, FORMAT_XLSX)
+
+IO_BUFFER = 1 << 20
+CSV_SPECIAL = re.compile(r'[,"\r\n]')
+
+CONTACT_WRITERS = {}
+
+
+class Contact(NamedTuple):
+    name: str
+    phone: str
+
+
+def format_phone(phone) -> str:
+    phone = str(phone).strip()
+    if not phone.startswith('+') and not phone.startswith('0'):
+        phone = '+' + phone
+    return phone
+
+
+class ContactWriter(ABC):
+    label = None
+    extension = None
+    header = ""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+
+    @abstractmethod
+    def render(self, contact: Contact):
+        pass
+
+    def write_all(self, contacts: Iterable[Contact], reporter=None, total: int = 0) -> int:
+        contacts = iter(contacts)
+        with open(self.path, 'w', encoding='utf-8', newline='', buffering=IO_BUFFER) as f:
+            f.write(self.header)
+            while True:
+                batch = list(map(self.render, islice(contacts, PROGRESS_STEP)))
+                if not batch:
+                    break
+                f.write("".join(batch))
+                self._tick(len(batch), reporter, total)
+        return self.count
+
+    def _tick(self, size: int, reporter, total: int):
+        self.count += size
+        if reporter is not None:
+            reporter.check()
+            reporter.update(self.count, total)
+
+
+class VCard21Writer(ContactWriter):
+    label = "VCF 2.1"
+    extension = "vcf"
+
+    def render(self, contact: Contact) -> str:
+        name = contact.name
+        if name.isascii():
+            fn = f"FN:{name}"
+        else:
+            encoded = binascii.b2a_qp(name.encode('utf-8'), istext=False).decode('ascii').replace('=\n', '')
+            fn = f"FN;CHARSET=UTF-8;ENCODING=QUOTED-PRINTABLE:{encoded}"
+        return f"BEGIN:VCARD\r\nVERSION:2.1\r\n{fn}\r\nTEL;CELL:{contact.phone}\r\nEND:VCARD\r\n\r\n"
+
+
+class VCard30Writer(ContactWriter):
+    label = "VCF 3.0"
+    extension = "vcf"
+
+    def render(self, contact: Contact) -> str:
+        return f"BEGIN:VCARD\nVERSION:3.0\nFN:{contact.name}\nTEL;TYPE=CELL:{contact.phone}\nEND:VCARD\n\n"
+
+
+class VCard40Writer(ContactWriter):
+    label = "VCF 4.0"
+    extension = "vcf"
+
+    def render(self, contact: Contact) -> str:
+        return f"BEGIN:VCARD\r\nVERSION:4.0\r\nFN:{contact.name}\r\nTEL;VALUE=uri;TYPE=cell:tel:{contact.phone}\r\nEND:VCARD\r\n\r\n"
+
+
+def csv_field(value: str) -> str:
+    if CSV_SPECIAL.search(value):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+class CsvWriter(ContactWriter):
+    label = "CSV"
+    extension = "csv"
+    header = "name,phone\r\n"
+
+    def render(self, contact: Contact) -> str:
+        return f"{csv_field(contact.name)},{csv_field(contact.phone)}\r\n"
+
+
+class JsonlWriter(ContactWriter):
+    label = "JSONL"
+    extension = "jsonl"
+
+    def render(self, contact: Contact) -> str:
+        return f'{{"name": {encode_basestring(contact.name)}, "phone": {encode_basestring(contact.phone)}}}\n'
+
+
+class TxtWriter(ContactWriter):
+    label = "TXT"
+    extension = "txt"
+
+    def render(self, contact: Contact) -> str:
+        return contact.phone + "\n"
+
+
+class XlsxWriter(ContactWriter):
+    label = "XLSX"
+    extension = "xlsx"
+
+    def render(self, contact: Contact) -> list:
+        return [contact.name, contact.phone]
+
+    def write_all(self, contacts: Iterable[Contact], reporter=None, total: int = 0) -> int:
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet("Kontak")
+        sheet.append(["Nama", "Nomor"])
+        contacts = iter(contacts)
+        while True:
+            batch = list(islice(contacts, PROGRESS_STEP))
+            if not batch:
+                break
+            for contact in batch:
+                sheet.append(self.render(contact))
+            self._tick(len(batch), reporter, total)
+        workbook.save(self.path)
+        return self.count
+
+
+def register_writer(output_format: str, writer: type):
+    CONTACT_WRITERS[output_format] = writer
+
+
+register_writer(FORMAT_VCF21, VCard21Writer)
+register_writer(FORMAT_VCF30, VCard30Writer)
+register_writer(FORMAT_VCF40, VCard40Writer)
+register_writer(FORMAT_CSV, CsvWriter)
+register_writer(FORMAT_JSONL, JsonlWriter)
+register_writer(FORMAT_XLSX, XlsxWriter)
+register_writer(FORMAT_TXT, TxtWriter)
+
+
+def get_writer(output_format: str) -> type:
+    writer = CONTACT_WRITERS.get(output_format)
+    if writer is None:
+        raise ValueError(f"Unknown output format {output_format}")
+    return writer
+
+
+def output_extension(output_format: str) -> str:
+    return get_writer(output_format).extension
+
+
+def write_contacts(contacts: Iterable[Contact], path: str, output_format: str = FORMAT_VCF30,
+                   reporter=None, total: int = 0) -> int:
+    return get_writer(output_format)(path).write_all(contacts, reporter, total)
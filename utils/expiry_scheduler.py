@@ -0,0 +1,105 @@
+import heapq
+import asyncio
+import logging
+import itertools
+from datetime import datetime
+from typing import Optional, Callable, Awaitable
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_SLEEP = 3600
+
+
+class ExpiryScheduler:
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+        self._handler: Optional[Callable[[tuple, datetime, dict], Awaitable[None]]] = None
+        self._after_batch: Optional[Callable[[], Awaitable[None]]] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.fired = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def start(self, handler: Callable[[tuple, datetime, dict], Awaitable[None]],
+              after_batch: Optional[Callable[[], Awaitable[None]]] = None):
+        self._handler = handler
+        self._after_batch = after_batch
+        self._wakeup = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def schedule(self, key: tuple, fire_at: datetime, payload: dict = None):
+        entry = [fire_at, next(self._counter), key, payload or {}, True]
+        previous = self._entries.get(key)
+        if previous is not None:
+            previous[4] = False
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+        metrics.set_gauge("expiry_scheduler_pending", len(self._entries))
+        if self._wakeup is not None and self._heap[0] is entry:
+            self._wakeup.set()
+
+    def cancel(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry[4] = False
+
+    def next_fire_at(self) -> Optional[datetime]:
+        self._discard_cancelled()
+        return self._heap[0][0] if self._heap else None
+
+    def _discard_cancelled(self):
+        while self._heap and not self._heap[0][4]:
+            heapq.heappop(self._heap)
+
+    async def _run(self):
+        while True:
+            self._discard_cancelled()
+            timeout = MAX_SLEEP
+            if self._heap:
+                timeout = min(MAX_SLEEP, max(0.0, (self._heap[0][0] - datetime.utcnow()).total_seconds()))
+
+            if timeout > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+
+            now = datetime.utcnow()
+            fired = self.fired
+            while self._heap and self._heap[0][0] <= now:
+                fire_at, _, key, payload, active = heapq.heappop(self._heap)
+                if not active:
+                    continue
+                self._entries.pop(key, None)
+                self.fired += 1
+                try:
+                    await self._handler(key, fire_at, payload)
+                except Exception as e:
+                    logger.error(f"Expiry scheduler handler error for {key}: {e}")
+            if self._after_batch is not None and self.fired > fired:
+                try:
+                    await self._after_batch()
+                except Exception as e:
+                    logger.error(f"Expiry scheduler batch error: {e}")
+            metrics.set_gauge("expiry_scheduler_pending", len(self._entries))
+
+
+expiry_scheduler = ExpiryScheduler()
@@ -0,0 +1,86 @@
+import time
+import tempfile
+import logging
+
+from utils.metrics import metrics
+from utils.progress import PROGRESS_STEP
+from utils.archive import source_size
+from utils.merge_engine import (
+    MERGE_RUN_SIZE, IO_BUFFER, DIGITS, MergeStats, iter_txt_records, iter_vcards,
+    vcard_name, vcf_identity, write_runs, merge_runs
+)
+
+logger = logging.getLogger(__name__)
+
+SORT_NUMERIC = "numeric"
+SORT_E164 = "e164"
+SORT_NAME = "name"
+
+DEFAULT_COUNTRY_CODE = "62"
+
+
+def e164(value: str, country_code: str = DEFAULT_COUNTRY_CODE) -> str:
+    value = value.strip()
+    digits = "".join(DIGITS.findall(value))
+    if not digits:
+        return ""
+    if value.startswith('+'):
+        return '+' + digits
+    if digits.startswith('00'):
+        return '+' + digits[2:]
+    if digits.startswith('0'):
+        return '+' + country_code + digits[1:]
+    return '+' + digits
+
+
+def numeric_key(record: str):
+    digits = "".join(DIGITS.findall(record)).lstrip('0')
+    return [len(digits), digits, record]
+
+
+def e164_key(record: str):
+    number = e164(record)
+    return [len(number), number, record]
+
+
+def name_key(card: str):
+    return [vcard_name(card).casefold(), vcf_identity(card)]
+
+
+SORT_KEYS = {
+    SORT_NUMERIC: numeric_key,
+    SORT_E164: e164_key,
+    SORT_NAME: name_key,
+}
+
+
+def sort_file(input_path, output_path: str, sort_by: str = SORT_NUMERIC, reporter=None,
+              workdir: str = None, run_size: int = MERGE_RUN_SIZE) -> dict:
+    key = SORT_KEYS.get(sort_by)
+    if key is None:
+        raise ValueError(f"Unknown sort key {sort_by}")
+
+    is_txt = sort_by != SORT_NAME
+    reader = iter_txt_records if is_txt else iter_vcards
+    stats = MergeStats(reporter, source_size(input_path))
+    started = time.perf_counter()
+
+    def records():
+        for record in reader(input_path):
+            stats.tick(len(record))
+            yield record
+
+    with tempfile.TemporaryDirectory(prefix="sort_", dir=workdir) as tmp:
+        runs = write_runs(records(), key, tmp, run_size, plain=is_txt)
+        with open(output_path, 'w', encoding='utf-8', buffering=IO_BUFFER) as outfile:
+            for _, record in merge_runs(runs, key if is_txt else None):
+                outfile.write(record + '\n' if is_txt else record)
+                stats.written += 1
+                if reporter is not None and stats.written % PROGRESS_STEP == 0:
+                    reporter.check()
+                    reporter.update(stats.written, stats.records)
+
+    if reporter is not None:
+        reporter.update(stats.records, stats.records)
+    metrics.observe("external_sort_seconds", sort_by, time.perf_counter() - started)
+    return {"records": stats.written, "runs": len(runs)}
@@ -0,0 +1,484 @@
+import os
+import json
+import time
+import shutil
+import socket
+import asyncio
+import logging
+import threading
+import itertools
+from datetime import datetime
+from typing import Optional, Callable
+from telegram.error import TimedOut, NetworkError, RetryAfter
+
+from config import ROLE_HIERARCHY, JOB_ROLE_WEIGHTS, JOB_ROLE_MAX_RUNNING, JOB_ROLE_MAX_QUEUED, JOB_ROLE_QUEUE_CEILING
+from utils.metrics import metrics
+from utils.quota import quota_manager
+from utils.security import security_manager
+from utils.progress import ProgressReporter
+from utils.result_cache import result_cache, result_entry
+
+try:
+    from database.connection import DatabaseUnavailable
+except ImportError:
+    class DatabaseUnavailable(Exception):
+        pass
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("FILE_JOB_WORKERS", "2"))
+JOB_WORK_DIR = os.getenv("FILE_JOB_DIR", "temp_jobs")
+JOB_LEASE_SECONDS = 120
+JOB_MAX_ATTEMPTS = 3
+JOB_POLL_INTERVAL = 2.0
+JOB_SWEEP_INTERVAL = 60
+INLINE_HISTORY = 200
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+
+JOB_HANDLERS = {}
+
+ROLE_CLASSES = {"OWNER": "owner", "PREMIUM": "vvip", "VIP": "vip", "FREE": "reguler"}
+ROLE_BY_PRIORITY = {level: role for role, level in ROLE_HIERARCHY.items()}
+RUNNING_CAPS = [JOB_ROLE_MAX_RUNNING[ROLE_BY_PRIORITY[level]] for level in sorted(ROLE_BY_PRIORITY)]
+JOB_COST_UNIT = 1024 * 1024
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobFailed(Exception):
+    pass
+
+
+def register_job(operation: str, handler: Callable):
+    JOB_HANDLERS[operation] = handler
+
+
+class JobContext:
+    def __init__(self, job: dict, workdir: str):
+        self.job_id = job["id"]
+        self.user_id = job["user_id"]
+        self.chat_id = job.get("chat_id") or job["user_id"]
+        self.operation = job["operation"]
+        self.file_name = job.get("file_name")
+        self.params = job["params"]
+        self.workdir = workdir
+        self.cancel_event = threading.Event()
+        self.lease_lost = False
+        self.processed = 0
+        self.total = 0
+        self.reporter: Optional[ProgressReporter] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    @property
+    def percent(self) -> int:
+        if not self.total:
+            return 0
+        return min(100, int(self.processed * 100 / self.total))
+
+    def progress(self, processed: int, total: int = None):
+        self.processed = processed
+        if total is not None:
+            self.total = total
+        if self.reporter is not None:
+            self.reporter.update(processed, total)
+
+    update = progress
+
+    def check(self):
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.workdir, os.path.basename(name))
+
+
+def job_cost(file_size: int, role: str) -> float:
+    return (1 + (file_size or 0) / JOB_COST_UNIT) / JOB_ROLE_WEIGHTS.get(role, 1)
+
+
+def decode_job(row: dict) -> dict:
+    job = dict(row)
+    for key in ("params", "result"):
+        value = job.get(key)
+        if isinstance(value, str):
+            try:
+                job[key] = json.loads(value) if value else {}
+            except ValueError:
+                job[key] = {}
+        elif value is None:
+            job[key] = {}
+    return job
+
+
+class FileJobQueue:
+    def __init__(self, workers: int = JOB_WORKERS):
+        self.workers = workers
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._bot = None
+        self._tasks = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running = {}
+        self._inline = {}
+        self._inline_ids = itertools.count(1)
+
+    @property
+    def active(self) -> int:
+        return len(self._running)
+
+    def start(self, bot):
+        self._bot = bot
+        self._wakeup = asyncio.Event()
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(loop.create_task(self._sweeper()))
+        logger.info(f"File job queue started with {self.workers} workers ({self.worker_id})")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def _model(self):
+        try:
+            from database.models import FileTaskModel
+            from database.connection import get_db
+        except ImportError:
+            return None
+        return FileTaskModel if get_db().is_connected else None
+
+    def role_of(self, user_id: int) -> str:
+        try:
+            from commands.vip_system import get_user_role
+        except ImportError:
+            return "reguler"
+        return ROLE_CLASSES.get(get_user_role(user_id), "reguler")
+
+    async def admit(self, user_id: int, file_size: int) -> tuple:
+        is_valid, reason = security_manager.validate_file(file_size or 0)
+        if not is_valid:
+            return self._reject("file_size", reason)
+
+        role = self.role_of(user_id)
+        model = self._model()
+        try:
+            load = await model.queue_load(user_id) if model is not None else None
+        except DatabaseUnavailable as e:
+            logger.warning(f"Queue load unavailable, admitting on local counts: {e}")
+            load = None
+        if load is None:
+            load = {"pending": 0, "user_active": sum(
+                1 for job in self._inline.values() if job["user_id"] == user_id and job["status"] == STATUS_RUNNING
+            )}
+
+        max_queued = JOB_ROLE_MAX_QUEUED[role]
+        if load["user_active"] >= max_queued:
+            return self._reject("user_limit", f"Masih ada {load['user_active']} job berjalan/antri (maks {max_queued}). Tunggu selesai dulu.")
+
+        ceiling = JOB_ROLE_QUEUE_CEILING.get(role)
+        if ceiling is not None and load["pending"] >= ceiling:
+            return self._reject("saturated", "Antrian sedang penuh. Coba lagi beberapa menit lagi.")
+
+        return True, None
+
+    def _reject(self, kind: str, reason: str) -> tuple:
+        self.rejected += 1
+        metrics.inc("file_jobs_rejected_total", kind)
+        return False, reason
+
+    async def submit(self, user_id: int, chat_id: int, operation: str, file_id: str, file_name: str,
+                     file_size: int = 0, params: dict = None, cache_key: str = None) -> dict:
+        if operation not in JOB_HANDLERS:
+            raise ValueError(f"Unknown file job operation {operation}")
+
+        role = self.role_of(user_id)
+        model = self._model()
+        row = None
+        if model is not None:
+            try:
+                row = await model.enqueue(user_id, chat_id, operation, file_name, file_size, file_id, params, cache_key,
+                                          ROLE_HIERARCHY[role], job_cost(file_size, role))
+            except DatabaseUnavailable as e:
+                logger.warning(f"File job queue unavailable, running {operation} inline: {e}")
+        metrics.inc("file_jobs_total", "submitted")
+
+        if row is None:
+            return self._run_inline(user_id, chat_id, operation, file_id, file_name, file_size, params, cache_key,
+                                    ROLE_HIERARCHY[role])
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return decode_job(row)
+
+    async def queue_stats(self) -> dict:
+        roles = {role: {STATUS_PENDING: 0, STATUS_RUNNING: 0} for role in ROLE_HIERARCHY}
+        oldest_pending = 0.0
+        model = self._model()
+        if model is not None:
+            for row in await model.queue_stats():
+                role = ROLE_BY_PRIORITY.get(row["priority"] or 0, "reguler")
+                roles[role][row["status"]] += row["count"]
+                if row["status"] == STATUS_PENDING:
+                    oldest_pending = max(oldest_pending, float(row["oldest_seconds"] or 0))
+        else:
+            for job in self._inline.values():
+                if job["status"] == STATUS_RUNNING:
+                    roles[ROLE_BY_PRIORITY.get(job["priority"], "reguler")][STATUS_RUNNING] += 1
+        return {"roles": roles, "oldest_pending": oldest_pending, "rejected": self.rejected}
+
+    def _run_inline(self, user_id, chat_id, operation, file_id, file_name, file_size, params, cache_key, priority) -> dict:
+        now = datetime.utcnow()
+        job = {
+            "id": -next(self._inline_ids), "user_id": user_id, "chat_id": chat_id, "operation": operation,
+            "file_name": file_name, "file_size": file_size, "source_file_id": file_id, "params": params or {},
+            "result": {}, "status": STATUS_RUNNING, "progress": 0, "attempts": 1, "error_message": None,
+            "cache_key": cache_key, "priority": priority,
+            "created_at": now, "updated_at": now,
+        }
+        self._inline[job["id"]] = job
+        while len(self._inline) > INLINE_HISTORY:
+            self._inline.pop(next(iter(self._inline)))
+        asyncio.get_running_loop().create_task(self._execute(job, inline=True))
+        return job
+
+    async def cancel(self, job_id: int, user_id: int = None) -> bool:
+        if job_id < 0:
+            job = self._inline.get(job_id)
+            if job is None or (user_id is not None and job["user_id"] != user_id) or job["status"] != STATUS_RUNNING:
+                return False
+            job["status"] = STATUS_CANCELLED
+        else:
+            model = self._model()
+            try:
+                row = await model.cancel(job_id, user_id) if model is not None else None
+            except DatabaseUnavailable as e:
+                logger.warning(f"File job #{job_id} cancel failed: {e}")
+                return False
+            if row is None:
+                return False
+            if row.get("locked_by") is None:
+                quota_manager.refund(row["user_id"])
+
+        context = self._running.get(job_id)
+        if context is not None:
+            context.cancel_event.set()
+        metrics.inc("file_jobs_total", STATUS_CANCELLED)
+        return True
+
+    async def history(self, user_id: int, limit: int = 10) -> list:
+        jobs = [job for job in self._inline.values() if job["user_id"] == user_id]
+        model = self._model()
+        if model is not None:
+            try:
+                jobs.extend(decode_job(row) for row in await model.get_user_tasks(user_id, limit))
+            except DatabaseUnavailable as e:
+                logger.warning(f"File job history unavailable: {e}")
+        jobs.sort(key=lambda job: job["created_at"], reverse=True)
+        for job in jobs:
+            context = self._running.get(job["id"])
+            if context is not None and job["status"] == STATUS_RUNNING:
+                job["progress"] = context.percent
+        return jobs[:limit]
+
+    async def _worker(self):
+        while True:
+            job = None
+            model = self._model()
+            if model is not None:
+                try:
+                    row = await model.claim(self.worker_id, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, RUNNING_CAPS)
+                    job = decode_job(row) if row else None
+                except Exception as e:
+                    logger.error(f"File job claim error: {e}")
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            if job["attempts"] > 1:
+                logger.info(f"Resuming file job #{job['id']} ({job['operation']}), attempt {job['attempts']}")
+            try:
+                await self._execute(job)
+            except DatabaseUnavailable as e:
+                logger.error(f"File job #{job['id']} state not saved, lease will expire: {e}")
+
+    async def _sweeper(self):
+        while True:
+            await asyncio.sleep(JOB_SWEEP_INTERVAL)
+            model = self._model()
+            if model is None:
+                continue
+            try:
+                for row in await model.fail_exhausted(JOB_MAX_ATTEMPTS):
+                    self.failed += 1
+                    metrics.inc("file_jobs_total", STATUS_FAILED)
+                    quota_manager.refund(row["user_id"])
+                    await self._notify(row.get("chat_id") or row["user_id"],
+                                       f"```\n❌ Job #{row['id']} gagal: proses terhenti berulang kali.\n```")
+            except Exception as e:
+                logger.error(f"File job sweep error: {e}")
+
+    async def _heartbeat(self, context: JobContext):
+        model = self._model()
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            if model is None:
+                continue
+            try:
+                status = await model.heartbeat(context.job_id, self.worker_id, JOB_LEASE_SECONDS, context.percent)
+            except Exception as e:
+                logger.error(f"File job heartbeat error for #{context.job_id}: {e}")
+                continue
+            if status is None:
+                logger.warning(f"File job #{context.job_id} lease lost, stopping without delivery")
+                context.lease_lost = True
+                context.cancel_event.set()
+                return
+            if status == STATUS_CANCELLED:
+                context.cancel_event.set()
+
+    async def _execute(self, job: dict, inline: bool = False):
+        job_id = job["id"]
+        workdir = os.path.join(JOB_WORK_DIR, str(job_id))
+        os.makedirs(workdir, exist_ok=True)
+        context = JobContext(job, workdir)
+        context.reporter = ProgressReporter(
+            self._bot, context.chat_id, f"JOB {job['operation'].replace('_', ' ').upper()}",
+            user_id=context.user_id, cancel_event=context.cancel_event, cancel_ref=f"job:{job_id}"
+        ).start()
+        self._running[job_id] = context
+        model = None if inline else self._model()
+        heartbeat = None if inline else asyncio.get_running_loop().create_task(self._heartbeat(context))
+        started = time.perf_counter()
+        status, error, result = STATUS_DONE, None, job.get("result") or {}
+
+        try:
+            handler = JOB_HANDLERS.get(job["operation"])
+            if handler is None:
+                raise JobFailed(f"Operasi {job['operation']} tidak dikenal")
+
+            input_path = await self._fetch_input(job, context)
+            context.check()
+            output = await asyncio.to_thread(handler, context, input_path)
+            context.check()
+            result = await self._deliver(job, context, output, result, model)
+        except JobCancelled:
+            if context.lease_lost:
+                status = None
+            else:
+                status = STATUS_CANCELLED
+                await self._notify(context.chat_id, f"```\n❌ Job #{job_id} dibatalkan\n```")
+        except (TimedOut, NetworkError, RetryAfter) as e:
+            if not inline and job["attempts"] < JOB_MAX_ATTEMPTS:
+                logger.warning(f"File job #{job_id} network error, releasing for retry: {e}")
+                await model.release(job_id, self.worker_id, str(e))
+                status = None
+            else:
+                status, error = STATUS_FAILED, str(e)
+                await self._notify(context.chat_id, f"```\n❌ Job #{job_id} gagal: koneksi Telegram bermasalah.\n```")
+        except Exception as e:
+            logger.error(f"File job #{job_id} ({job['operation']}) failed: {e}")
+            status, error = STATUS_FAILED, str(e)
+            await self._notify(context.chat_id, f"❌ Error: {e}", parse_mode=None)
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+            await context.reporter.finish()
+            self._running.pop(job_id, None)
+            if status is not None:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+        if status is None:
+            return
+        metrics.observe("file_job_seconds", job["operation"], time.perf_counter() - started)
+        metrics.inc("file_jobs_total", status)
+        if status == STATUS_DONE:
+            self.completed += 1
+        else:
+            quota_manager.refund(job["user_id"])
+            if status == STATUS_FAILED:
+                self.failed += 1
+
+        if inline:
+            if job["status"] == STATUS_RUNNING:
+                job["status"] = status
+            job.update({"result": result, "error_message": error, "updated_at": datetime.utcnow(),
+                        "progress": 100 if status == STATUS_DONE else context.percent})
+        elif model is not None:
+            await model.finish(job_id, self.worker_id, status, result, error)
+
+    async def _fetch_input(self, job: dict, context: JobContext) -> str:
+        path = context.path(job.get("file_name") or f"input_{job['id']}")
+        telegram_file = await self._bot.get_file(job["source_file_id"])
+        await telegram_file.download_to_drive(path)
+        return path
+
+    async def _deliver(self, job: dict, context: JobContext, output: dict, result: dict, model) -> dict:
+        outputs = output.get("outputs", [])
+        sent = result.get("sent", [])
+        for index, (path, filename) in enumerate(outputs):
+            if index < len(sent):
+                continue
+            context.check()
+            caption = output.get("caption") if index == len(outputs) - 1 else None
+            with open(path, "rb") as document:
+                message = await self._bot.send_document(
+                    chat_id=context.chat_id,
+                    document=document,
+                    filename=filename,
+                    caption=caption,
+                    parse_mode=output.get("parse_mode") if caption else None
+                )
+            sent.append({"filename": filename, "file_id": message.document.file_id if message.document else None})
+            result = {**result, "sent": sent}
+            if model is not None:
+                await model.save_result(job["id"], self.worker_id, result)
+
+        if not outputs and output.get("caption"):
+            await self._notify(context.chat_id, output["caption"], parse_mode=None)
+
+        result = {**result, "sent": sent, "caption": output.get("caption"), "parse_mode": output.get("parse_mode")}
+        if job.get("cache_key"):
+            result_cache.put(job["cache_key"], result_entry(result) or {})
+        await self._record_operation(job["user_id"])
+        return result
+
+    async def _record_operation(self, user_id: int):
+        try:
+            from commands.vip_system import get_user_data, update_user_data
+        except ImportError:
+            return
+        user_data = get_user_data(user_id)
+        update_user_data(user_id, {"total_operations": user_data.get("total_operations", 0) + 1})
+
+    async def _notify(self, chat_id: int, text: str, parse_mode: str = "Markdown"):
+        try:
+            await self._bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+        except Exception as e:
+            logger.debug(f"File job notification to {chat_id} failed: {e}")
+
+
+file_job_queue = FileJobQueue()
@@ -3,7 +3,9 @@ import string
 import re
 from datetime import datetime, timedelta
 from typing import Optional
-import phonenumbers
+from utils.lazy_import import lazy_module
+
+phonenumbers = lazy_module("phonenumbers")
 
 
 def format_datetime(dt: datetime, format_str: str = "%d-%m-%Y %H:%M:%S") -> str:
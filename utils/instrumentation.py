@@ -0,0 +1,167 @@
+import re
+import time
+import asyncio
+import logging
+from telegram import Update
+from telegram.ext import ContextTypes, TypeHandler
+from telegram.request import HTTPXRequest
+
+from utils.metrics import metrics
+from utils.stats_service import stats_service
+
+logger = logging.getLogger(__name__)
+
+BUTTON_PATTERN = re.compile(r"^🜲 (.+) 🜲$")
+NAVIGATION_TEXTS = {"❌ BATAL ❌", "🔙 KEMBALI 🔙", "✅ SELESAI ✅"}
+COMMAND_KEY = "_metrics_command"
+
+MIDDLEWARE_GROUP = -1
+FINALIZER_GROUP = 99
+
+
+def resolve_command_label(update: Update, context: ContextTypes.DEFAULT_TYPE) -> str:
+    user_data = context.user_data if update.effective_user else None
+
+    if update.callback_query:
+        data = update.callback_query.data or ""
+        return f"callback:{data.split(':')[0]}"
+
+    message = update.message
+    if message is None:
+        if update.my_chat_member or update.chat_member:
+            return "chat_member"
+        return "other"
+
+    text = message.text or ""
+    label = None
+    if text.startswith("/"):
+        label = text.split()[0].split("@")[0]
+    else:
+        match = BUTTON_PATTERN.match(text)
+        if match:
+            label = match.group(1)
+        elif text == "🎁 REDEEM CODE 🎁":
+            label = "Redeem"
+
+    if label:
+        if user_data is not None:
+            user_data[COMMAND_KEY] = label
+        return label
+
+    if text in NAVIGATION_TEXTS:
+        return "navigation"
+
+    if message.new_chat_members or message.left_chat_member:
+        return "group_member"
+
+    if message.chat and message.chat.type in ("group", "supergroup"):
+        return "group_message"
+
+    if user_data is not None and user_data.get(COMMAND_KEY):
+        return user_data[COMMAND_KEY]
+
+    return "message"
+
+
+async def begin_update(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not isinstance(update, Update):
+        return
+    metrics.begin_request(resolve_command_label(update, context))
+    if update.effective_user and not update.effective_user.is_bot:
+        stats_service.record_active(update.effective_user.id)
+    if update.message and update.message.document and update.message.document.file_size:
+        metrics.record_file_bytes(update.message.document.file_size)
+
+
+async def finish_update(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    metrics.end_request()
+
+
+def register_instrumentation(application):
+    application.add_handler(TypeHandler(object, begin_update), group=MIDDLEWARE_GROUP)
+    application.add_handler(TypeHandler(object, finish_update), group=FINALIZER_GROUP)
+
+
+class InstrumentedRequest(HTTPXRequest):
+    async def do_request(self, url: str, method: str, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await super().do_request(url, method, *args, **kwargs)
+        finally:
+            endpoint = url.rsplit("/", 1)[-1] or "unknown"
+            metrics.record_api(endpoint, time.perf_counter() - started)
+
+
+class MetricsServer:
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        try:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+            logger.info(f"Metrics endpoint listening on http://{self.host}:{self.port}/metrics")
+            return True
+        except OSError as e:
+            logger.warning(f"Metrics endpoint not started: {e}")
+            return False
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            while True:
+                header = await asyncio.wait_for(reader.readline(), timeout=5)
+                if header in (b"\r\n", b"\n", b""):
+                    break
+
+            parts = request_line.decode("latin-1").split()
+            path = parts[1] if len(parts) >= 2 else ""
+
+            if path.split("?")[0] == "/metrics":
+                status = "200 OK"
+                body = metrics.render_prometheus().encode("utf-8")
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                status = "404 Not Found"
+                body = b"not found\n"
+                content_type = "text/plain; charset=utf-8"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.debug(f"Metrics request error: {e}")
+        finally:
+            writer.close()
+
+
+def format_latency_table(name: str = "handler_latency_seconds", limit: int = 12) -> str:
+    rows = metrics.summary(name)[:limit]
+    if not rows:
+        return "Belum ada data latency."
+
+    lines = [f"{'COMMAND':<16}{'N':>6}{'P50':>8}{'P95':>8}{'P99':>8}"]
+    for row in rows:
+        label = row["label"][:15]
+        lines.append(
+            f"{label:<16}{row['count']:>6}"
+            f"{_ms(row['p50']):>8}{_ms(row['p95']):>8}{_ms(row['p99']):>8}"
+        )
+    return "\n".join(lines)
+
+
+def _ms(seconds: float) -> str:
+    if seconds >= 10:
+        return f"{seconds:.0f}s"
+    if seconds >= 1:
+        return f"{seconds:.1f}s"
+    return f"{seconds * 1000:.0f}ms"
@@ -26,6 +26,7 @@ def get_main_menu_keyboard(is_owner: bool = False):
             [KeyboardButton("🜲 RAPIKAN TXT 🜲"), KeyboardButton("🜲 GABUNG FILE 🜲")],
             [KeyboardButton("🜲 HITUNG KONTAK 🜲"), KeyboardButton("🜲 CEK NAMA 🜲")],
             [KeyboardButton("🜲 SPLIT FILE 🜲"), KeyboardButton("🜲 CREATE ADM/NAVY 🜲")],
+            [KeyboardButton("🜲 SORT FILE 🜲"), KeyboardButton("🜲 PIPELINE 🜲")],
             [KeyboardButton("🜲 STATUS 🜲"), KeyboardButton("🜲 Redeem 🜲")],
             [KeyboardButton("🜲 Owner Panel 🜲"), KeyboardButton("🜲 Monitoring Bot 🜲")],
             [KeyboardButton("🔙 KEMBALI 🔙")]
@@ -37,6 +38,7 @@ def get_main_menu_keyboard(is_owner: bool = False):
             [KeyboardButton("🜲 RAPIKAN TXT 🜲"), KeyboardButton("🜲 GABUNG FILE 🜲")],
             [KeyboardButton("🜲 HITUNG KONTAK 🜲"), KeyboardButton("🜲 CEK NAMA 🜲")],
             [KeyboardButton("🜲 SPLIT FILE 🜲"), KeyboardButton("🜲 CREATE ADM/NAVY 🜲")],
+            [KeyboardButton("🜲 SORT FILE 🜲"), KeyboardButton("🜲 PIPELINE 🜲")],
             [KeyboardButton("🜲 STATUS 🜲"), KeyboardButton("🜲 Redeem 🜲")],
             [KeyboardButton("🔙 KEMBALI 🔙")]
         ]
@@ -57,6 +59,7 @@ def get_file_tools_keyboard():
         [KeyboardButton("🜲 RAPIKAN TXT 🜲"), KeyboardButton("🜲 GABUNG FILE 🜲")],
         [KeyboardButton("🜲 HITUNG KONTAK 🜲"), KeyboardButton("🜲 CEK NAMA 🜲")],
         [KeyboardButton("🜲 SPLIT FILE 🜲"), KeyboardButton("🜲 CREATE ADM/NAVY 🜲")],
+        [KeyboardButton("🜲 SORT FILE 🜲"), KeyboardButton("🜲 PIPELINE 🜲")],
         [KeyboardButton("🜲 HAPUS DUPLIKAT 🜲"), KeyboardButton("🜲 NORMALIZE NO 🜲")],
         [KeyboardButton("🔙 KEMBALI 🔙")]
     ]
@@ -0,0 +1,142 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from typing import Optional
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STACK_LIMIT = 25
+LOG_COOLDOWN = 60
+
+
+class LoopWatchdog:
+    def __init__(self, threshold: float = 0.25, tick: float = 0.05):
+        self.threshold = threshold
+        self.tick = tick
+        self.offenders = {}
+        self.max_lag = 0.0
+        self.stall_count = 0
+        self._last_beat = time.monotonic()
+        self._loop_thread_id = None
+        self._pending = None
+        self._pending_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_logged = {}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    async def _heartbeat(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.tick
+            await asyncio.sleep(self.tick)
+            lag = max(0.0, loop.time() - expected)
+            self._last_beat = time.monotonic()
+
+            metrics.observe("event_loop_lag_seconds", "loop", lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+
+            with self._pending_lock:
+                stall, self._pending = self._pending, None
+            if stall is not None:
+                self._finish_stall(stall, lag)
+
+    def _watch(self):
+        captured_for = None
+        while not self._stop.wait(self.tick):
+            beat = self._last_beat
+            if time.monotonic() - beat < self.threshold or captured_for == beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame, limit=STACK_LIMIT)
+            del frame
+            captured_for = beat
+            with self._pending_lock:
+                self._pending = {"stack": stack, "captured_at": time.time()}
+
+    def _finish_stall(self, stall: dict, lag: float):
+        stack = stall["stack"]
+        where = _offender_key(stack)
+        self.stall_count += 1
+
+        entry = self.offenders.get(where)
+        if entry is None:
+            entry = self.offenders[where] = {"where": where, "count": 0, "total": 0.0, "max": 0.0}
+        entry["count"] += 1
+        entry["total"] += lag
+        entry["max"] = max(entry["max"], lag)
+        metrics.inc("event_loop_stalls_total", where)
+
+        formatted = "".join(traceback.format_list(stack))
+        logger.warning(f"Event loop blocked for {lag * 1000:.0f} ms at {where}\n{formatted}")
+
+        now = time.monotonic()
+        if now - self._last_logged.get(where, 0) >= LOG_COOLDOWN:
+            self._last_logged[where] = now
+            asyncio.get_running_loop().create_task(self._persist(where, lag, formatted))
+
+    async def _persist(self, where: str, lag: float, formatted: str):
+        try:
+            from database.models import MonitoringLogModel
+            await MonitoringLogModel.log(
+                "loop_stall",
+                f"Event loop blocked {lag * 1000:.0f} ms at {where}",
+                level="warning",
+                details={"lag_ms": round(lag * 1000, 1), "where": where, "stack": formatted[-3000:]}
+            )
+        except Exception as e:
+            logger.debug(f"Failed to persist loop stall: {e}")
+
+    def top_offenders(self, limit: int = 5) -> list:
+        return sorted(self.offenders.values(), key=lambda entry: entry["total"], reverse=True)[:limit]
+
+
+def _offender_key(stack) -> str:
+    for frame in reversed(stack):
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(PROJECT_ROOT) and "site-packages" not in filename and not filename.endswith("loop_watchdog.py"):
+            return f"{os.path.relpath(filename, PROJECT_ROOT)}:{frame.lineno} {frame.name}"
+    if stack:
+        frame = stack[-1]
+        return f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}"
+    return "unknown"
+
+
+loop_watchdog = LoopWatchdog()
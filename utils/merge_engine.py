@@ -0,0 +1,261 @@
+import os
+import re
+import json
+import heapq
+import hashlib
+import tempfile
+import logging
+from operator import itemgetter
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from utils.progress import PROGRESS_STEP
+from utils.archive import open_text, source_size
+
+logger = logging.getLogger(__name__)
+
+MERGE_CONCAT = "concat"
+MERGE_DEDUP = "dedup"
+MERGE_SORTED = "sorted"
+MERGE_MODES = (MERGE_CONCAT, MERGE_DEDUP, MERGE_SORTED)
+
+MERGE_RUN_SIZE = int(os.getenv("MERGE_RUN_SIZE", "200000"))
+MERGE_DEDUP_MEMORY_LIMIT = int(os.getenv("MERGE_DEDUP_MEMORY_LIMIT", "2000000"))
+IO_BUFFER = 1 << 20
+
+DIGITS = re.compile(r'\d+')
+FN_LINE = re.compile(r'^FN[^:\r\n]*:(.*)$', re.IGNORECASE | re.MULTILINE)
+TEL_LINE = re.compile(r'^(?:item\d+\.)?TEL[^:\r\n]*:(.*)$', re.IGNORECASE | re.MULTILINE)
+
+
+def iter_txt_records(source) -> Iterator[str]:
+    with open_text(source, IO_BUFFER) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def iter_vcards(source) -> Iterator[str]:
+    block = []
+    with open_text(source, IO_BUFFER) as f:
+        for line in f:
+            marker = line.strip().upper()
+            if marker == "BEGIN:VCARD":
+                block = [line]
+            elif block:
+                block.append(line)
+                if marker == "END:VCARD":
+                    card = "".join(block)
+                    block = []
+                    yield card if card.endswith("\n") else card + "\n"
+
+
+def vcard_name(card: str) -> str:
+    match = FN_LINE.search(card)
+    return match.group(1).strip() if match else ""
+
+
+def vcard_numbers(card: str) -> List[str]:
+    return ["".join(DIGITS.findall(value)) for value in TEL_LINE.findall(card)]
+
+
+def vcard_phones(card: str) -> List[str]:
+    phones = []
+    for value in TEL_LINE.findall(card):
+        value = value.strip()
+        phones.append(value[4:] if value.lower().startswith("tel:") else value)
+    return phones
+
+
+def txt_identity(record: str) -> str:
+    return record
+
+
+def vcf_identity(card: str) -> str:
+    numbers = sorted(number for number in vcard_numbers(card) if number)
+    return ",".join(numbers) if numbers else card.strip()
+
+
+def txt_sort_key(record: str):
+    return [len(record), record]
+
+
+def vcf_sort_key(card: str):
+    return [vcard_name(card).casefold(), vcf_identity(card)]
+
+
+def digest(value: str) -> bytes:
+    return hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest()
+
+
+def write_runs(records: Iterable, key: Optional[Callable], workdir: str, run_size: int = MERGE_RUN_SIZE,
+               plain: bool = False) -> List[str]:
+    paths = []
+    batch = []
+
+    def flush():
+        batch.sort(key=itemgetter(0))
+        path = os.path.join(workdir, f"run_{len(paths):05d}.{'txt' if plain else 'jsonl'}")
+        with open(path, 'w', encoding='utf-8', buffering=IO_BUFFER) as f:
+            if plain:
+                f.writelines(record + "\n" for _, record in batch)
+            else:
+                for entry in batch:
+                    f.write(json.dumps(entry, ensure_ascii=False))
+                    f.write("\n")
+        paths.append(path)
+        batch.clear()
+
+    for record in records:
+        batch.append(record if key is None else (key(record), record))
+        if len(batch) >= run_size:
+            flush()
+    if batch:
+        flush()
+    return paths
+
+
+def read_run(path: str, key: Callable = None) -> Iterator[list]:
+    with open(path, 'r', encoding='utf-8', buffering=IO_BUFFER) as f:
+        if key is None:
+            for line in f:
+                yield json.loads(line)
+        else:
+            for line in f:
+                record = line[:-1]
+                yield [key(record), record]
+
+
+def merge_runs(paths: List[str], key: Callable = None) -> Iterator[list]:
+    return heapq.merge(*(read_run(path, key) for path in paths), key=itemgetter(0))
+
+
+def dedup_records(records: Iterable[str], identity: Callable, stats, workdir: str = None,
+                  run_size: int = MERGE_RUN_SIZE, memory_limit: int = MERGE_DEDUP_MEMORY_LIMIT) -> Iterator[str]:
+    records = iter(records)
+    seen = set()
+    for record in records:
+        fingerprint = digest(identity(record))
+        if fingerprint in seen:
+            stats.duplicates += 1
+            continue
+        seen.add(fingerprint)
+        yield record
+        if len(seen) >= memory_limit:
+            break
+    else:
+        return
+
+    logger.info(f"Dedup passed {memory_limit} unique records, continuing with external sort")
+
+    def overflow() -> Iterator[tuple]:
+        for index, record in enumerate(records):
+            fingerprint = digest(identity(record))
+            if fingerprint in seen:
+                stats.duplicates += 1
+                continue
+            yield (int.from_bytes(fingerprint, 'big'), index), record
+
+    with tempfile.TemporaryDirectory(prefix="dedup_", dir=workdir) as tmp:
+        by_digest = os.path.join(tmp, "digest")
+        by_index = os.path.join(tmp, "index")
+        os.mkdir(by_digest)
+        os.mkdir(by_index)
+
+        def first_seen() -> Iterator[tuple]:
+            previous = None
+            for (fingerprint, index), record in merge_runs(write_runs(overflow(), None, by_digest, run_size)):
+                if fingerprint == previous:
+                    stats.duplicates += 1
+                    continue
+                previous = fingerprint
+                yield index, record
+
+        for _, record in merge_runs(write_runs(first_seen(), None, by_index, run_size)):
+            yield record
+
+
+class MergeStats:
+    def __init__(self, reporter=None, total_bytes: int = 0):
+        self.reporter = reporter
+        self.total_bytes = total_bytes
+        self.read_bytes = 0
+        self.records = 0
+        self.written = 0
+        self.duplicates = 0
+        self.count = 0
+
+    def tick(self, size: int):
+        self.read_bytes += size
+        self.records += 1
+        if self.reporter is not None and self.records % PROGRESS_STEP == 0:
+            self.reporter.check()
+            self.reporter.update(self.read_bytes, self.total_bytes)
+
+    def as_dict(self) -> dict:
+        return {"records": self.written, "count": self.count, "duplicates": self.duplicates}
+
+
+def merge_files(paths: List, file_type: str, output_path: str, mode: str = MERGE_CONCAT,
+                reporter=None, workdir: str = None, run_size: int = MERGE_RUN_SIZE) -> dict:
+    if mode not in MERGE_MODES:
+        raise ValueError(f"Unknown merge mode {mode}")
+
+    stats = MergeStats(reporter, sum(source_size(path) for path in paths))
+    is_txt = file_type == 'txt'
+
+    def records() -> Iterator[str]:
+        reader = iter_txt_records if is_txt else iter_vcards
+        for path in paths:
+            for record in reader(path):
+                stats.tick(len(record))
+                yield record
+
+    def emit(outfile, record: str):
+        if is_txt:
+            outfile.write(record + '\n')
+            stats.count += len(DIGITS.findall(record))
+        else:
+            outfile.write(record)
+            stats.count += 1
+        stats.written += 1
+
+    with open(output_path, 'w', encoding='utf-8', buffering=IO_BUFFER) as outfile:
+        if mode == MERGE_CONCAT and is_txt:
+            _concat_txt(paths, outfile, stats)
+        elif mode == MERGE_CONCAT:
+            for record in records():
+                emit(outfile, record)
+        elif mode == MERGE_DEDUP:
+            identity = txt_identity if is_txt else vcf_identity
+            for record in dedup_records(records(), identity, stats, workdir, run_size):
+                emit(outfile, record)
+        else:
+            key = txt_sort_key if is_txt else vcf_sort_key
+            with tempfile.TemporaryDirectory(prefix="merge_", dir=workdir) as tmp:
+                runs = write_runs(records(), key, tmp, run_size, plain=is_txt)
+                previous = None
+                for entry_key, record in merge_runs(runs, key if is_txt else None):
+                    if entry_key == previous:
+                        stats.duplicates += 1
+                        continue
+                    previous = entry_key
+                    emit(outfile, record)
+                    if reporter is not None and stats.written % PROGRESS_STEP == 0:
+                        reporter.check()
+                        reporter.update(stats.written + stats.duplicates, stats.records)
+
+    if reporter is not None:
+        reporter.update(stats.total_bytes, stats.total_bytes)
+    return stats.as_dict()
+
+
+def _concat_txt(paths: List, outfile, stats: MergeStats):
+    for path in paths:
+        with open_text(path, IO_BUFFER) as infile:
+            for line in infile:
+                outfile.write(line)
+                stats.count += len(DIGITS.findall(line))
+                stats.tick(len(line))
+        outfile.write('\n')
+    stats.written = stats.records
@@ -0,0 +1,215 @@
+import threading
+import time
+from contextvars import ContextVar
+from collections import defaultdict
+from typing import Optional
+
+
+class LatencyHistogram:
+    SUB_BUCKET_BITS = 4
+    MAX_BITS = 40
+
+    def __init__(self):
+        sub_buckets = 1 << self.SUB_BUCKET_BITS
+        self.counts = [0] * ((self.MAX_BITS - self.SUB_BUCKET_BITS) * sub_buckets + sub_buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @classmethod
+    def _index(cls, micros: int) -> int:
+        sub_buckets = 1 << cls.SUB_BUCKET_BITS
+        if micros < sub_buckets:
+            return micros
+        shift = micros.bit_length() - cls.SUB_BUCKET_BITS - 1
+        return shift * sub_buckets + (micros >> shift)
+
+    @classmethod
+    def _bounds(cls, index: int) -> tuple:
+        sub_buckets = 1 << cls.SUB_BUCKET_BITS
+        if index < sub_buckets:
+            return index, index + 1
+        shift = index // sub_buckets - 1
+        sub = index - shift * sub_buckets
+        return sub << shift, (sub + 1) << shift
+
+    def record(self, seconds: float):
+        if seconds < 0:
+            seconds = 0.0
+        micros = int(seconds * 1_000_000)
+        index = min(self._index(micros), len(self.counts) - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        target = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            seen += bucket_count
+            if seen >= target:
+                low, high = self._bounds(index)
+                return min((low + high) / 2 / 1_000_000, self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class RequestTimer:
+    __slots__ = ("label", "started", "db_time", "api_time", "file_bytes")
+
+    def __init__(self, label: str):
+        self.label = label
+        self.started = time.perf_counter()
+        self.db_time = 0.0
+        self.api_time = 0.0
+        self.file_bytes = 0
+
+
+_current_request: ContextVar[Optional[RequestTimer]] = ContextVar("metrics_current_request", default=None)
+
+
+class MetricsRegistry:
+    MAX_LABELS = 200
+    OVERFLOW_LABEL = "other"
+
+    def __init__(self):
+        self.histograms = defaultdict(dict)
+        self.counters = defaultdict(lambda: defaultdict(float))
+        self.gauges = {}
+        self.in_flight = 0
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def _label(self, family: dict, label: str) -> str:
+        if label in family or len(family) < self.MAX_LABELS:
+            return label
+        return self.OVERFLOW_LABEL
+
+    def observe(self, name: str, label: str, seconds: float):
+        with self._lock:
+            family = self.histograms[name]
+            label = self._label(family, label)
+            histogram = family.get(label)
+            if histogram is None:
+                histogram = family[label] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def inc(self, name: str, label: str = "", amount: float = 1):
+        with self._lock:
+            family = self.counters[name]
+            family[self._label(family, label)] += amount
+
+    def set_gauge(self, name: str, value: float):
+        self.gauges[name] = value
+
+    def histogram(self, name: str, label: str) -> Optional[LatencyHistogram]:
+        return self.histograms.get(name, {}).get(label)
+
+    def summary(self, name: str) -> list:
+        with self._lock:
+            rows = []
+            for label, histogram in self.histograms.get(name, {}).items():
+                rows.append({
+                    "label": label,
+                    "count": histogram.count,
+                    "mean": histogram.mean(),
+                    "p50": histogram.quantile(0.50),
+                    "p95": histogram.quantile(0.95),
+                    "p99": histogram.quantile(0.99),
+                    "max": histogram.max,
+                })
+        rows.sort(key=lambda row: row["count"], reverse=True)
+        return rows
+
+    def begin_request(self, label: str) -> RequestTimer:
+        timer = RequestTimer(label)
+        _current_request.set(timer)
+        with self._lock:
+            self.in_flight += 1
+        return timer
+
+    def end_request(self) -> Optional[RequestTimer]:
+        timer = _current_request.get()
+        if timer is None:
+            return None
+        _current_request.set(None)
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+        self.observe("handler_latency_seconds", timer.label, time.perf_counter() - timer.started)
+        self.observe("handler_db_seconds", timer.label, timer.db_time)
+        self.observe("handler_api_seconds", timer.label, timer.api_time)
+        if timer.file_bytes:
+            self.inc("file_bytes_total", timer.label, timer.file_bytes)
+        self.inc("updates_total", timer.label)
+        return timer
+
+    def record_db(self, seconds: float):
+        timer = _current_request.get()
+        if timer is not None:
+            timer.db_time += seconds
+        self.observe("db_query_seconds", "all", seconds)
+
+    def record_api(self, endpoint: str, seconds: float):
+        timer = _current_request.get()
+        if timer is not None:
+            timer.api_time += seconds
+        self.observe("telegram_api_seconds", endpoint, seconds)
+
+    def record_file_bytes(self, size: int):
+        timer = _current_request.get()
+        if timer is not None:
+            timer.file_bytes += size
+        else:
+            self.inc("file_bytes_total", "background", size)
+
+    def render_prometheus(self, prefix: str = "bot") -> str:
+        lines = []
+        with self._lock:
+            for name, family in sorted(self.histograms.items()):
+                metric = f"{prefix}_{name}"
+                lines.append(f"# TYPE {metric} summary")
+                for label, histogram in sorted(family.items()):
+                    labels = _format_label(label)
+                    for q in (0.5, 0.95, 0.99):
+                        lines.append(f'{metric}{{{labels},quantile="{q}"}} {histogram.quantile(q):.6f}')
+                    lines.append(f"{metric}_sum{{{labels}}} {histogram.total:.6f}")
+                    lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+
+            for name, family in sorted(self.counters.items()):
+                metric = f"{prefix}_{name}"
+                lines.append(f"# TYPE {metric} counter")
+                for label, value in sorted(family.items()):
+                    lines.append(f"{metric}{{{_format_label(label)}}} {value:g}")
+
+            gauges = dict(self.gauges)
+            gauges["updates_in_flight"] = self.in_flight
+            gauges["uptime_seconds"] = time.time() - self.started_at
+
+        for name, value in sorted(gauges.items()):
+            metric = f"{prefix}_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _format_label(label: str) -> str:
+    escaped = str(label).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+    return f'label="{escaped}"'
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,99 @@
+import time
+import asyncio
+import logging
+from typing import Optional
+from telegram.error import Forbidden, BadRequest, RetryAfter, TimedOut, NetworkError
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationSender:
+    def __init__(self, rate_per_second: float = 25.0, max_queue: int = 100000, max_attempts: int = 3):
+        self.rate_per_second = rate_per_second
+        self.max_attempts = max_attempts
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self._bot = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return self.queue.qsize()
+
+    def start(self, bot):
+        self._bot = bot
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def enqueue(self, chat_id: int, text: str, parse_mode: str = "Markdown", on_sent=None) -> bool:
+        try:
+            self.queue.put_nowait((chat_id, text, parse_mode, on_sent, 0))
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            metrics.inc("notifications_total", "dropped")
+            return False
+
+    async def _run(self):
+        interval = 1.0 / self.rate_per_second
+        next_slot = time.monotonic()
+        while True:
+            chat_id, text, parse_mode, on_sent, attempt = await self.queue.get()
+            delay = next_slot - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            next_slot = max(next_slot, time.monotonic()) + interval
+
+            try:
+                await self._bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+                self.sent += 1
+                metrics.inc("notifications_total", "sent")
+                if on_sent is not None:
+                    try:
+                        result = on_sent(chat_id)
+                        if asyncio.iscoroutine(result):
+                            await result
+                    except Exception as e:
+                        logger.error(f"Notification callback error for {chat_id}: {e}")
+            except RetryAfter as e:
+                logger.warning(f"Flood control hit, pausing notifications for {e.retry_after}s")
+                next_slot = time.monotonic() + float(e.retry_after)
+                self._retry(chat_id, text, parse_mode, on_sent, attempt)
+            except (Forbidden, BadRequest) as e:
+                self._fail(chat_id, e)
+            except (TimedOut, NetworkError):
+                self._retry(chat_id, text, parse_mode, on_sent, attempt)
+            except Exception as e:
+                self._fail(chat_id, e)
+            finally:
+                self.queue.task_done()
+
+    def _retry(self, chat_id, text, parse_mode, on_sent, attempt):
+        if attempt + 1 >= self.max_attempts:
+            self._fail(chat_id, "max attempts reached")
+            return
+        try:
+            self.queue.put_nowait((chat_id, text, parse_mode, on_sent, attempt + 1))
+        except asyncio.QueueFull:
+            self._fail(chat_id, "queue full")
+
+    def _fail(self, chat_id, error):
+        self.failed += 1
+        metrics.inc("notifications_total", "failed")
+        logger.debug(f"Notification to {chat_id} failed: {error}")
+
+
+notification_sender = NotificationSender()
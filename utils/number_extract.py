@@ -0,0 +1,150 @@
+import os
+import re
+import mmap
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from utils.archive import open_binary
+from utils.text_cleaner import iter_line_blocks
+
+logger = logging.getLogger(__name__)
+
+EXTRACT_WINDOW = 8 << 20
+EXTRACT_PARALLEL_THRESHOLD = int(os.getenv("EXTRACT_PARALLEL_MB", "32")) << 20
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+DIGITS = re.compile(rb'[0-9]+')
+RUN_TABLE = bytes(0x31 if 0x30 <= byte <= 0x39 else 0x30 for byte in range(256))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def open_map(path: str) -> Optional[mmap.mmap]:
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def line_ranges(buf, start: int, end: int, size: int) -> List[Tuple[int, int]]:
+    ranges = []
+    while start < end:
+        target = start + size
+        cut = end if target >= end else (buf.find(b'\n', target, end) + 1 or end)
+        ranges.append((start, cut))
+        start = cut
+    return ranges
+
+
+def count_block(data: bytes) -> int:
+    runs = data.translate(RUN_TABLE)
+    return runs.count(b'01') + runs.startswith(b'1')
+
+
+def extract_block(data: bytes) -> List[bytes]:
+    return DIGITS.findall(data)
+
+
+def count_range(buf, start: int, end: int) -> int:
+    return sum(count_block(buf[window_start:window_end])
+               for window_start, window_end in line_ranges(buf, start, end, EXTRACT_WINDOW))
+
+
+def _count_part(path: str, start: int, end: int) -> int:
+    buf = open_map(path)
+    try:
+        return count_range(buf, start, end)
+    finally:
+        buf.close()
+
+
+def _extract_part(path: str, start: int, end: int) -> bytes:
+    buf = open_map(path)
+    try:
+        return b'\n'.join(DIGITS.findall(buf, start, end))
+    finally:
+        buf.close()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _parallel_ranges(buf, size: int) -> Optional[List[Tuple[int, int]]]:
+    if size < EXTRACT_PARALLEL_THRESHOLD or EXTRACT_WORKERS < 2:
+        return None
+    ranges = line_ranges(buf, 0, size, -(-size // EXTRACT_WORKERS))
+    return ranges if len(ranges) > 1 else None
+
+
+def iter_windows(buf) -> Iterator[Tuple[List[bytes], int]]:
+    for start, end in line_ranges(buf, 0, len(buf), EXTRACT_WINDOW):
+        yield DIGITS.findall(buf, start, end), end
+
+
+def iter_stream_windows(src) -> Iterator[Tuple[List[bytes], int]]:
+    for block, read_bytes in iter_line_blocks(src, EXTRACT_WINDOW):
+        yield extract_block(block), read_bytes
+
+
+def count_numbers(path) -> int:
+    if not isinstance(path, str):
+        with open_binary(path) as src:
+            return sum(count_block(block) for block, _ in iter_line_blocks(src, EXTRACT_WINDOW))
+
+    buf = open_map(path)
+    if buf is None:
+        return 0
+    try:
+        ranges = _parallel_ranges(buf, len(buf))
+        if ranges is None:
+            return count_range(buf, 0, len(buf))
+        pool = get_pool()
+        return sum(pool.map(_count_part, *zip(*((path, start, end) for start, end in ranges))))
+    finally:
+        buf.close()
+
+
+def iter_numbers(path, as_int: bool = False) -> Iterator:
+    if not isinstance(path, str):
+        with open_binary(path) as src:
+            for numbers, _ in iter_stream_windows(src):
+                yield from map(int, numbers) if as_int else numbers
+        return
+
+    buf = open_map(path)
+    if buf is None:
+        return
+    try:
+        ranges = _parallel_ranges(buf, len(buf))
+        if ranges is None:
+            for numbers, _ in iter_windows(buf):
+                yield from map(int, numbers) if as_int else numbers
+        else:
+            pool = get_pool()
+            for blob in pool.map(_extract_part, *zip(*((path, start, end) for start, end in ranges))):
+                if blob:
+                    numbers = blob.split(b'\n')
+                    yield from map(int, numbers) if as_int else numbers
+    finally:
+        buf.close()
+
+
+def extract_numbers(path) -> List[bytes]:
+    return list(iter_numbers(path))
@@ -0,0 +1,193 @@
+import os
+import time
+import logging
+from itertools import islice
+from typing import Iterator, List
+
+from utils.metrics import metrics
+from utils.text_cleaner import iter_line_blocks, clean_block
+from utils.number_extract import open_map, iter_windows, iter_stream_windows, extract_block
+from utils.merge_engine import dedup_records, txt_identity
+from utils.archive import open_binary, source_size
+from utils.contact_writers import Contact, format_phone, get_writer, FORMAT_VCF30
+
+logger = logging.getLogger(__name__)
+
+STAGE_CLEAN = "clean"
+STAGE_NORMALIZE = "normalize"
+STAGE_DEDUPE = "dedupe"
+STAGE_CONVERT = "convert"
+STAGE_SPLIT = "split"
+PIPELINE_STAGES = (STAGE_CLEAN, STAGE_NORMALIZE, STAGE_DEDUPE, STAGE_CONVERT, STAGE_SPLIT)
+
+DEFAULT_COUNTRY_CODE = "62"
+PIPELINE_BATCH = 1 << 16
+NUMBER_STAGES = (STAGE_NORMALIZE, STAGE_DEDUPE, STAGE_CONVERT)
+
+
+def order_stages(stages) -> List[str]:
+    return [stage for stage in PIPELINE_STAGES if stage in stages]
+
+
+class PipelineRun:
+    def __init__(self, input_path, workdir: str, stages, params: dict, reporter=None):
+        self.input_path = input_path
+        self.workdir = workdir
+        self.stages = order_stages(stages)
+        self.params = params
+        self.reporter = reporter
+        self.country_code = (params.get("country_code") or DEFAULT_COUNTRY_CODE).encode()
+        self.total_bytes = source_size(input_path)
+        self.timings = {stage: 0.0 for stage in ["read"] + self.stages + ["write"]}
+        self.records_in = 0
+        self.duplicates = 0
+        self.written = 0
+        self.outputs = []
+        self.position = 0
+        self._extract = any(stage in self.stages for stage in NUMBER_STAGES)
+        self._contact_index = 0
+        self._writer = get_writer(params.get("format") or FORMAT_VCF30)(None)
+        self._current = None
+        self._current_count = 0
+
+    def source(self) -> Iterator[tuple]:
+        if STAGE_CLEAN in self.stages:
+            with open_binary(self.input_path) as src:
+                for block, read_bytes in iter_line_blocks(src):
+                    started = time.perf_counter()
+                    cleaned = clean_block(block)
+                    if self._extract:
+                        records = extract_block(cleaned)
+                    else:
+                        records = cleaned.split(b"\n") if cleaned else []
+                    self.timings[STAGE_CLEAN] += time.perf_counter() - started
+                    yield records, read_bytes
+        elif not isinstance(self.input_path, str):
+            with open_binary(self.input_path) as src:
+                yield from iter_stream_windows(src)
+        else:
+            buf = open_map(self.input_path)
+            if buf is None:
+                return
+            try:
+                yield from iter_windows(buf)
+            finally:
+                buf.close()
+
+    def normalize(self, records: List[bytes]) -> List[bytes]:
+        country_code = self.country_code
+        return [country_code + record[1:] if record.startswith(b"0") else record for record in records]
+
+    def records(self) -> Iterator[bytes]:
+        normalize = STAGE_NORMALIZE in self.stages
+        source = self.source()
+        while True:
+            started = time.perf_counter()
+            item = next(source, None)
+            self.timings["read"] += time.perf_counter() - started
+            if item is None:
+                return
+            records, self.position = item
+            self.records_in += len(records)
+            if normalize:
+                started = time.perf_counter()
+                records = self.normalize(records)
+                self.timings[STAGE_NORMALIZE] += time.perf_counter() - started
+            yield from records
+
+    def upstream_seconds(self) -> float:
+        return sum(self.timings.get(stage, 0.0) for stage in ("read", STAGE_CLEAN, STAGE_NORMALIZE))
+
+    def convert(self, records: List[bytes]) -> List[bytes]:
+        contact_name = self.params.get("contact_name", "")
+        render = self._writer.render
+        cards = []
+        for record in records:
+            self._contact_index += 1
+            contact = Contact(f"{contact_name} {str(self._contact_index).zfill(4)}", format_phone(record.decode()))
+            cards.append(render(contact).encode())
+        return cards
+
+    @property
+    def extension(self) -> str:
+        return "vcf" if STAGE_CONVERT in self.stages else "txt"
+
+    def _open_output(self):
+        output_name = self.params.get("output_name") or "pipeline"
+        if STAGE_SPLIT in self.stages:
+            output_name = f"{output_name}{len(self.outputs) + 1}"
+        filename = f"{output_name}.{self.extension}"
+        path = os.path.join(self.workdir, f"out_{len(self.outputs)}_{filename}")
+        self._current = open(path, "wb")
+        self._current_count = 0
+        self.outputs.append((path, filename))
+
+    def write(self, records: List[bytes]):
+        split_size = self.params.get("split_size") if STAGE_SPLIT in self.stages else None
+        converted = STAGE_CONVERT in self.stages
+        while records:
+            if self._current is None or (split_size and self._current_count >= split_size):
+                self.close()
+                self._open_output()
+            take = min(len(records), split_size - self._current_count) if split_size else len(records)
+            batch, records = records[:take], records[take:]
+            self._current.write(b"".join(batch) if converted else b"\n".join(batch) + b"\n")
+            self._current_count += len(batch)
+            self.written += len(batch)
+
+    def close(self):
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+
+    def run(self) -> dict:
+        dedupe = STAGE_DEDUPE in self.stages
+        convert = STAGE_CONVERT in self.stages
+        stream = self.records()
+        if dedupe:
+            stream = dedup_records((record.decode("ascii") for record in stream), txt_identity, self, self.workdir)
+        try:
+            while True:
+                upstream = self.upstream_seconds()
+                started = time.perf_counter()
+                records = list(islice(stream, PIPELINE_BATCH))
+                if dedupe:
+                    records = [record.encode("ascii") for record in records]
+                    self.timings[STAGE_DEDUPE] += time.perf_counter() - started - (self.upstream_seconds() - upstream)
+                if not records:
+                    break
+
+                if convert:
+                    started = time.perf_counter()
+                    records = self.convert(records)
+                    self.timings[STAGE_CONVERT] += time.perf_counter() - started
+
+                started = time.perf_counter()
+                self.write(records)
+                self.timings["write" if STAGE_SPLIT not in self.stages else STAGE_SPLIT] += time.perf_counter() - started
+
+                if self.reporter is not None:
+                    self.reporter.check()
+                    self.reporter.update(self.position, self.total_bytes)
+        finally:
+            stream.close()
+            self.close()
+
+        if STAGE_CLEAN in self.timings:
+            self.timings["read"] -= self.timings[STAGE_CLEAN]
+        if STAGE_SPLIT in self.stages:
+            self.timings.pop("write")
+        for stage, seconds in self.timings.items():
+            metrics.observe("pipeline_stage_seconds", stage, seconds)
+
+        return {
+            "outputs": self.outputs,
+            "records": self.written,
+            "read": self.records_in,
+            "duplicates": self.duplicates,
+            "timings": self.timings,
+        }
+
+
+def run_pipeline(input_path, workdir: str, stages, params: dict, reporter=None) -> dict:
+    return PipelineRun(input_path, workdir, stages, params, reporter).run()
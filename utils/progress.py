@@ -0,0 +1,189 @@
+import time
+import asyncio
+import logging
+import secrets
+import threading
+from typing import Optional, Callable, Awaitable
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest, RetryAfter
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_INTERVAL = 3.0
+PROGRESS_STEP = 1000
+BAR_WIDTH = 20
+CANCEL_PREFIX = "progress_cancel:"
+
+active_reporters = {}
+
+
+class OperationCancelled(Exception):
+    pass
+
+
+def render_bar(processed: int, total: int, width: int = BAR_WIDTH) -> str:
+    ratio = min(1.0, processed / total) if total else 0.0
+    filled = int(ratio * width)
+    return f"[{'█' * filled}{'░' * (width - filled)}] {ratio:.0%}"
+
+
+def format_eta(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}j {(seconds % 3600) // 60}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60}d"
+    return f"{seconds}d"
+
+
+class ProgressReporter:
+    def __init__(self, bot, chat_id: int, title: str, user_id: int = None, interval: float = PROGRESS_INTERVAL,
+                 cancel_event: threading.Event = None, on_cancel: Callable[[], Awaitable] = None, cancel_ref: str = None):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.title = title
+        self.user_id = user_id or chat_id
+        self.interval = interval
+        self.token = secrets.token_hex(6)
+        self.cancel_ref = cancel_ref or self.token
+        self.cancel_event = cancel_event or threading.Event()
+        self.on_cancel = on_cancel
+        self.edits = 0
+        self._processed = 0
+        self._total = 0
+        self._version = 0
+        self._rendered = -1
+        self._started = time.monotonic()
+        self._message = None
+        self._task: Optional[asyncio.Task] = None
+        self._not_before = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def check(self):
+        if self.cancel_event.is_set():
+            raise OperationCancelled()
+
+    def update(self, processed: int, total: int = None):
+        self._processed = processed
+        if total is not None:
+            self._total = total
+        self._version += 1
+
+    def start(self):
+        active_reporters[self.token] = self
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def finish(self, text: str = None):
+        active_reporters.pop(self.token, None)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        message, self._message = self._message, None
+        if message is None:
+            return
+        try:
+            if text:
+                await message.edit_text(text, parse_mode="Markdown")
+            else:
+                await message.delete()
+        except Exception as e:
+            logger.debug(f"Progress message cleanup failed: {e}")
+
+    async def request_cancel(self):
+        if self.cancel_event.is_set():
+            return
+        self.cancel_event.set()
+        metrics.inc("progress_cancel_total", self.title)
+        if self.on_cancel is not None:
+            try:
+                await self.on_cancel()
+            except Exception as e:
+                logger.error(f"Progress cancel hook failed: {e}")
+        self._version += 1
+
+    def render(self) -> str:
+        processed, total = self._processed, self._total
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        rate = processed / elapsed
+        lines = [f"⚙️ {self.title}", "───────────────────────────────────────"]
+        if self.cancel_event.is_set():
+            lines.append("⏹ Membatalkan...")
+        elif total:
+            lines.append(render_bar(processed, total))
+            eta = (total - processed) / rate if rate > 0 else 0
+            lines.append(f"{processed:,} / {total:,} • {rate:,.0f}/s • sisa {format_eta(eta)}".replace(",", "."))
+        else:
+            lines.append(f"{processed:,} diproses • {format_eta(elapsed)}".replace(",", "."))
+        return "```\n" + "\n".join(lines) + "\n```"
+
+    def _markup(self):
+        if self.cancel_event.is_set():
+            return None
+        return InlineKeyboardMarkup([[InlineKeyboardButton("⏹ Batalkan", callback_data=f"{CANCEL_PREFIX}{self.cancel_ref}")]])
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if self._version == self._rendered and self._message is not None:
+                continue
+            if time.monotonic() < self._not_before:
+                continue
+            version = self._version
+            try:
+                if self._message is None:
+                    self._message = await self.bot.send_message(
+                        chat_id=self.chat_id, text=self.render(), parse_mode="Markdown", reply_markup=self._markup()
+                    )
+                else:
+                    await self._message.edit_text(self.render(), parse_mode="Markdown", reply_markup=self._markup())
+                self.edits += 1
+                self._rendered = version
+                metrics.inc("progress_edits_total", self.title)
+            except RetryAfter as e:
+                self._not_before = time.monotonic() + float(e.retry_after)
+            except BadRequest as e:
+                if "not modified" in str(e).lower():
+                    self._rendered = version
+                else:
+                    logger.debug(f"Progress edit failed: {e}")
+            except Exception as e:
+                logger.debug(f"Progress edit failed: {e}")
+
+
+async def progress_cancel_callback(update, context):
+    query = update.callback_query
+    ref = query.data[len(CANCEL_PREFIX):]
+
+    if ref.startswith("job:"):
+        from utils.file_jobs import file_job_queue
+        try:
+            cancelled = await file_job_queue.cancel(int(ref[4:]), query.from_user.id)
+        except ValueError:
+            cancelled = False
+        if cancelled:
+            await query.answer("⏹ Proses dibatalkan")
+        else:
+            await query.answer("Proses sudah selesai atau bukan milik Anda.", show_alert=True)
+        return
+
+    reporter = active_reporters.get(ref)
+    if reporter is None:
+        await query.answer("Proses sudah selesai.", show_alert=True)
+        return
+    if query.from_user.id != reporter.user_id:
+        await query.answer("❌ Bukan proses milik Anda.", show_alert=True)
+        return
+
+    await reporter.request_cancel()
+    await query.answer("⏹ Proses dibatalkan")
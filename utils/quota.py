@@ -0,0 +1,180 @@
+import asyncio
+import logging
+from datetime import datetime, date
+from typing import Optional
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 5
+FLUSH_BATCH_SIZE = 500
+EVICT_EVERY = 720
+
+
+class QuotaManager:
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self._usage = {}
+        self._pending = {}
+        self._loading = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def today() -> date:
+        return datetime.utcnow().date()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _hydrate(self, user_id: int):
+        if user_id in self._usage:
+            return
+        future = self._loading.get(user_id)
+        if future is not None:
+            await future
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[user_id] = future
+        try:
+            used, day = await self._load_from_db(user_id)
+            if user_id not in self._usage:
+                self._usage[user_id] = [day or self.today(), used if day == self.today() else 0]
+        finally:
+            del self._loading[user_id]
+            future.set_result(None)
+
+    async def _load_from_db(self, user_id: int) -> tuple:
+        try:
+            from database.connection import DatabaseUnavailable
+            from database.models import UserModel
+        except ImportError:
+            return 0, None
+        try:
+            usage = await UserModel.get_usage(user_id)
+        except DatabaseUnavailable as e:
+            logger.warning(f"Quota usage for {user_id} not loaded: {e}")
+            usage = None
+        if not usage:
+            return 0, None
+        return usage["daily_used"] or 0, usage["last_request_date"]
+
+    def _entry(self, user_id: int) -> list:
+        today = self.today()
+        entry = self._usage.get(user_id)
+        if entry is None:
+            entry = self._usage[user_id] = [today, 0]
+        elif entry[0] != today:
+            entry[0] = today
+            entry[1] = 0
+        return entry
+
+    async def used(self, user_id: int) -> int:
+        await self._hydrate(user_id)
+        return self._entry(user_id)[1]
+
+    async def consume(self, user_id: int, limit: Optional[int], amount: int = 1) -> tuple:
+        await self._hydrate(user_id)
+        entry = self._entry(user_id)
+        if limit is not None and entry[1] + amount > limit:
+            metrics.inc("quota_decisions_total", "denied")
+            return False, entry[1], max(0, limit - entry[1])
+
+        entry[1] += amount
+        self._mark_dirty(user_id, entry[0], amount)
+        metrics.inc("quota_decisions_total", "allowed")
+        remaining = None if limit is None else limit - entry[1]
+        return True, entry[1], remaining
+
+    def refund(self, user_id: int, amount: int = 1):
+        today = self.today()
+        entry = self._usage.get(user_id)
+        if entry is not None and entry[0] == today:
+            amount = min(amount, entry[1])
+            if amount <= 0:
+                return
+            entry[1] -= amount
+        self._mark_dirty(user_id, today, -amount)
+
+    def reset(self, user_id: int):
+        entry = self._entry(user_id)
+        delta, entry[1] = -entry[1], 0
+        self._mark_dirty(user_id, entry[0], delta)
+
+    def _mark_dirty(self, user_id: int, day: date, delta: int):
+        pending = self._pending.get(user_id)
+        if pending is None or pending[0] != day:
+            self._pending[user_id] = [day, delta]
+        else:
+            pending[1] += delta
+
+    def _sync(self, user_id: int, day: date, used: int):
+        entry = self._usage.get(user_id)
+        if entry is not None and entry[0] == day and user_id not in self._pending:
+            entry[1] = used
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        rows = [(user_id, day, delta) for user_id, (day, delta) in pending.items()]
+
+        try:
+            from database.connection import DatabaseUnavailable
+            from database.models import UserModel
+        except ImportError:
+            return 0
+
+        flushed = 0
+        for start in range(0, len(rows), FLUSH_BATCH_SIZE):
+            batch = rows[start:start + FLUSH_BATCH_SIZE]
+            try:
+                totals = await UserModel.flush_usage(batch)
+            except DatabaseUnavailable as e:
+                logger.warning(f"Quota flush deferred: {e}")
+                totals = None
+            if totals is not None:
+                flushed += len(batch)
+                days = {user_id: day for user_id, day, _ in batch}
+                for user_id, used in totals:
+                    self._sync(user_id, days[user_id], used)
+            else:
+                for user_id, day, delta in batch:
+                    current = self._pending.get(user_id)
+                    if current is None:
+                        self._pending[user_id] = [day, delta]
+                    elif current[0] == day:
+                        current[1] += delta
+        return flushed
+
+    async def _run(self):
+        ticks = 0
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Quota flush error: {e}")
+            ticks += 1
+            if ticks % EVICT_EVERY == 0:
+                self.evict_stale()
+
+    def evict_stale(self):
+        today = self.today()
+        for user_id in [uid for uid, entry in self._usage.items() if entry[0] != today and uid not in self._pending]:
+            del self._usage[user_id]
+
+
+quota_manager = QuotaManager()
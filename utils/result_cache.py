@@ -0,0 +1,109 @@
+import os
+import json
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "2000"))
+
+
+def build_cache_key(file_unique_id: str, operation: str, params: dict = None) -> Optional[str]:
+    if not file_unique_id:
+        return None
+    payload = json.dumps([file_unique_id, operation, params or {}], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: dict):
+        if not key or not entry.get("outputs"):
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        metrics.set_gauge("result_cache_entries", len(self._entries))
+
+    def invalidate(self, key: str):
+        self._entries.pop(key, None)
+
+    def record(self, outcome: str):
+        if outcome == "miss":
+            self.misses += 1
+        else:
+            self.hits += 1
+        metrics.inc("result_cache_total", outcome)
+
+    async def lookup(self, key: str) -> Optional[dict]:
+        if not key:
+            return None
+        entry = self.get(key)
+        if entry is not None:
+            self.record("hit")
+            return entry
+
+        try:
+            from database.connection import DatabaseUnavailable
+            from database.models import FileTaskModel
+        except ImportError:
+            FileTaskModel = None
+        try:
+            row = await FileTaskModel.find_cached(key) if FileTaskModel is not None else None
+        except DatabaseUnavailable as e:
+            logger.warning(f"Result cache lookup skipped database: {e}")
+            row = None
+        entry = result_entry(row["result"]) if row else None
+        if entry is not None:
+            self.put(key, entry)
+            self.record("db_hit")
+            return entry
+
+        self.record("miss")
+        return None
+
+
+def result_entry(result) -> Optional[dict]:
+    if isinstance(result, str):
+        try:
+            result = json.loads(result)
+        except ValueError:
+            return None
+    sent = (result or {}).get("sent") or []
+    if not sent or any(not output.get("file_id") for output in sent):
+        return None
+    return {
+        "outputs": [{"filename": output["filename"], "file_id": output["file_id"]} for output in sent],
+        "caption": result.get("caption"),
+        "parse_mode": result.get("parse_mode"),
+    }
+
+
+result_cache = ResultCache()
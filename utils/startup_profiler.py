@@ -0,0 +1,147 @@
+import sys
+import time
+import logging
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+PROCESS_START = time.perf_counter()
+
+
+class _TimedLoader:
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        create_module = getattr(self._loader, "create_module", None)
+        if create_module is None:
+            return None
+        return create_module(spec)
+
+    def exec_module(self, module):
+        spec = getattr(module, "__spec__", None)
+        if spec is not None:
+            spec.loader = self._loader
+        if getattr(module, "__loader__", None) is self:
+            module.__loader__ = self._loader
+
+        self._profiler._enter(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(module.__name__)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _ImportTimer:
+    def __init__(self, profiler):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, "find_spec", None)
+            if find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self._profiler)
+            return spec
+        return None
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.cumulative = {}
+        self.self_time = {}
+        self.phases = []
+        self.first_update_at = None
+        self._stack = []
+        self._finder = None
+
+    def install(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self._finder = _ImportTimer(self)
+        sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    def _enter(self, name: str):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _exit(self, name: str):
+        module_name, started, children = self._stack.pop()
+        elapsed = time.perf_counter() - started
+        self.cumulative[module_name] = elapsed
+        self.self_time[module_name] = max(0.0, elapsed - children)
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+    def mark(self, phase: str):
+        if not self.enabled:
+            return
+        self.phases.append((phase, time.perf_counter() - PROCESS_START))
+
+    def record_first_update(self) -> bool:
+        if not self.enabled or self.first_update_at is not None:
+            return False
+        self.first_update_at = time.perf_counter() - PROCESS_START
+        self.mark("first_update")
+        return True
+
+    def by_package(self) -> dict:
+        totals = defaultdict(float)
+        for name, value in self.self_time.items():
+            totals[name.split(".")[0]] += value
+        return dict(totals)
+
+    def format_report(self, top: int = 15) -> str:
+        lines = ["=" * 50, "⏱️ STARTUP PROFILE", "=" * 50]
+
+        total_imports = sum(self.self_time.values())
+        lines.append(f"Modules imported : {len(self.self_time)}")
+        lines.append(f"Import time      : {total_imports * 1000:.1f} ms")
+        lines.append("")
+
+        lines.append("Per package (self time, aggregated):")
+        packages = sorted(self.by_package().items(), key=lambda item: item[1], reverse=True)
+        for package, value in packages[:top]:
+            lines.append(f"  {value * 1000:9.1f} ms  {package}")
+        lines.append("")
+
+        lines.append("Slowest modules (cumulative | self):")
+        modules = sorted(self.cumulative.items(), key=lambda item: item[1], reverse=True)
+        for name, value in modules[:top]:
+            lines.append(f"  {value * 1000:9.1f} ms | {self.self_time.get(name, 0) * 1000:7.1f} ms  {name}")
+        lines.append("")
+
+        lines.append("Phases (since process start):")
+        for phase, at in self.phases:
+            lines.append(f"  {at * 1000:9.1f} ms  {phase}")
+
+        if self.first_update_at is not None:
+            lines.append("")
+            lines.append(f"Time to first update: {self.first_update_at:.3f} s")
+
+        lines.append("=" * 50)
+        return "\n".join(lines)
+
+    def report(self, top: int = 15):
+        if not self.enabled:
+            return
+        print("\n" + self.format_report(top) + "\n")
+
+
+startup_profiler = StartupProfiler()
@@ -0,0 +1,181 @@
+import math
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, date
+from typing import Optional
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_INTERVAL = 300
+DAU_RETENTION_DAYS = 30
+HLL_PRECISION = 12
+
+
+class HyperLogLog:
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size)
+        self._rank_bits = 64 - precision
+        if self.size >= 128:
+            self._alpha = 0.7213 / (1 + 1.079 / self.size)
+        else:
+            self._alpha = {16: 0.673, 32: 0.697, 64: 0.709}[self.size]
+
+    def add(self, value) -> bool:
+        digest = hashlib.blake2b(str(value).encode(), digest_size=8).digest()
+        hashed = int.from_bytes(digest, "big")
+        index = hashed >> self._rank_bits
+        remainder = hashed & ((1 << self._rank_bits) - 1)
+        rank = self._rank_bits - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def count(self) -> int:
+        estimate = self._alpha * self.size * self.size / sum(2.0 ** -register for register in self.registers)
+        if estimate <= 2.5 * self.size:
+            zeros = self.registers.count(0)
+            if zeros:
+                estimate = self.size * math.log(self.size / zeros)
+        return int(round(estimate))
+
+    def merge(self, other: "HyperLogLog"):
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+
+class StatsService:
+    def __init__(self, reconcile_interval: float = RECONCILE_INTERVAL):
+        self.reconcile_interval = reconcile_interval
+        self.total_users = 0
+        self.roles = {}
+        self.active_access = {"vip_access": 0, "vvip_access": 0}
+        self.loaded = False
+        self.last_reconcile = None
+        self.last_drift = {}
+        self._dau = {}
+        self._dau_cache = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def on_user_created(self, role: str):
+        self.total_users += 1
+        self.roles[role] = self.roles.get(role, 0) + 1
+
+    def on_role_changed(self, old_role: str, new_role: str, count: int = 1):
+        if old_role == new_role or count <= 0:
+            return
+        if old_role is not None:
+            self.roles[old_role] = max(0, self.roles.get(old_role, 0) - count)
+        self.roles[new_role] = self.roles.get(new_role, 0) + count
+
+    def on_access_granted(self, table: str):
+        self.active_access[table] = self.active_access.get(table, 0) + 1
+
+    def on_access_expired(self, table: str, count: int = 1):
+        self.active_access[table] = max(0, self.active_access.get(table, 0) - count)
+
+    def record_active(self, user_id: int):
+        today = datetime.utcnow().date()
+        sketch = self._dau.get(today)
+        if sketch is None:
+            sketch = self._dau[today] = HyperLogLog()
+            for day in [day for day in self._dau if (today - day).days >= DAU_RETENTION_DAYS]:
+                del self._dau[day]
+        if sketch.add(user_id):
+            self._dau_cache.pop(today, None)
+
+    def daily_active(self, day: date = None) -> int:
+        day = day or datetime.utcnow().date()
+        cached = self._dau_cache.get(day)
+        if cached is None:
+            sketch = self._dau.get(day)
+            cached = self._dau_cache[day] = sketch.count() if sketch else 0
+        return cached
+
+    def active_over(self, days: int) -> int:
+        today = datetime.utcnow().date()
+        merged = HyperLogLog()
+        for day, sketch in self._dau.items():
+            if (today - day).days < days:
+                merged.merge(sketch)
+        return merged.count()
+
+    def snapshot(self) -> dict:
+        return {
+            "total_users": self.total_users,
+            "roles": dict(self.roles),
+            "vip_active": self.active_access.get("vip_access", 0),
+            "vvip_active": self.active_access.get("vvip_access", 0),
+            "dau": self.daily_active(),
+            "wau": self.active_over(7),
+            "loaded": self.loaded,
+            "last_reconcile": self.last_reconcile,
+        }
+
+    def _counters(self) -> tuple:
+        return self.total_users, dict(self.roles), dict(self.active_access)
+
+    async def reconcile(self) -> bool:
+        try:
+            from database.models import StatsModel
+        except ImportError:
+            return False
+
+        before = self._counters()
+        counts = await StatsModel.get_counts()
+        if counts is None:
+            return False
+        after = self._counters()
+
+        # Keep events that landed while the reconcile query was in flight.
+        total = counts["total_users"] + after[0] - before[0]
+        roles = dict(counts["roles"])
+        for role in set(before[1]) | set(after[1]):
+            roles[role] = roles.get(role, 0) + after[1].get(role, 0) - before[1].get(role, 0)
+        access = dict(counts["active_access"])
+        for table in set(before[2]) | set(after[2]):
+            access[table] = access.get(table, 0) + after[2].get(table, 0) - before[2].get(table, 0)
+
+        if self.loaded:
+            self.last_drift = {
+                "total_users": total - self.total_users,
+                **{table: access.get(table, 0) - self.active_access.get(table, 0) for table in access},
+            }
+            for key, drift in self.last_drift.items():
+                if drift:
+                    metrics.inc("stats_reconcile_drift_total", key, abs(drift))
+
+        self.total_users = max(0, total)
+        self.roles = {role: max(0, count) for role, count in roles.items()}
+        self.active_access = {table: max(0, count) for table, count in access.items()}
+        self.loaded = True
+        self.last_reconcile = datetime.now()
+        return True
+
+    async def _run(self):
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Stats reconcile error: {e}")
+            await asyncio.sleep(self.reconcile_interval)
+
+
+stats_service = StatsService()
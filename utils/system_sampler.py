@@ -0,0 +1,154 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Optional
+
+from utils.lazy_import import lazy_module
+from utils.metrics import metrics
+
+psutil = lazy_module("psutil")
+
+logger = logging.getLogger(__name__)
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(values: list, width: int = 24) -> str:
+    if not values:
+        return ""
+    if len(values) > width:
+        step = len(values) / width
+        values = [
+            max(values[int(i * step):max(int((i + 1) * step), int(i * step) + 1)])
+            for i in range(width)
+        ]
+    low, high = min(values), max(values)
+    span = high - low
+    if span <= 0:
+        return SPARK_CHARS[0] * len(values)
+    top = len(SPARK_CHARS) - 1
+    return "".join(SPARK_CHARS[int((value - low) / span * top)] for value in values)
+
+
+class SystemSampler:
+    def __init__(self, interval: float = 5.0, history_seconds: int = 3600):
+        self.interval = interval
+        self.samples = deque(maxlen=max(1, int(history_seconds / interval)))
+        self.boot_time = None
+        self._task: Optional[asyncio.Task] = None
+        self._process = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _prime(self) -> bool:
+        if self._process is not None:
+            return True
+        try:
+            self._process = psutil.Process(os.getpid())
+            self._process.cpu_percent(None)
+            psutil.cpu_percent(interval=None)
+            self.boot_time = psutil.boot_time()
+            return True
+        except Exception as e:
+            logger.warning(f"psutil not available, system sampler limited: {e}")
+            self._process = None
+            return False
+
+    def start(self):
+        if self.running:
+            return
+        self._prime()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        lag = 0.0
+        while True:
+            try:
+                self.samples.append(self._collect(lag))
+            except Exception as e:
+                logger.error(f"System sampler error: {e}")
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+
+    def _collect(self, loop_lag: float) -> dict:
+        sample = {"ts": time.time(), "loop_lag_ms": loop_lag * 1000}
+
+        if self._process is not None:
+            memory = psutil.virtual_memory()
+            disk = psutil.disk_usage('/')
+            sample.update({
+                "cpu_percent": psutil.cpu_percent(interval=None),
+                "mem_percent": memory.percent,
+                "mem_used": memory.used,
+                "mem_total": memory.total,
+                "disk_percent": disk.percent,
+                "disk_used": disk.used,
+                "disk_total": disk.total,
+                "proc_cpu_percent": self._process.cpu_percent(None),
+                "proc_rss": self._process.memory_info().rss,
+            })
+            try:
+                sample["open_fds"] = self._process.num_fds()
+            except Exception:
+                sample["open_fds"] = None
+
+        sample.update(self._pool_stats())
+
+        for key in ("cpu_percent", "mem_percent", "proc_rss", "open_fds", "loop_lag_ms", "db_pool_size", "db_pool_idle"):
+            if sample.get(key) is not None:
+                metrics.set_gauge(f"system_{key}", sample[key])
+        return sample
+
+    def _pool_stats(self) -> dict:
+        try:
+            from database.connection import get_db
+            pool = get_db().pool
+        except ImportError:
+            pool = None
+        if pool is None:
+            return {"db_pool_size": None, "db_pool_idle": None}
+        try:
+            return {"db_pool_size": pool.get_size(), "db_pool_idle": pool.get_idle_size()}
+        except Exception:
+            return {"db_pool_size": None, "db_pool_idle": None}
+
+    def latest(self) -> Optional[dict]:
+        if self.samples:
+            return self.samples[-1]
+        if not self._prime():
+            return None
+        return self._collect(0.0)
+
+    def series(self, key: str, seconds: int = 3600) -> list:
+        cutoff = time.time() - seconds
+        return [sample[key] for sample in self.samples if sample["ts"] >= cutoff and sample.get(key) is not None]
+
+    def trend(self, key: str, seconds: int = 3600, width: int = 24) -> str:
+        values = self.series(key, seconds)
+        if len(values) < 2:
+            return "—"
+        return f"{sparkline(values, width)} {min(values):.0f}-{max(values):.0f}"
+
+    def uptime_str(self) -> str:
+        if not self.boot_time:
+            return "N/A"
+        seconds = int(time.time() - self.boot_time)
+        return f"{seconds // 86400}d {(seconds % 86400) // 3600}h {(seconds % 3600) // 60}m"
+
+
+system_sampler = SystemSampler()
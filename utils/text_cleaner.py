@@ -0,0 +1,98 @@
+import logging
+from typing import Iterator, Optional, Tuple
+
+from utils.archive import open_binary, source_size
+
+logger = logging.getLogger(__name__)
+
+CLEAN_BLOCK_SIZE = 4 << 20
+
+NOISE_CHARS = "-()/+"
+ASCII_SPACES = " \t\x0b\x0c\x1c\x1d\x1e\x1f"
+UNICODE_SPACES = "\x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000"
+
+BYTES_TABLE = bytes.maketrans(b"\r", b"\n")
+BYTES_DELETE = (NOISE_CHARS + ASCII_SPACES).encode("ascii")
+STR_TABLE = str.maketrans({"\r": "\n", **{char: None for char in NOISE_CHARS + ASCII_SPACES + UNICODE_SPACES}})
+
+
+def clean_block(block: bytes) -> bytes:
+    if block.isascii():
+        cleaned = block.translate(BYTES_TABLE, BYTES_DELETE)
+    else:
+        cleaned = block.decode("utf-8").translate(STR_TABLE).encode("utf-8")
+    while b"\n\n" in cleaned:
+        cleaned = cleaned.replace(b"\n\n", b"\n")
+    return cleaned.strip(b"\n")
+
+
+class LineFilter:
+    def __init__(self, country_code: Optional[str] = None, min_length: Optional[int] = None,
+                 max_length: Optional[int] = None):
+        self.country_code = country_code.encode("ascii") if country_code else None
+        self.min_length = min_length
+        self.max_length = max_length
+        self.dropped = 0
+
+    @property
+    def active(self) -> bool:
+        return bool(self.country_code or self.min_length or self.max_length)
+
+    def apply(self, data: bytes) -> bytes:
+        if self.country_code:
+            data = (b"\n" + data).replace(b"\n0", b"\n" + self.country_code)[1:]
+        if not (self.min_length or self.max_length):
+            return data
+        min_length = self.min_length or 0
+        max_length = self.max_length or len(data)
+        lines = data.split(b"\n")
+        kept = [line for line in lines if min_length <= len(line) <= max_length]
+        self.dropped += len(lines) - len(kept)
+        return b"\n".join(kept)
+
+
+def iter_line_blocks(src, block_size: int = CLEAN_BLOCK_SIZE) -> Iterator[Tuple[bytes, int]]:
+    carry = b""
+    read_bytes = 0
+
+    while True:
+        block = src.read(block_size)
+        if block:
+            read_bytes += len(block)
+            block = carry + block
+            cut = max(block.rfind(b"\n"), block.rfind(b"\r")) + 1
+            if not cut:
+                carry = block
+                continue
+            block, carry = block[:cut], block[cut:]
+        else:
+            block, carry = carry, b""
+            if not block:
+                break
+        yield block, read_bytes
+
+
+def clean_stream(src, dst, line_filter: LineFilter = None, block_size: int = CLEAN_BLOCK_SIZE,
+                 reporter=None, total: int = 0) -> dict:
+    lines = 0
+
+    for block, read_bytes in iter_line_blocks(src, block_size):
+        cleaned = clean_block(block)
+        if cleaned and line_filter is not None and line_filter.active:
+            cleaned = line_filter.apply(cleaned)
+        if cleaned:
+            dst.write(cleaned)
+            dst.write(b"\n")
+            lines += cleaned.count(b"\n") + 1
+
+        if reporter is not None:
+            reporter.check()
+            reporter.update(read_bytes, total)
+
+    return {"lines": lines, "dropped": line_filter.dropped if line_filter is not None else 0}
+
+
+def clean_text_file(input_path, output_path: str, line_filter: LineFilter = None, reporter=None) -> dict:
+    total = source_size(input_path)
+    with open_binary(input_path) as src, open(output_path, "wb") as dst:
+        return clean_stream(src, dst, line_filter, reporter=reporter, total=total)